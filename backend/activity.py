@@ -0,0 +1,231 @@
+"""
+报名活动分桶统计
+registration_activity 按 (赛事, 分钟) 记录提交、通过、驳回次数，由报名和审核的写事务增量累加，
+图表查询只读取时间范围内的分钟桶，再按需要的粒度聚合（降采样），不扫描报名表。
+
+用法:
+    python activity.py backfill [--contest ID ...] [--sleep 0.1]   从报名表历史数据重建分桶统计
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import archive
+from database import get_connection
+from http_cache import bump_versions
+
+ACTIVITY_KINDS = ('submitted', 'approved', 'rejected')
+
+# 查询粒度 -> 桶长度（秒）
+INTERVALS = {
+    'minute': 60,
+    '5min': 300,
+    '15min': 900,
+    'hour': 3600,
+    '6hour': 21600,
+    'day': 86400,
+}
+
+# 单次查询最多返回的数据点数，超过时自动选择更粗的粒度
+MAX_POINTS = 720
+
+# 当前分钟桶（与回填使用相同的截断方式）
+_CURRENT_BUCKET = 'NOW() - INTERVAL SECOND(NOW()) SECOND'
+
+
+def record(cursor, kind, contest_ids):
+    """
+    在当前写事务中把本次事件累加到当前分钟桶
+    contest_ids 为事件所属赛事ID的可迭代对象（每个事件一个），或 {赛事ID: 次数}
+    """
+    if kind not in ACTIVITY_KINDS:
+        raise ValueError(f'不支持的活动类型: {kind}')
+    counts = contest_ids if isinstance(contest_ids, dict) else Counter(contest_ids)
+    # 按赛事ID顺序加锁，避免并发事务交叉加锁死锁
+    for contest_id in sorted(counts):
+        if not counts[contest_id]:
+            continue
+        cursor.execute(f"""
+            INSERT INTO registration_activity (contest_id, bucket_start, {kind})
+            VALUES (%s, {_CURRENT_BUCKET}, %s)
+            ON DUPLICATE KEY UPDATE {kind} = {kind} + VALUES({kind})
+        """, (contest_id, counts[contest_id]))
+
+
+def parse_time(value):
+    """
+    解析 ISO 格式时间参数，带时区的时间转换为本地时间；格式错误时抛出 ValueError
+    """
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'时间格式错误: {value}')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _align(moment, seconds):
+    # 以当天零点为基准对齐到桶边界，小时/天粒度与本地时间对齐
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = int((moment - midnight).total_seconds()) // seconds * seconds
+    return midnight + timedelta(seconds=offset)
+
+
+def choose_interval(start, end, interval=None):
+    """
+    返回查询使用的粒度名；interval 为空或 'auto' 时选择数据点不超过 MAX_POINTS 的最细粒度
+    指定的粒度会产生过多数据点时抛出 ValueError
+    """
+    span = (end - start).total_seconds()
+    if interval in (None, '', 'auto'):
+        for name, seconds in INTERVALS.items():
+            if span / seconds <= MAX_POINTS:
+                return name
+        return 'day'
+    if interval not in INTERVALS:
+        raise ValueError(f"不支持的粒度: {interval}，可选 {', '.join(INTERVALS)} 或 auto")
+    if span / INTERVALS[interval] > MAX_POINTS:
+        raise ValueError(f'时间范围过长，{interval} 粒度最多返回 {MAX_POINTS} 个数据点')
+    return interval
+
+
+def query_activity(cursor, contest_id, start, end, interval=None):
+    """
+    查询 [start, end) 内的活动曲线，返回 {'interval', 'points': [...]}，没有数据的桶补 0
+    """
+    interval = choose_interval(start, end, interval)
+    seconds = INTERVALS[interval]
+    start = _align(start, seconds)
+
+    cursor.execute(f"""
+        SELECT TIMESTAMPDIFF(SECOND, %s, bucket_start) DIV {seconds} AS slot,
+               SUM(submitted) AS submitted, SUM(approved) AS approved, SUM(rejected) AS rejected
+        FROM registration_activity
+        WHERE contest_id = %s AND bucket_start >= %s AND bucket_start < %s
+        GROUP BY slot
+    """, (start, contest_id, start, end))
+    slots = {row['slot']: row for row in cursor.fetchall()}
+
+    points = []
+    slot = 0
+    bucket = start
+    while bucket < end:
+        row = slots.get(slot)
+        points.append({
+            'bucket_start': bucket.isoformat(),
+            'submitted': int(row['submitted']) if row else 0,
+            'approved': int(row['approved']) if row else 0,
+            'rejected': int(row['rejected']) if row else 0
+        })
+        slot += 1
+        bucket = start + timedelta(seconds=slot * seconds)
+    return {'interval': interval, 'interval_seconds': seconds, 'points': points}
+
+
+def default_range(cursor, contest_id):
+    """
+    默认查询范围：赛事报名时间窗口（结束时间不晚于当前分钟桶的结束），没有设置时为最近24小时
+    结束时间取到整分钟，同一分钟内的请求得到相同的范围（ETag 包含解析后的范围）
+    赛事不存在时返回 None
+    """
+    cursor.execute('SELECT registration_start, registration_end FROM contests WHERE id = %s', (contest_id,))
+    contest = cursor.fetchone()
+    if not contest:
+        return None
+    now = datetime.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    end = min(contest['registration_end'], now) if contest['registration_end'] else now
+    start = contest['registration_start'] or end - timedelta(hours=24)
+    if start >= end:
+        start = end - timedelta(hours=24)
+    return start, end
+
+
+def resolve_range(cursor, contest_id, start=None, end=None):
+    """
+    解析 start / end 参数（ISO时间字符串，为空时取默认范围），返回 (开始, 结束)
+    赛事不存在时返回 None；参数错误时抛出 ValueError
+    """
+    window = default_range(cursor, contest_id)
+    if window is None:
+        return None
+    start = parse_time(start) if start else window[0]
+    end = parse_time(end) if end else window[1]
+    if start >= end:
+        raise ValueError('开始时间必须早于结束时间')
+    return start, end
+
+
+def backfill(contest_ids=None, sleep=0.1):
+    """
+    从报名表历史数据重建分桶统计，每个赛事一个事务，赛事之间暂停 sleep 秒以降低对线上的影响
+    只重建当前分钟之前的桶：线上写入只累加当前分钟桶，两者不会互相覆盖
+    历史数据只保留报名的最终状态：先驳回后通过的报名只计一次通过
+    报名数据从热表 + 冷表读取：已归档（或回填期间被归档）赛事的报名在冷表中，只读热表会把它的分桶清空
+    """
+    connection = get_connection()
+    if not connection:
+        print("❌ 数据库连接失败")
+        return False
+
+    cursor = connection.cursor()
+    try:
+        # READ COMMITTED 下 INSERT ... SELECT 不对报名表加共享锁，不阻塞线上审核
+        cursor.execute('SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED')
+        # 会话隔离级别已修改，连接不再放回连接池
+        connection.discard()
+        if contest_ids is None:
+            cursor.execute('SELECT id FROM contests ORDER BY id')
+            contest_ids = [row['id'] for row in cursor.fetchall()]
+            connection.commit()
+
+        for index, contest_id in enumerate(contest_ids, 1):
+            started = time.time()
+            cursor.execute(f"""
+                DELETE FROM registration_activity WHERE contest_id = %s AND bucket_start < {_CURRENT_BUCKET}
+            """, (contest_id,))
+            sources = [
+                ('submitted', 'applied_at', None),
+                ('approved', 'reviewed_at', 'approved'),
+                ('rejected', 'reviewed_at', 'rejected'),
+            ]
+            for kind, column, status in sources:
+                status_filter = 'AND status = %s' if status else ''
+                params = (contest_id, status) if status else (contest_id,)
+                cursor.execute(f"""
+                    INSERT INTO registration_activity (contest_id, bucket_start, {kind})
+                    SELECT contest_id, {column} - INTERVAL SECOND({column}) SECOND AS bucket, COUNT(*)
+                    FROM {archive.source('contest_registrations', True)} r
+                    WHERE contest_id = %s AND {column} < {_CURRENT_BUCKET} {status_filter}
+                    GROUP BY contest_id, bucket
+                    ON DUPLICATE KEY UPDATE {kind} = VALUES({kind})
+                """, params)
+            connection.commit()
+            # 读接口的 ETag 包含 registration_activity 的版本号
+            bump_versions(cursor, 'registration_activity')
+            print(f"   [{index}/{len(contest_ids)}] 赛事 {contest_id} 完成，耗时 {time.time() - started:.2f}s")
+            if sleep:
+                time.sleep(sleep)
+        return True
+    except Exception as e:
+        connection.rollback()
+        print(f"回填报名活动统计错误: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='报名活动分桶统计')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = subparsers.add_parser('backfill', help='从报名表历史数据重建分桶统计')
+    backfill_parser.add_argument('--contest', type=int, action='append', help='只重建指定赛事，可重复')
+    backfill_parser.add_argument('--sleep', type=float, default=0.1, help='赛事之间的暂停秒数')
+    args = parser.parse_args()
+
+    if args.command == 'backfill':
+        print("🔄 开始重建报名活动统计...")
+        ok = backfill(args.contest, args.sleep)
+        print("✅ 重建完成" if ok else "❌ 重建失败")
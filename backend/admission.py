@@ -0,0 +1,239 @@
+"""
+准入控制与过载保护
+数据库变慢时请求线程会阻塞在取连接和查询上并不断堆积。每个进程按路由类别限制同时处理的请求数：
+- read：GET / HEAD
+- write：其他写请求
+- heavy：批量审核 / 公示、冲突检测、场地分配等重操作，视图用 @heavy 标记
+并发已满的请求最多排队等待该类别的 max_wait 秒，超时或排队人数超过 max_queue 时立即返回 503 和 Retry-After，
+已接受请求的排队时间有上限，尾延迟不随过载无限增长。健康检查等接口用 @exempt 标记，不受限制。
+
+登录、注册按客户端 IP 做令牌桶限流（@rate_limited('login')），超出时返回 429 和 Retry-After。
+限制都是进程内的：gunicorn 多个 worker 时总并发为各 worker 之和，限流速率同理。
+部署在反向代理之后时设置 ADMISSION_TRUST_FORWARDED=1，按 X-Forwarded-For 中的客户端地址限流。
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g, jsonify, request
+
+
+def _env(name, default):
+    return type(default)(os.environ.get(name, default))
+
+
+# 类别: (最大并发, 最长排队秒数, 最大排队数, Retry-After 秒数)
+ROUTE_CLASSES = {
+    'read': (_env('ADMISSION_READ_LIMIT', 32), _env('ADMISSION_READ_WAIT', 0.5), 64, 1),
+    'write': (_env('ADMISSION_WRITE_LIMIT', 16), _env('ADMISSION_WRITE_WAIT', 1.0), 64, 1),
+    'heavy': (_env('ADMISSION_HEAVY_LIMIT', 2), _env('ADMISSION_HEAVY_WAIT', 0.2), 4, 5),
+}
+
+# 令牌桶: (桶容量, 每秒补充令牌数)
+RATE_LIMITS = {
+    'login': (10, 10 / 60),
+    'register': (5, 5 / 60),
+}
+# 每种限流最多记录的客户端数，超过时淘汰最久未访问的
+MAX_CLIENTS = 10000
+
+TRUST_FORWARDED = os.environ.get('ADMISSION_TRUST_FORWARDED') == '1'
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class _Limiter:
+    """
+    并发上限 + 有界排队
+    """
+
+    def __init__(self, name, limit, max_wait, max_queue, retry_after):
+        self.name = name
+        self.limit = limit
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+
+    def acquire(self):
+        """
+        取得一个并发名额，返回排队秒数；超过排队时间或排队人数时返回 None
+        """
+        with self._cond:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                self.stats['admitted'] += 1
+                return 0.0
+            if self.waiting >= self.max_queue:
+                self.stats['rejected'] += 1
+                return None
+
+            started = time.monotonic()
+            deadline = started + self.max_wait
+            self.waiting += 1
+            self.stats['queued'] += 1
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['rejected'] += 1
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            waited = time.monotonic() - started
+            self.stats['admitted'] += 1
+            self.stats['wait_total'] += waited
+            self.stats['wait_max'] = max(self.stats['wait_max'], waited)
+            return waited
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def snapshot(self):
+        with self._cond:
+            queued = self.stats['queued']
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.stats['admitted'],
+                'rejected': self.stats['rejected'],
+                'queued': queued,
+                'avg_wait_ms': round(self.stats['wait_total'] / queued * 1000, 2) if queued else 0.0,
+                'max_wait_ms': round(self.stats['wait_max'] * 1000, 2)
+            }
+
+
+class _TokenBucket:
+    """
+    按客户端的令牌桶
+    """
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def take(self, client):
+        """
+        消耗一个令牌，成功返回 0，否则返回需要等待的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                wait = 0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > MAX_CLIENTS:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+_limiters = {name: _Limiter(name, *config) for name, config in ROUTE_CLASSES.items()}
+_buckets = {name: _TokenBucket(*config) for name, config in RATE_LIMITS.items()}
+
+
+def heavy(view):
+    """
+    标记重操作视图，放在 @app.route 下一行
+    """
+    view.route_class = 'heavy'
+    return view
+
+
+def exempt(view):
+    """
+    标记不受准入控制的视图（健康检查等）
+    """
+    view.route_class = None
+    return view
+
+
+def rate_limited(name):
+    """
+    按客户端限流，name 为 RATE_LIMITS 中的配置名
+    """
+    def decorator(view):
+        view.rate_limit = name
+        return view
+    return decorator
+
+
+def _client():
+    if TRUST_FORWARDED and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def _reject(status, message, retry_after):
+    response = jsonify({
+        'success': False,
+        'message': message
+    })
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admit():
+    """
+    before_request 钩子：限流与并发名额
+    """
+    if request.method == 'OPTIONS':
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None:
+        return None
+
+    rate_limit = getattr(view, 'rate_limit', None)
+    if rate_limit:
+        wait = _buckets[rate_limit].take(_client())
+        if wait:
+            return _reject(429, '请求过于频繁，请稍后重试', wait)
+
+    default_class = 'read' if request.method in READ_METHODS else 'write'
+    route_class = getattr(view, 'route_class', default_class)
+    if route_class is None:
+        return None
+    limiter = _limiters[route_class]
+    if limiter.acquire() is None:
+        return _reject(503, '服务繁忙，请稍后重试', limiter.retry_after)
+    g.admission_limiter = limiter
+    return None
+
+
+def release(exc=None):
+    limiter = g.pop('admission_limiter', None)
+    if limiter is not None:
+        limiter.release()
+
+
+def snapshot():
+    """
+    各类别的并发、排队和拒绝统计及限流拒绝次数
+    """
+    return {
+        'classes': {name: limiter.snapshot() for name, limiter in _limiters.items()},
+        'rate_limited': {name: bucket.rejected for name, bucket in _buckets.items()}
+    }
+
+
+def init_admission(app):
+    app.before_request(admit)
+    app.teardown_request(release)
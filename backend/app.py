@@ -6,14 +6,45 @@ from flask_cors import CORS
 import bcrypt
 import json
 from datetime import datetime
-from database import get_connection, init_database
+from database import get_connection, init_database, pool_stats
+from http_cache import bump_versions, conditional
+from projection import select_columns
+from contest_queries import (CONTEST_DOCUMENT_TABLES, MAX_BATCH_SIZE, fetch_contest_document,
+                             fetch_contest_documents, parse_include)
+from admission import exempt, heavy, init_admission, rate_limited, snapshot as admission_snapshot
+from compression import init_compression
+from db_routing import STICKY_HEADER, init_db_routing, use_primary, stats as routing_stats
+from deadlines import deadline, init_deadlines, snapshot as deadline_snapshot
+from write_behind import QueueFullError, notification_queue
+from registrations import (REGISTRATION_CLOSED, REGISTRATION_DUPLICATE, REGISTRATION_FULL,
+                           REGISTRATION_NO_CONTEST, build_registration, registration_queue,
+                           review_registrations)
+import activity
+import archive
+import certificates
+import conflicts
+import dashboard
+import fanout
+import jobs
+import readiness
+import teams
+import venue_allocation
 
 app = Flask(__name__)
-# 启用CORS，允许前端跨域请求
-CORS(app)
+# 启用CORS，允许前端跨域请求；带 Cookie 的请求（读己之写的 db_primary_until）也放行
+CORS(app, supports_credentials=True, expose_headers=[STICKY_HEADER])
+# 按 Accept-Encoding 压缩较大的响应
+init_compression(app)
+# 按路由类别限制并发，过载时快速返回 503；登录、注册按客户端限流
+init_admission(app)
+# 读请求路由到从库，写请求之后短时间内读主库
+init_db_routing(app)
+# 按接口设置截止时间，超时的查询被中止并返回 504
+init_deadlines(app)
 
 
 @app.route('/api/register', methods=['POST'])
+@rate_limited('register')
 def register():
     """
     用户注册接口
@@ -91,6 +122,7 @@ def register():
 
 
 @app.route('/api/login', methods=['POST'])
+@rate_limited('login')
 def login():
     """
     用户登录接口
@@ -163,6 +195,7 @@ def login():
 
 
 @app.route('/api/test', methods=['GET'])
+@exempt
 def test():
     """
     测试接口
@@ -174,14 +207,56 @@ def test():
 
 
 @app.route('/api/health', methods=['GET'])
+@exempt
 def health():
     """
     健康检查接口
+    参数: deep=1 时附带就绪报告（数据库延迟、连接池、准入控制、队列积压、熔断器），未就绪时返回 503
     """
-    return jsonify({
-        'status': 'ok',
-        'message': '服务运行正常'
-    }), 200
+    if request.args.get('deep') not in ('1', 'true'):
+        return jsonify({
+            'status': 'ok',
+            'message': '服务运行正常'
+        }), 200
+
+    try:
+        result = readiness.report()
+        return jsonify({
+            'status': 'ok' if result['ready'] else 'unready',
+            'message': '服务运行正常' if result['ready'] else '；'.join(result['reasons']),
+            'data': result
+        }), 200 if result['ready'] else 503
+
+    except Exception as e:
+        print(f"健康检查错误: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': f'健康检查失败: {str(e)}'
+        }), 503
+
+
+@app.route('/api/ready', methods=['GET'])
+@exempt
+def ready():
+    """
+    就绪检查接口：供负载均衡判断是否继续转发流量，未就绪时返回 503 及原因
+    """
+    try:
+        result = readiness.report()
+        return jsonify({
+            'success': result['ready'],
+            'ready': result['ready'],
+            'reasons': result['reasons'],
+            'data': result
+        }), 200 if result['ready'] else 503
+
+    except Exception as e:
+        print(f"就绪检查错误: {e}")
+        return jsonify({
+            'success': False,
+            'ready': False,
+            'reasons': [f'就绪检查失败: {str(e)}']
+        }), 503
 
 
 # ==================== 赛事管理 API ====================
@@ -216,9 +291,9 @@ def create_contest():
         insert_contest = """
         INSERT INTO contests (
             name, type, start_date, end_date, 
-            registration_start, registration_end, location, online_mode,
-            first_prize, second_prize, third_prize, certificate, scholarship, rules
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            registration_start, registration_end, registration_quota, expected_headcount, required_facilities,
+            location, online_mode, first_prize, second_prize, third_prize, certificate, scholarship, rules
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
         cursor.execute(insert_contest, (
@@ -228,6 +303,10 @@ def create_contest():
             time_place.get('endDate'),
             time_place.get('registrationStart'),
             time_place.get('registrationEnd'),
+            time_place.get('registrationQuota'),
+            time_place.get('expectedHeadcount'),
+            json.dumps(time_place['requiredFacilities'], ensure_ascii=False)
+            if time_place.get('requiredFacilities') is not None else None,
             time_place.get('location'),
             time_place.get('onlineMode', False),
             incentives.get('firstPrize'),
@@ -302,6 +381,7 @@ def create_contest():
         
         # 提交事务
         connection.commit()
+        bump_versions(cursor, *CONTEST_DOCUMENT_TABLES)
         
         cursor.close()
         connection.close()
@@ -325,11 +405,20 @@ def create_contest():
 
 
 @app.route('/api/contests', methods=['GET'])
+@conditional('contests')
 def get_contests():
     """
     获取所有赛事列表
     """
     try:
+        try:
+            columns = select_columns('contests', fields=request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         connection = get_connection()
         if not connection:
             return jsonify({
@@ -338,7 +427,7 @@ def get_contests():
             }), 500
         
         cursor = connection.cursor()
-        cursor.execute('SELECT * FROM contests ORDER BY created_at DESC')
+        cursor.execute(f'SELECT {columns} FROM contests ORDER BY created_at DESC')
         contests = cursor.fetchall()
         
         cursor.close()
@@ -363,7 +452,62 @@ def get_contests():
         }), 500
 
 
+@app.route('/api/contests/batch', methods=['GET'])
+@conditional(*CONTEST_DOCUMENT_TABLES)
+def get_contests_batch():
+    """
+    批量获取赛事详情
+    ?ids=1,2,3&include=venues,budget,personnel,equipment,materials（include 缺省为全部）
+    """
+    try:
+        try:
+            ids = list(dict.fromkeys(int(i) for i in request.args.get('ids', '').split(',') if i.strip()))
+            include = parse_include(request.args.get('include'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'参数错误: {str(e)}'
+            }), 400
+        
+        if not ids:
+            return jsonify({
+                'success': False,
+                'message': '请提供赛事ID'
+            }), 400
+        
+        if len(ids) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'message': f'单次最多查询 {MAX_BATCH_SIZE} 个赛事'
+            }), 400
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        contests = fetch_contest_documents(cursor, ids, include)
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': contests
+        }), 200
+        
+    except Exception as e:
+        print(f"批量获取赛事详情错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'批量获取赛事详情失败: {str(e)}'
+        }), 500
+
+
 @app.route('/api/contests/<int:contest_id>', methods=['GET'])
+@conditional(*CONTEST_DOCUMENT_TABLES)
 def get_contest_detail(contest_id):
     """
     获取赛事详情
@@ -378,64 +522,21 @@ def get_contest_detail(contest_id):
         
         cursor = connection.cursor()
         
-        # 获取基础信息
-        cursor.execute('SELECT * FROM contests WHERE id = %s', (contest_id,))
-        contest = cursor.fetchone()
+        # 一条语句取出基础信息及预算、场地、人员、设备、物资
+        contest = fetch_contest_document(cursor, contest_id)
+        
+        cursor.close()
+        connection.close()
         
         if not contest:
-            cursor.close()
-            connection.close()
             return jsonify({
                 'success': False,
                 'message': '赛事不存在'
             }), 404
         
-        # 转换日期时间
-        for key, value in contest.items():
-            if isinstance(value, datetime):
-                contest[key] = value.isoformat()
-        
-        # 获取预算信息
-        cursor.execute('SELECT * FROM contest_budget WHERE contest_id = %s', (contest_id,))
-        budget = cursor.fetchall()
-        
-        # 获取场地信息
-        cursor.execute('SELECT * FROM contest_venues WHERE contest_id = %s', (contest_id,))
-        venues = cursor.fetchall()
-        
-        # 解析场地设施JSON
-        for venue in venues:
-            if venue.get('facilities'):
-                try:
-                    venue['facilities'] = json.loads(venue['facilities'])
-                except:
-                    venue['facilities'] = []
-        
-        # 获取人员信息
-        cursor.execute('SELECT * FROM contest_personnel WHERE contest_id = %s', (contest_id,))
-        personnel = cursor.fetchall()
-        
-        # 获取设备信息
-        cursor.execute('SELECT * FROM contest_equipment WHERE contest_id = %s', (contest_id,))
-        equipment = cursor.fetchall()
-        
-        # 获取物资信息
-        cursor.execute('SELECT * FROM contest_materials WHERE contest_id = %s', (contest_id,))
-        materials = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             'success': True,
-            'data': {
-                **contest,
-                'budget': budget,
-                'venues': venues,
-                'personnel': personnel,
-                'equipment': equipment,
-                'materials': materials
-            }
+            'data': contest
         }), 200
         
     except Exception as e:
@@ -493,17 +594,20 @@ def review_contest(contest_id):
         """, (contest_id, reviewer_name, result, comment, 
               compliance_check, budget_check, resource_check))
         
-        # 3. 创建通知
-        notification_title = f"赛事审核{'通过' if result == 'approved' else '驳回'}"
-        notification_content = f"您的赛事已被{'通过' if result == 'approved' else '驳回'}。{comment}"
-        
-        cursor.execute("""
-            INSERT INTO contest_notifications 
-            (contest_id, notification_type, title, content)
-            VALUES (%s, %s, %s, %s)
-        """, (contest_id, 'review_result', notification_title, notification_content))
+        # 审核通过时通知所有报名学生和团队成员（后台扇出）
+        if result == 'approved':
+            fanout.enqueue(cursor, contest_id, 'review_result', '赛事已通过审核',
+                           f"您关注的赛事已通过审核并正式发布。{comment}")
         
         connection.commit()
+        bump_versions(cursor, 'contests', 'contest_reviews')
+        if result == 'approved':
+            fanout.wake()
+        
+        # 3. 创建通知（写后队列批量落库）
+        notification_title = f"赛事审核{'通过' if result == 'approved' else '驳回'}"
+        notification_content = f"您的赛事已被{'通过' if result == 'approved' else '驳回'}。{comment}"
+        notification_queue.submit((contest_id, 'review_result', notification_title, notification_content, None))
         cursor.close()
         connection.close()
         
@@ -523,6 +627,75 @@ def review_contest(contest_id):
         }), 500
 
 
+# 赛事改期
+@app.route('/api/contests/<int:contest_id>/reschedule', methods=['POST'])
+def reschedule_contest(contest_id):
+    """
+    修改赛事时间，并通知所有报名学生和团队成员（后台扇出，不阻塞请求）
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        start_date = data.get('startDate')
+        end_date = data.get('endDate')
+        reason = data.get('reason', '')
+        
+        if not start_date or not end_date:
+            return jsonify({
+                'success': False,
+                'message': '开始时间和结束时间是必填的'
+            }), 400
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT name FROM contests WHERE id = %s FOR UPDATE', (contest_id,))
+            contest = cursor.fetchone()
+            if not contest:
+                connection.rollback()
+                return jsonify({
+                    'success': False,
+                    'message': '赛事不存在'
+                }), 404
+            
+            cursor.execute("""
+                UPDATE contests
+                SET start_date = %s,
+                    end_date = %s,
+                    registration_start = COALESCE(%s, registration_start),
+                    registration_end = COALESCE(%s, registration_end)
+                WHERE id = %s
+            """, (start_date, end_date, data.get('registrationStart'), data.get('registrationEnd'), contest_id))
+            
+            fanout.enqueue(cursor, contest_id, 'schedule_change', '赛事时间调整',
+                           f"赛事「{contest['name']}」时间调整为 {start_date} 至 {end_date}。{reason}")
+            
+            connection.commit()
+            bump_versions(cursor, 'contests')
+        finally:
+            cursor.close()
+            connection.close()
+        
+        fanout.wake()
+        
+        return jsonify({
+            'success': True,
+            'message': '赛事时间已调整，正在通知报名学生'
+        }), 200
+        
+    except Exception as e:
+        print(f"赛事改期错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'赛事改期失败: {str(e)}'
+        }), 500
+
+
 @app.route('/api/reviews', methods=['GET'])
 def get_reviews():
     """
@@ -530,6 +703,7 @@ def get_reviews():
     """
     try:
         status = request.args.get('status', 'all')  # all, pending, approved, rejected
+        reviews_table = archive.source('contest_reviews', archive.include_archived(request.args.get('include_archived')))
         
         connection = get_connection()
         if not connection:
@@ -541,16 +715,16 @@ def get_reviews():
         cursor = connection.cursor()
         
         if status == 'all':
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT r.*, c.name as contest_name 
-                FROM contest_reviews r 
+                FROM {reviews_table} r 
                 LEFT JOIN contests c ON r.contest_id = c.id 
                 ORDER BY r.review_time DESC
             """)
         else:
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT r.*, c.name as contest_name 
-                FROM contest_reviews r 
+                FROM {reviews_table} r 
                 LEFT JOIN contests c ON r.contest_id = c.id 
                 WHERE r.review_result = %s 
                 ORDER BY r.review_time DESC
@@ -580,6 +754,7 @@ def get_reviews():
 
 
 @app.route('/api/reviews/stats', methods=['GET'])
+@deadline(15)
 def get_review_stats():
     """
     获取审核统计数据
@@ -655,9 +830,11 @@ def get_conflicts(contest_id):
         cursor = connection.cursor()
         
         # 获取该赛事的所有冲突
-        cursor.execute("""
+        conflicts_table = archive.source('contest_conflicts',
+                                         archive.include_archived(request.args.get('include_archived')))
+        cursor.execute(f"""
             SELECT cf.*, c.name as conflict_with_name 
-            FROM contest_conflicts cf 
+            FROM {conflicts_table} cf 
             LEFT JOIN contests c ON cf.conflict_with_id = c.id 
             WHERE cf.contest_id = %s 
             ORDER BY cf.severity DESC, cf.detected_time DESC
@@ -688,12 +865,24 @@ def get_conflicts(contest_id):
 
 
 @app.route('/api/contests/<int:contest_id>/detect-conflicts', methods=['POST'])
+@heavy
 def detect_conflicts(contest_id):
     """
     检测赛事冲突
     自动检测时间、场地、资源冲突
+    传 async=1 时登记为后台任务，立即返回任务ID
     """
+    connection = None
     try:
+        data = request.get_json(silent=True) or {}
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            job_id = jobs.enqueue('detect_conflicts', {'contest_id': contest_id})
+            return jsonify({
+                'success': True,
+                'message': '冲突检测任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
+
         connection = get_connection()
         if not connection:
             return jsonify({
@@ -702,118 +891,16 @@ def detect_conflicts(contest_id):
             }), 500
         
         cursor = connection.cursor()
+        detected_conflicts = conflicts.detect_contest_conflicts(connection, cursor, contest_id)
+        cursor.close()
+        connection.close()
         
-        # 获取当前赛事信息
-        cursor.execute('SELECT * FROM contests WHERE id = %s', (contest_id,))
-        current_contest = cursor.fetchone()
-        
-        if not current_contest:
-            cursor.close()
-            connection.close()
+        if detected_conflicts is None:
             return jsonify({
                 'success': False,
                 'message': '赛事不存在'
             }), 404
         
-        detected_conflicts = []
-        
-        # 1. 检测时间冲突
-        if current_contest['start_date'] and current_contest['end_date']:
-            cursor.execute("""
-                SELECT id, name, start_date, end_date 
-                FROM contests 
-                WHERE id != %s 
-                AND status != 'rejected'
-                AND start_date IS NOT NULL 
-                AND end_date IS NOT NULL
-                AND (
-                    (start_date <= %s AND end_date >= %s) OR
-                    (start_date <= %s AND end_date >= %s) OR
-                    (start_date >= %s AND end_date <= %s)
-                )
-            """, (contest_id, 
-                  current_contest['start_date'], current_contest['start_date'],
-                  current_contest['end_date'], current_contest['end_date'],
-                  current_contest['start_date'], current_contest['end_date']))
-            
-            time_conflicts = cursor.fetchall()
-            
-            for conflict in time_conflicts:
-                detected_conflicts.append({
-                    'type': 'time',
-                    'with_id': conflict['id'],
-                    'with_name': conflict['name'],
-                    'description': f"与赛事《{conflict['name']}》时间冲突",
-                    'severity': 'high'
-                })
-        
-        # 2. 检测场地冲突
-        cursor.execute("""
-            SELECT name, address 
-            FROM contest_venues 
-            WHERE contest_id = %s
-        """, (contest_id,))
-        
-        current_venues = cursor.fetchall()
-        
-        for venue in current_venues:
-            cursor.execute("""
-                SELECT DISTINCT c.id, c.name 
-                FROM contest_venues v 
-                JOIN contests c ON v.contest_id = c.id 
-                WHERE c.id != %s 
-                AND c.status != 'rejected'
-                AND (v.name = %s OR v.address = %s)
-                AND c.start_date IS NOT NULL 
-                AND c.end_date IS NOT NULL
-                AND (
-                    (c.start_date <= %s AND c.end_date >= %s) OR
-                    (c.start_date <= %s AND c.end_date >= %s)
-                )
-            """, (contest_id, venue['name'], venue['address'],
-                  current_contest['start_date'], current_contest['start_date'],
-                  current_contest['end_date'], current_contest['end_date']))
-            
-            venue_conflicts = cursor.fetchall()
-            
-            for conflict in venue_conflicts:
-                detected_conflicts.append({
-                    'type': 'venue',
-                    'with_id': conflict['id'],
-                    'with_name': conflict['name'],
-                    'description': f"场地《{venue['name']}》与赛事《{conflict['name']}》冲突",
-                    'severity': 'high'
-                })
-        
-        # 3. 保存检测到的冲突
-        connection.begin()
-        
-        # 先删除旧的未解决冲突
-        cursor.execute("""
-            DELETE FROM contest_conflicts 
-            WHERE contest_id = %s AND is_resolved = FALSE
-        """, (contest_id,))
-        
-        # 插入新检测到的冲突
-        for conflict in detected_conflicts:
-            cursor.execute("""
-                INSERT INTO contest_conflicts 
-                (contest_id, conflict_type, conflict_with_id, conflict_description, severity)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (contest_id, conflict['type'], conflict['with_id'], 
-                  conflict['description'], conflict['severity']))
-            
-            # 如果有冲突，创建通知
-            cursor.execute("""
-                INSERT INTO contest_notifications 
-                (contest_id, notification_type, title, content)
-                VALUES (%s, %s, %s, %s)
-            """, (contest_id, 'conflict_alert', '检测到冲突', conflict['description']))
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             'success': True,
             'message': f'冲突检测完成，发现 {len(detected_conflicts)} 个冲突',
@@ -859,6 +946,7 @@ def resolve_conflict(conflict_id):
         """, (resolution, conflict_id))
         
         connection.commit()
+        bump_versions(cursor, 'contest_conflicts')
         cursor.close()
         connection.close()
         
@@ -875,834 +963,1926 @@ def resolve_conflict(conflict_id):
         }), 500
 
 
-# ==================== 通知管理 API ====================
-
-@app.route('/api/notifications', methods=['GET'])
-def get_notifications():
+@app.route('/api/conflicts/detect-personnel', methods=['POST'])
+@heavy
+def detect_personnel_conflicts():
     """
-    获取通知列表
+    全量检测人员冲突（同一人员 / 评审专家被安排到时间重叠的赛事）
+    传 async=1 时登记为后台任务，立即返回任务ID
     """
+    connection = None
     try:
-        recipient = request.args.get('recipient')
-        is_read = request.args.get('is_read')
-        
+        data = request.get_json(silent=True) or {}
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            job_id = jobs.enqueue('detect_personnel_conflicts', {})
+            return jsonify({
+                'success': True,
+                'message': '人员冲突检测任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
+
         connection = get_connection()
         if not connection:
             return jsonify({
                 'success': False,
                 'message': '数据库连接失败'
             }), 500
-        
+
         cursor = connection.cursor()
-        
-        query = "SELECT * FROM contest_notifications WHERE 1=1"
-        params = []
-        
-        if recipient:
-            query += " AND recipient = %s"
-            params.append(recipient)
-        
-        if is_read is not None:
-            query += " AND is_read = %s"
-            params.append(bool(int(is_read)))
-        
-        query += " ORDER BY created_time DESC"
-        
-        cursor.execute(query, params)
-        notifications = cursor.fetchall()
-        
-        # 转换日期时间
-        for notification in notifications:
-            if isinstance(notification.get('created_time'), datetime):
-                notification['created_time'] = notification['created_time'].isoformat()
-        
+        summary = conflicts.detect_personnel_conflicts(connection, cursor)
         cursor.close()
         connection.close()
-        
+
         return jsonify({
             'success': True,
-            'data': notifications
+            'message': f"人员冲突检测完成，新增 {summary['conflicts_added']} 个冲突，"
+                       f"自动解决 {summary['conflicts_resolved']} 个",
+            'data': summary
         }), 200
-        
+
     except Exception as e:
-        print(f"获取通知错误: {e}")
+        if connection:
+            connection.rollback()
+            connection.close()
+        print(f"检测人员冲突错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取通知失败: {str(e)}'
+            'message': f'检测人员冲突失败: {str(e)}'
         }), 500
 
 
-# ==================== 学生管理API ====================
-
-# 获取报名列表
-@app.route('/api/registrations', methods=['GET'])
-def get_registrations():
-    """获取报名列表"""
+@app.route('/api/conflicts/detect-resources', methods=['POST'])
+@heavy
+def detect_resource_conflicts():
+    """
+    全量检测设备冲突（时间重叠的赛事对同一设备的合计需求超过库存）
+    传 async=1 时登记为后台任务，立即返回任务ID
+    """
+    connection = None
     try:
-        status = request.args.get('status', None)
-        
+        data = request.get_json(silent=True) or {}
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            job_id = jobs.enqueue('detect_resource_conflicts', {})
+            return jsonify({
+                'success': True,
+                'message': '设备冲突检测任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
+
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
         cursor = connection.cursor()
-        
-        if status:
-            query = """
-                SELECT r.*, c.name as contest_name
-                FROM contest_registrations r
-                LEFT JOIN contests c ON r.contest_id = c.id
-                WHERE r.status = %s
-                ORDER BY r.applied_at DESC
-            """
-            cursor.execute(query, (status,))
-        else:
-            query = """
-                SELECT r.*, c.name as contest_name
-                FROM contest_registrations r
-                LEFT JOIN contests c ON r.contest_id = c.id
-                ORDER BY r.applied_at DESC
-            """
-            cursor.execute(query)
-        
-        registrations = cursor.fetchall()
-        
-        # 处理JSON字段
-        for reg in registrations:
-            if reg.get('skills'):
-                import json
-                reg['skills'] = json.loads(reg['skills']) if isinstance(reg['skills'], str) else reg['skills']
-            # 转换时间为字符串
-            if reg.get('applied_at'):
-                reg['applied_at'] = reg['applied_at'].isoformat() if hasattr(reg['applied_at'], 'isoformat') else str(reg['applied_at'])
-            if reg.get('reviewed_at'):
-                reg['reviewed_at'] = reg['reviewed_at'].isoformat() if hasattr(reg['reviewed_at'], 'isoformat') else str(reg['reviewed_at'])
-        
+        summary = conflicts.detect_resource_conflicts(connection, cursor)
         cursor.close()
         connection.close()
-        
+
         return jsonify({
             'success': True,
-            'data': registrations
+            'message': f"设备冲突检测完成，新增 {summary['conflicts_added']} 个冲突，"
+                       f"自动解决 {summary['conflicts_resolved']} 个",
+            'data': summary
         }), 200
-        
+
     except Exception as e:
-        print(f"获取报名列表错误: {e}")
+        if connection:
+            connection.rollback()
+            connection.close()
+        print(f"检测设备冲突错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取报名列表失败: {str(e)}'
+            'message': f'检测设备冲突失败: {str(e)}'
         }), 500
 
 
-# 审核报名（通过）
-@app.route('/api/registrations/<int:registration_id>/approve', methods=['POST'])
-def approve_registration(registration_id):
-    """审核通过报名"""
+@app.route('/api/conflicts/check-capacity', methods=['POST'])
+@heavy
+def check_capacity_conflicts():
+    """
+    全量校验场地容量（已通过报名数超过场地总容量）
+    传 async=1 时登记为后台任务，立即返回任务ID
+    """
+    connection = None
     try:
-        data = request.json or {}
-        reviewer_name = data.get('reviewer_name', '管理员')
-        
+        data = request.get_json(silent=True) or {}
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            job_id = jobs.enqueue('detect_capacity_conflicts', {})
+            return jsonify({
+                'success': True,
+                'message': '场地容量校验任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
+
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
         cursor = connection.cursor()
-        
-        cursor.execute("""
-            UPDATE contest_registrations
-            SET status = 'approved',
-                reviewed_at = CURRENT_TIMESTAMP,
-                reviewer_name = %s
-            WHERE id = %s
-        """, (reviewer_name, registration_id))
-        
-        connection.commit()
+        summary = conflicts.detect_capacity_conflicts(connection, cursor)
         cursor.close()
         connection.close()
-        
+
         return jsonify({
             'success': True,
-            'message': '审核通过'
+            'message': f"场地容量校验完成，新增 {summary['conflicts_added']} 个冲突，"
+                       f"自动解决 {summary['conflicts_resolved']} 个",
+            'data': summary
         }), 200
-        
+
     except Exception as e:
-        print(f"审核通过错误: {e}")
+        if connection:
+            connection.rollback()
+            connection.close()
+        print(f"校验场地容量错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'审核通过失败: {str(e)}'
+            'message': f'校验场地容量失败: {str(e)}'
         }), 500
 
 
-# 审核报名（驳回）
-@app.route('/api/registrations/<int:registration_id>/reject', methods=['POST'])
-def reject_registration(registration_id):
-    """驳回报名"""
+# 获取设备库存
+@app.route('/api/equipment-inventory', methods=['GET'])
+@conditional('equipment_inventory')
+def get_equipment_inventory():
+    """获取共享设备库存列表"""
     try:
-        data = request.json
-        reject_reason = data.get('reason', '')
-        reviewer_name = data.get('reviewer_name', '管理员')
-        
-        if not reject_reason:
+        connection = get_connection()
+        if not connection:
             return jsonify({
                 'success': False,
-                'message': '请填写驳回原因'
-            }), 400
-        
-        connection = get_connection()
+                'message': '数据库连接失败'
+            }), 500
+
         cursor = connection.cursor()
-        
-        cursor.execute("""
-            UPDATE contest_registrations
-            SET status = 'rejected',
-                reject_reason = %s,
-                reviewed_at = CURRENT_TIMESTAMP,
-                reviewer_name = %s
-            WHERE id = %s
-        """, (reject_reason, reviewer_name, registration_id))
-        
-        connection.commit()
+        cursor.execute('SELECT * FROM equipment_inventory ORDER BY name')
+        items = cursor.fetchall()
         cursor.close()
         connection.close()
-        
+
+        for item in items:
+            for key, value in item.items():
+                if isinstance(value, datetime):
+                    item[key] = value.isoformat()
+
         return jsonify({
             'success': True,
-            'message': '已驳回'
+            'data': items
         }), 200
-        
+
     except Exception as e:
-        print(f"驳回报名错误: {e}")
+        print(f"获取设备库存错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'驳回报名失败: {str(e)}'
+            'message': f'获取设备库存失败: {str(e)}'
         }), 500
 
 
-# 批量审核通过
-@app.route('/api/registrations/batch-approve', methods=['POST'])
-def batch_approve_registrations():
-    """批量审核通过"""
+# 登记设备库存
+@app.route('/api/equipment-inventory', methods=['POST'])
+def save_equipment_inventory():
+    """新增或更新设备库存（按设备名称）"""
     try:
-        data = request.json
-        ids = data.get('ids', [])
-        reviewer_name = data.get('reviewer_name', '管理员')
-        
-        if not ids:
+        data = request.get_json(silent=True) or {}
+        name = (data.get('name') or '').strip()
+        total_quantity = data.get('total_quantity')
+
+        if not name or not isinstance(total_quantity, int) or total_quantity < 0:
             return jsonify({
                 'success': False,
-                'message': '请选择要审核的报名'
+                'message': '请填写设备名称和库存数量（非负整数）'
             }), 400
-        
+
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
         cursor = connection.cursor()
-        
-        placeholders = ','.join(['%s'] * len(ids))
-        cursor.execute(f"""
-            UPDATE contest_registrations
-            SET status = 'approved',
-                reviewed_at = CURRENT_TIMESTAMP,
-                reviewer_name = %s
-            WHERE id IN ({placeholders})
-        """, [reviewer_name] + ids)
-        
+        cursor.execute("""
+            INSERT INTO equipment_inventory (name, total_quantity, description)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                total_quantity = VALUES(total_quantity),
+                description = COALESCE(VALUES(description), description)
+        """, (name, total_quantity, data.get('description')))
         connection.commit()
-        affected_rows = cursor.rowcount
+        bump_versions(cursor, 'equipment_inventory')
         cursor.close()
         connection.close()
-        
+
         return jsonify({
             'success': True,
-            'message': f'已批量审核通过 {affected_rows} 个报名'
+            'message': '设备库存已保存，可执行设备冲突检测更新冲突记录'
         }), 200
-        
+
     except Exception as e:
-        print(f"批量审核错误: {e}")
+        print(f"保存设备库存错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'批量审核失败: {str(e)}'
+            'message': f'保存设备库存失败: {str(e)}'
         }), 500
 
 
-# 获取团队列表
-@app.route('/api/teams', methods=['GET'])
-def get_teams():
-    """获取团队列表"""
+# ==================== 通知管理 API ====================
+
+@app.route('/api/notifications', methods=['GET'])
+def get_notifications():
+    """
+    获取通知列表
+    """
     try:
-        contest_id = request.args.get('contest_id', None)
+        recipient = request.args.get('recipient')
+        is_read = request.args.get('is_read')
         
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
         cursor = connection.cursor()
         
-        if contest_id:
-            cursor.execute("""
-                SELECT t.*, c.name as contest_name
-                FROM contest_teams t
-                LEFT JOIN contests c ON t.contest_id = c.id
-                WHERE t.contest_id = %s AND t.status != 'disbanded'
-                ORDER BY t.created_at DESC
-            """, (contest_id,))
-        else:
-            cursor.execute("""
-                SELECT t.*, c.name as contest_name
-                FROM contest_teams t
-                LEFT JOIN contests c ON t.contest_id = c.id
-                WHERE t.status != 'disbanded'
-                ORDER BY t.created_at DESC
-            """)
+        notifications_table = archive.source('contest_notifications',
+                                             archive.include_archived(request.args.get('include_archived')))
+        query = f"SELECT * FROM {notifications_table} n WHERE 1=1"
+        params = []
         
-        teams = cursor.fetchall()
+        if recipient:
+            query += " AND recipient = %s"
+            params.append(recipient)
         
-        # 获取每个团队的成员
-        for team in teams:
-            cursor.execute("""
-                SELECT * FROM team_members
-                WHERE team_id = %s
-            """, (team['id'],))
-            members = cursor.fetchall()
-            team['members'] = members
-            
-            # 处理JSON字段
-            import json
-            if team.get('skills'):
-                team['skills'] = json.loads(team['skills']) if isinstance(team['skills'], str) else team['skills']
-            if team.get('achievements'):
-                team['achievements'] = json.loads(team['achievements']) if isinstance(team['achievements'], str) else team['achievements']
-            
-            # 转换时间
-            if team.get('created_at'):
-                team['created_at'] = team['created_at'].isoformat() if hasattr(team['created_at'], 'isoformat') else str(team['created_at'])
-            if team.get('updated_at'):
-                team['updated_at'] = team['updated_at'].isoformat() if hasattr(team['updated_at'], 'isoformat') else str(team['updated_at'])
-            
-            for member in members:
-                if member.get('joined_at'):
-                    member['joined_at'] = member['joined_at'].isoformat() if hasattr(member['joined_at'], 'isoformat') else str(member['joined_at'])
+        if is_read is not None:
+            query += " AND is_read = %s"
+            params.append(bool(int(is_read)))
+        
+        query += " ORDER BY created_time DESC"
+        
+        cursor.execute(query, params)
+        notifications = cursor.fetchall()
+        
+        # 转换日期时间
+        for notification in notifications:
+            if isinstance(notification.get('created_time'), datetime):
+                notification['created_time'] = notification['created_time'].isoformat()
         
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'data': teams
+            'data': notifications
         }), 200
         
     except Exception as e:
-        print(f"获取团队列表错误: {e}")
+        print(f"获取通知错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取团队列表失败: {str(e)}'
+            'message': f'获取通知失败: {str(e)}'
         }), 500
 
 
-# 移除团队成员
-@app.route('/api/teams/<int:team_id>/members/<int:member_id>', methods=['DELETE'])
-def remove_team_member(team_id, member_id):
-    """移除团队成员"""
+# ==================== 学生管理API ====================
+
+# 获取报名列表
+@app.route('/api/registrations', methods=['GET'])
+def get_registrations():
+    """获取报名列表"""
     try:
+        status = request.args.get('status', None)
+        registrations_table = archive.source('contest_registrations',
+                                             archive.include_archived(request.args.get('include_archived')))
+        
+        try:
+            columns = select_columns('contest_registrations', 'r', request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
         cursor = connection.cursor()
         
-        # 删除成员
-        cursor.execute("DELETE FROM team_members WHERE id = %s AND team_id = %s", (member_id, team_id))
+        if status:
+            query = f"""
+                SELECT {columns}, c.name as contest_name
+                FROM {registrations_table} r
+                LEFT JOIN contests c ON r.contest_id = c.id
+                WHERE r.status = %s
+                ORDER BY r.applied_at DESC
+            """
+            cursor.execute(query, (status,))
+        else:
+            query = f"""
+                SELECT {columns}, c.name as contest_name
+                FROM {registrations_table} r
+                LEFT JOIN contests c ON r.contest_id = c.id
+                ORDER BY r.applied_at DESC
+            """
+            cursor.execute(query)
         
-        # 更新团队成员数量
-        cursor.execute("UPDATE contest_teams SET member_count = member_count - 1 WHERE id = %s", (team_id,))
+        registrations = cursor.fetchall()
+        
+        # 处理JSON字段
+        for reg in registrations:
+            if reg.get('skills'):
+                import json
+                reg['skills'] = json.loads(reg['skills']) if isinstance(reg['skills'], str) else reg['skills']
+            # 转换时间为字符串
+            if reg.get('applied_at'):
+                reg['applied_at'] = reg['applied_at'].isoformat() if hasattr(reg['applied_at'], 'isoformat') else str(reg['applied_at'])
+            if reg.get('reviewed_at'):
+                reg['reviewed_at'] = reg['reviewed_at'].isoformat() if hasattr(reg['reviewed_at'], 'isoformat') else str(reg['reviewed_at'])
         
-        connection.commit()
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'message': '成员已移除'
+            'data': registrations
         }), 200
         
     except Exception as e:
-        print(f"移除成员错误: {e}")
+        print(f"获取报名列表错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'移除成员失败: {str(e)}'
+            'message': f'获取报名列表失败: {str(e)}'
         }), 500
 
 
-# 解散团队
-@app.route('/api/teams/<int:team_id>', methods=['DELETE'])
-def disband_team(team_id):
-    """解散团队"""
+# 提交报名
+@app.route('/api/contests/<int:contest_id>/registrations', methods=['POST'])
+def submit_registration(contest_id):
+    """
+    学生提交报名
+    报名进入写后队列，与同一时刻的其他报名合并为一个事务提交（先按赛事ID顺序锁定本批涉及的赛事行）；
+    每条报名先用条件 UPDATE 原子占用名额，再插入报名（唯一键 (contest_id, student_id) 去重），
+    名额已满、不在报名时间内或重复报名时回滚到该条的 SAVEPOINT。10 秒内未确认时返回 202（处理中）。
+    """
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
+        data = request.get_json(silent=True) or {}
         
-        # 标记为已解散
-        cursor.execute("UPDATE contest_teams SET status = 'disbanded' WHERE id = %s", (team_id,))
+        if not all([data.get('student_name'), data.get('student_id'), data.get('email')]):
+            return jsonify({
+                'success': False,
+                'message': '姓名、学号和邮箱是必填的'
+            }), 400
         
-        connection.commit()
-        cursor.close()
-        connection.close()
+        try:
+            status, registration_id = registration_queue.submit(
+                build_registration(contest_id, data), wait=True, timeout=10
+            )
+        except QueueFullError:
+            return jsonify({
+                'success': False,
+                'message': '报名人数过多，请稍后重试'
+            }), 503
+        except TimeoutError:
+            # 报名仍在队列中，稍后可能提交成功：不能按失败处理
+            return jsonify({
+                'success': True,
+                'message': '报名正在处理中，请稍后在报名记录中确认结果',
+                'data': {'status': 'pending'}
+            }), 202
         
-        return jsonify({
-            'success': True,
-            'message': '团队已解散'
-        }), 200
-        
-    except Exception as e:
-        print(f"解散团队错误: {e}")
-        return jsonify({
-            'success': False,
-            'message': f'解散团队失败: {str(e)}'
-        }), 500
-
-
-# 获取学生列表
-@app.route('/api/students', methods=['GET'])
-def get_students():
-    """获取学生列表"""
-    try:
-        grade = request.args.get('grade', None)
-        major = request.args.get('major', None)
-        
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        query = "SELECT * FROM students WHERE 1=1"
-        params = []
-        
-        if grade:
-            query += " AND grade = %s"
-            params.append(grade)
-        
-        if major:
-            query += " AND major = %s"
-            params.append(major)
-        
-        query += " ORDER BY created_at DESC"
+        if status == REGISTRATION_NO_CONTEST:
+            return jsonify({
+                'success': False,
+                'message': '赛事不存在'
+            }), 404
         
-        cursor.execute(query, params)
-        students = cursor.fetchall()
+        if status == REGISTRATION_DUPLICATE:
+            return jsonify({
+                'success': False,
+                'message': '您已报名该赛事'
+            }), 409
         
-        # 为每个学生获取报名和团队信息
-        for student in students:
-            # 获取报名记录
-            cursor.execute("""
-                SELECT r.id, r.contest_id, c.name as name, r.status
-                FROM contest_registrations r
-                LEFT JOIN contests c ON r.contest_id = c.id
-                WHERE r.student_id = %s
-            """, (student['student_id'],))
-            student['registeredContests'] = cursor.fetchall()
-            
-            # 获取团队信息
-            cursor.execute("""
-                SELECT tm.team_id, t.name, tm.role
-                FROM team_members tm
-                LEFT JOIN contest_teams t ON tm.team_id = t.id
-                WHERE tm.student_id = %s AND t.status != 'disbanded'
-            """, (student['student_id'],))
-            student['teams'] = cursor.fetchall()
-            
-            # 处理JSON字段
-            import json
-            if student.get('skills'):
-                student['skills'] = json.loads(student['skills']) if isinstance(student['skills'], str) else student['skills']
-            if student.get('achievements'):
-                student['achievements'] = json.loads(student['achievements']) if isinstance(student['achievements'], str) else student['achievements']
-            
-            # 转换时间
-            if student.get('created_at'):
-                student['created_at'] = student['created_at'].isoformat() if hasattr(student['created_at'], 'isoformat') else str(student['created_at'])
-            if student.get('updated_at'):
-                student['updated_at'] = student['updated_at'].isoformat() if hasattr(student['updated_at'], 'isoformat') else str(student['updated_at'])
+        if status == REGISTRATION_CLOSED:
+            return jsonify({
+                'success': False,
+                'message': '当前不在报名时间内'
+            }), 403
         
-        cursor.close()
-        connection.close()
+        if status == REGISTRATION_FULL:
+            return jsonify({
+                'success': False,
+                'message': '报名名额已满'
+            }), 409
         
         return jsonify({
             'success': True,
-            'data': students
-        }), 200
+            'message': '报名成功',
+            'data': {'id': registration_id}
+        }), 201
         
     except Exception as e:
-        print(f"获取学生列表错误: {e}")
+        print(f"提交报名错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取学生列表失败: {str(e)}'
+            'message': f'提交报名失败: {str(e)}'
         }), 500
 
 
-# 获取学生详情
-@app.route('/api/students/<student_id>', methods=['GET'])
-def get_student_detail(student_id):
-    """获取学生详情"""
+# 审核报名（通过）
+@app.route('/api/registrations/<int:registration_id>/approve', methods=['POST'])
+def approve_registration(registration_id):
+    """审核通过报名"""
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
-        student = cursor.fetchone()
+        data = request.json or {}
+        reviewer_name = data.get('reviewer_name', '管理员')
         
-        if not student:
+        connection = get_connection()
+        if not connection:
             return jsonify({
                 'success': False,
-                'message': '学生不存在'
-            }), 404
-        
-        # 获取报名记录
-        cursor.execute("""
-            SELECT r.*, c.name as contest_name
-            FROM contest_registrations r
-            LEFT JOIN contests c ON r.contest_id = c.id
-            WHERE r.student_id = %s
-        """, (student_id,))
-        student['registeredContests'] = cursor.fetchall()
+                'message': '数据库连接失败'
+            }), 500
         
-        # 获取团队信息
-        cursor.execute("""
-            SELECT tm.*, t.name as team_name
-            FROM team_members tm
-            LEFT JOIN contest_teams t ON tm.team_id = t.id
-            WHERE tm.student_id = %s AND t.status != 'disbanded'
-        """, (student_id,))
-        student['teams'] = cursor.fetchall()
+        cursor = connection.cursor()
         
-        # 处理JSON字段
-        import json
-        if student.get('skills'):
-            student['skills'] = json.loads(student['skills']) if isinstance(student['skills'], str) else student['skills']
-        if student.get('achievements'):
-            student['achievements'] = json.loads(student['achievements']) if isinstance(student['achievements'], str) else student['achievements']
+        _, changed_tables = review_registrations(cursor, [registration_id], 'approved', reviewer_name)
         
+        connection.commit()
+        dashboard.mark_dirty_by(cursor, 'contest_registrations', [registration_id])
+        bump_versions(cursor, *changed_tables)
+        conflicts.check_capacity_by(connection, cursor, [registration_id])
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'data': student
+            'message': '审核通过'
         }), 200
         
     except Exception as e:
-        print(f"获取学生详情错误: {e}")
+        print(f"审核通过错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取学生详情失败: {str(e)}'
+            'message': f'审核通过失败: {str(e)}'
         }), 500
 
 
-# ==================== 评审管理API ====================
-
-# 获取专家列表
-@app.route('/api/experts', methods=['GET'])
-def get_experts():
-    """获取专家列表"""
+# 审核报名（驳回）
+@app.route('/api/registrations/<int:registration_id>/reject', methods=['POST'])
+def reject_registration(registration_id):
+    """驳回报名"""
     try:
-        field = request.args.get('field', None)
-        status = request.args.get('status', 'active')
-        
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        query = "SELECT * FROM experts WHERE status = %s"
-        params = [status]
+        data = request.json
+        reject_reason = data.get('reason', '')
+        reviewer_name = data.get('reviewer_name', '管理员')
         
-        if field:
-            query += " AND field = %s"
-            params.append(field)
+        if not reject_reason:
+            return jsonify({
+                'success': False,
+                'message': '请填写驳回原因'
+            }), 400
         
-        query += " ORDER BY rating DESC, review_count DESC"
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        cursor.execute(query, params)
-        experts = cursor.fetchall()
+        cursor = connection.cursor()
         
-        # 处理JSON字段
-        import json
-        for expert in experts:
-            if expert.get('expertise'):
-                expert['expertise'] = json.loads(expert['expertise']) if isinstance(expert['expertise'], str) else expert['expertise']
-            if expert.get('created_at'):
-                expert['created_at'] = expert['created_at'].isoformat() if hasattr(expert['created_at'], 'isoformat') else str(expert['created_at'])
-            if expert.get('updated_at'):
-                expert['updated_at'] = expert['updated_at'].isoformat() if hasattr(expert['updated_at'], 'isoformat') else str(expert['updated_at'])
+        _, changed_tables = review_registrations(cursor, [registration_id], 'rejected', reviewer_name,
+                                                 reject_reason)
         
+        connection.commit()
+        dashboard.mark_dirty_by(cursor, 'contest_registrations', [registration_id])
+        bump_versions(cursor, *changed_tables)
+        conflicts.check_capacity_by(connection, cursor, [registration_id])
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'data': experts
+            'message': '已驳回'
         }), 200
         
     except Exception as e:
-        print(f"获取专家列表错误: {e}")
+        print(f"驳回报名错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取专家列表失败: {str(e)}'
+            'message': f'驳回报名失败: {str(e)}'
         }), 500
 
 
-# 添加专家
-@app.route('/api/experts', methods=['POST'])
-def add_expert():
-    """添加专家"""
+# 批量审核通过
+@app.route('/api/registrations/batch-approve', methods=['POST'])
+@heavy
+def batch_approve_registrations():
+    """批量审核通过"""
     try:
         data = request.json
+        ids = data.get('ids', [])
+        reviewer_name = data.get('reviewer_name', '管理员')
+        
+        if not ids:
+            return jsonify({
+                'success': False,
+                'message': '请选择要审核的报名'
+            }), 400
+        
+        # 传 async=1 时登记为后台任务分批审核，立即返回任务ID
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            job_id = jobs.enqueue('batch_approve_registrations', {'ids': ids, 'reviewer_name': reviewer_name})
+            return jsonify({
+                'success': True,
+                'message': '批量审核任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
         
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         cursor = connection.cursor()
         
-        import json
-        cursor.execute("""
-            INSERT INTO experts (name, title, organization, field, email, phone, expertise, experience, bio)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            data.get('name'),
-            data.get('title'),
-            data.get('organization'),
-            data.get('field'),
-            data.get('email'),
-            data.get('phone'),
-            json.dumps(data.get('expertise', [])),
-            data.get('experience', 0),
-            data.get('bio', '')
-        ))
+        affected_rows, changed_tables = review_registrations(cursor, ids, 'approved', reviewer_name)
         
         connection.commit()
-        expert_id = cursor.lastrowid
+        dashboard.mark_dirty_by(cursor, 'contest_registrations', ids)
+        bump_versions(cursor, *changed_tables)
+        conflicts.check_capacity_by(connection, cursor, ids)
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'message': '专家添加成功',
-            'data': {'id': expert_id}
-        }), 201
+            'message': f'已批量审核通过 {affected_rows} 个报名'
+        }), 200
         
     except Exception as e:
-        print(f"添加专家错误: {e}")
+        print(f"批量审核错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'添加专家失败: {str(e)}'
+            'message': f'批量审核失败: {str(e)}'
         }), 500
 
 
-# 获取评审分配列表
-@app.route('/api/judge-assignments', methods=['GET'])
-def get_judge_assignments():
-    """获取评审分配列表"""
+# 获取团队列表
+@app.route('/api/teams', methods=['GET'])
+@conditional('contest_teams', 'contests')
+def get_teams():
+    """获取团队列表"""
     try:
         contest_id = request.args.get('contest_id', None)
-        status = request.args.get('status', None)
         
-        connection = get_connection()
-        cursor = connection.cursor()
+        try:
+            columns = select_columns('contest_teams', 't', request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
-        query = """
-            SELECT 
-                ja.*,
-                e.name as expert_name,
-                e.title as expert_title,
-                e.organization as expert_organization,
-                c.name as contest_name
-            FROM judge_assignments ja
-            LEFT JOIN experts e ON ja.expert_id = e.id
-            LEFT JOIN contests c ON ja.contest_id = c.id
-            WHERE 1=1
-        """
-        params = []
-        
-        if contest_id:
-            query += " AND ja.contest_id = %s"
-            params.append(contest_id)
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        if status:
-            query += " AND ja.status = %s"
-            params.append(status)
+        cursor = connection.cursor()
         
-        query += " ORDER BY ja.created_at DESC"
+        if contest_id:
+            cursor.execute(f"""
+                SELECT {columns}, c.name as contest_name
+                FROM contest_teams t
+                LEFT JOIN contests c ON t.contest_id = c.id
+                WHERE t.contest_id = %s AND t.status != 'disbanded'
+                ORDER BY t.created_at DESC
+            """, (contest_id,))
+        else:
+            cursor.execute(f"""
+                SELECT {columns}, c.name as contest_name
+                FROM contest_teams t
+                LEFT JOIN contests c ON t.contest_id = c.id
+                WHERE t.status != 'disbanded'
+                ORDER BY t.created_at DESC
+            """)
         
-        cursor.execute(query, params)
-        assignments = cursor.fetchall()
+        teams = cursor.fetchall()
         
-        # 转换时间
-        for assignment in assignments:
-            if assignment.get('assigned_date'):
-                assignment['assigned_date'] = str(assignment['assigned_date'])
-            if assignment.get('submitted_at'):
-                assignment['submitted_at'] = assignment['submitted_at'].isoformat() if hasattr(assignment['submitted_at'], 'isoformat') else str(assignment['submitted_at'])
-            if assignment.get('created_at'):
-                assignment['created_at'] = assignment['created_at'].isoformat() if hasattr(assignment['created_at'], 'isoformat') else str(assignment['created_at'])
+        # 获取每个团队的成员
+        for team in teams:
+            cursor.execute("""
+                SELECT * FROM team_members
+                WHERE team_id = %s
+            """, (team['id'],))
+            members = cursor.fetchall()
+            team['members'] = members
+            
+            # 处理JSON字段
+            import json
+            if team.get('skills'):
+                team['skills'] = json.loads(team['skills']) if isinstance(team['skills'], str) else team['skills']
+            if team.get('achievements'):
+                team['achievements'] = json.loads(team['achievements']) if isinstance(team['achievements'], str) else team['achievements']
+            
+            # 转换时间
+            if team.get('created_at'):
+                team['created_at'] = team['created_at'].isoformat() if hasattr(team['created_at'], 'isoformat') else str(team['created_at'])
+            if team.get('updated_at'):
+                team['updated_at'] = team['updated_at'].isoformat() if hasattr(team['updated_at'], 'isoformat') else str(team['updated_at'])
+            
+            for member in members:
+                if member.get('joined_at'):
+                    member['joined_at'] = member['joined_at'].isoformat() if hasattr(member['joined_at'], 'isoformat') else str(member['joined_at'])
         
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'data': assignments
+            'data': teams
         }), 200
         
     except Exception as e:
-        print(f"获取评审分配错误: {e}")
+        print(f"获取团队列表错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取评审分配失败: {str(e)}'
+            'message': f'获取团队列表失败: {str(e)}'
         }), 500
 
 
-# 分配评审
-@app.route('/api/judge-assignments', methods=['POST'])
-def assign_judge():
-    """分配评审"""
+# 加入团队
+@app.route('/api/teams/<int:team_id>/members', methods=['POST'])
+def join_team(team_id):
+    """
+    学生加入团队
+    成员数通过条件 UPDATE（member_count < max_members）原子占用，并发加入不会超员
+    """
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         
-        connection = get_connection()
-        cursor = connection.cursor()
+        if not all([data.get('student_name'), data.get('student_id')]):
+            return jsonify({
+                'success': False,
+                'message': '姓名和学号是必填的'
+            }), 400
         
-        cursor.execute("""
-            INSERT INTO judge_assignments (contest_id, expert_id, role, assigned_date, status)
-            VALUES (%s, %s, %s, CURDATE(), 'pending')
-        """, (
-            data.get('contest_id'),
-            data.get('expert_id'),
-            data.get('role', 'primary')
-        ))
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        connection.commit()
-        assignment_id = cursor.lastrowid
-        cursor.close()
-        connection.close()
+        cursor = connection.cursor()
+        try:
+            status, member_id = teams.join_team(cursor, team_id, data)
+            if status != teams.TEAM_OK:
+                connection.rollback()
+                code, message = teams.TEAM_ERROR_RESPONSES[status]
+                return jsonify({
+                    'success': False,
+                    'message': message
+                }), code
+            
+            connection.commit()
+            dashboard.mark_dirty_by(cursor, 'contest_teams', [team_id])
+            bump_versions(cursor, 'contest_teams')
+        finally:
+            cursor.close()
+            connection.close()
         
         return jsonify({
             'success': True,
-            'message': '评审分配成功',
-            'data': {'id': assignment_id}
+            'message': '已加入团队',
+            'data': {'id': member_id}
         }), 201
         
     except Exception as e:
-        print(f"分配评审错误: {e}")
+        print(f"加入团队错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'分配评审失败: {str(e)}'
+            'message': f'加入团队失败: {str(e)}'
         }), 500
 
 
-# 获取竞赛结果列表
-@app.route('/api/contest-results', methods=['GET'])
-def get_contest_results():
-    """获取竞赛结果列表"""
+# 退出团队
+@app.route('/api/teams/<int:team_id>/leave', methods=['POST'])
+def leave_team(team_id):
+    """学生退出团队（队长不能退出）"""
     try:
-        contest_id = request.args.get('contest_id', None)
-        is_published = request.args.get('is_published', None)
+        data = request.get_json(silent=True) or {}
+        student_id = data.get('student_id')
         
-        connection = get_connection()
-        cursor = connection.cursor()
+        if not student_id:
+            return jsonify({
+                'success': False,
+                'message': '学号是必填的'
+            }), 400
         
-        query = """
-            SELECT 
-                cr.*,
-                c.name as contest_name
-            FROM contest_results cr
-            LEFT JOIN contests c ON cr.contest_id = c.id
-            WHERE 1=1
-        """
-        params = []
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        if contest_id:
-            query += " AND cr.contest_id = %s"
-            params.append(contest_id)
+        cursor = connection.cursor()
+        try:
+            status = teams.remove_member(cursor, team_id, student_id=student_id)
+            if status != teams.TEAM_OK:
+                connection.rollback()
+                code, message = teams.TEAM_ERROR_RESPONSES[status]
+                return jsonify({
+                    'success': False,
+                    'message': message
+                }), code
+            
+            connection.commit()
+            dashboard.mark_dirty_by(cursor, 'contest_teams', [team_id])
+            bump_versions(cursor, 'contest_teams')
+        finally:
+            cursor.close()
+            connection.close()
         
-        if is_published is not None:
-            query += " AND cr.is_published = %s"
-            params.append(1 if is_published == 'true' else 0)
+        return jsonify({
+            'success': True,
+            'message': '已退出团队'
+        }), 200
         
-        query += " ORDER BY cr.ranking ASC, cr.final_score DESC"
+    except Exception as e:
+        print(f"退出团队错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'退出团队失败: {str(e)}'
+        }), 500
+
+
+# 转队
+@app.route('/api/teams/<int:team_id>/transfer', methods=['POST'])
+def transfer_team_member(team_id):
+    """
+    把成员转到同一赛事的另一个团队
+    退出原团队与加入新团队在同一个事务中完成，目标团队已满时整体回滚
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        student_id = data.get('student_id')
+        target_team_id = data.get('target_team_id')
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        if not student_id or not isinstance(target_team_id, int):
+            return jsonify({
+                'success': False,
+                'message': '学号和目标团队ID是必填的'
+            }), 400
         
-        # 转换时间
-        for result in results:
-            if result.get('published_at'):
-                result['published_at'] = result['published_at'].isoformat() if hasattr(result['published_at'], 'isoformat') else str(result['published_at'])
-            if result.get('created_at'):
-                result['created_at'] = result['created_at'].isoformat() if hasattr(result['created_at'], 'isoformat') else str(result['created_at'])
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        cursor.close()
-        connection.close()
+        cursor = connection.cursor()
+        try:
+            status, member_id = teams.transfer_member(cursor, team_id, target_team_id, student_id,
+                                                      role=data.get('role'))
+            if status != teams.TEAM_OK:
+                connection.rollback()
+                code, message = teams.TEAM_ERROR_RESPONSES[status]
+                return jsonify({
+                    'success': False,
+                    'message': message
+                }), code
+            
+            connection.commit()
+            dashboard.mark_dirty_by(cursor, 'contest_teams', [team_id])
+            bump_versions(cursor, 'contest_teams')
+        finally:
+            cursor.close()
+            connection.close()
         
         return jsonify({
             'success': True,
-            'data': results
+            'message': '转队成功',
+            'data': {'id': member_id}
         }), 200
         
     except Exception as e:
-        print(f"获取竞赛结果错误: {e}")
+        print(f"转队错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'获取竞赛结果失败: {str(e)}'
+            'message': f'转队失败: {str(e)}'
         }), 500
 
 
-# 发布结果
-@app.route('/api/contest-results/<int:result_id>/publish', methods=['POST'])
-def publish_result(result_id):
-    """发布竞赛结果"""
+# 移除团队成员
+@app.route('/api/teams/<int:team_id>/members/<int:member_id>', methods=['DELETE'])
+def remove_team_member(team_id, member_id):
+    """移除团队成员（只有确实删除了成员才减少成员数）"""
     try:
         connection = get_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute("""
-            UPDATE contest_results
-            SET is_published = TRUE,
-                published_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """, (result_id,))
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
         
-        connection.commit()
-        cursor.close()
-        connection.close()
+        cursor = connection.cursor()
+        try:
+            status = teams.remove_member(cursor, team_id, member_id=member_id)
+            if status != teams.TEAM_OK:
+                connection.rollback()
+                code, message = teams.TEAM_ERROR_RESPONSES[status]
+                return jsonify({
+                    'success': False,
+                    'message': message
+                }), code
+            
+            connection.commit()
+            dashboard.mark_dirty_by(cursor, 'contest_teams', [team_id])
+            bump_versions(cursor, 'contest_teams')
+        finally:
+            cursor.close()
+            connection.close()
         
         return jsonify({
             'success': True,
-            'message': '结果已发布'
+            'message': '成员已移除'
         }), 200
         
     except Exception as e:
-        print(f"发布结果错误: {e}")
+        print(f"移除成员错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'发布结果失败: {str(e)}'
+            'message': f'移除成员失败: {str(e)}'
         }), 500
 
 
-# 批量发布结果
-@app.route('/api/contest-results/batch-publish', methods=['POST'])
-def batch_publish_results():
-    """批量发布结果"""
+# 解散团队
+@app.route('/api/teams/<int:team_id>', methods=['DELETE'])
+def disband_team(team_id):
+    """解散团队"""
     try:
-        data = request.json
-        contest_id = data.get('contest_id')
-        
         connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
         cursor = connection.cursor()
         
-        cursor.execute("""
-            UPDATE contest_results
-            SET is_published = TRUE,
-                published_at = CURRENT_TIMESTAMP
-            WHERE contest_id = %s AND is_published = FALSE
-        """, (contest_id,))
+        # 标记为已解散
+        cursor.execute("UPDATE contest_teams SET status = 'disbanded' WHERE id = %s", (team_id,))
         
         connection.commit()
-        affected_rows = cursor.rowcount
+        dashboard.mark_dirty_by(cursor, 'contest_teams', [team_id])
+        bump_versions(cursor, 'contest_teams')
         cursor.close()
         connection.close()
         
         return jsonify({
             'success': True,
-            'message': f'已发布 {affected_rows} 个结果'
+            'message': '团队已解散'
         }), 200
         
     except Exception as e:
-        print(f"批量发布错误: {e}")
+        print(f"解散团队错误: {e}")
         return jsonify({
             'success': False,
-            'message': f'批量发布失败: {str(e)}'
+            'message': f'解散团队失败: {str(e)}'
         }), 500
 
 
+# 获取学生列表
+@app.route('/api/students', methods=['GET'])
+def get_students():
+    """获取学生列表"""
+    try:
+        grade = request.args.get('grade', None)
+        major = request.args.get('major', None)
+        registrations_table = archive.source('contest_registrations',
+                                             archive.include_archived(request.args.get('include_archived')))
+        
+        try:
+            columns = select_columns('students', fields=request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        query = f"SELECT {columns} FROM students WHERE 1=1"
+        params = []
+        
+        if grade:
+            query += " AND grade = %s"
+            params.append(grade)
+        
+        if major:
+            query += " AND major = %s"
+            params.append(major)
+        
+        query += " ORDER BY created_at DESC"
+        
+        cursor.execute(query, params)
+        students = cursor.fetchall()
+        
+        # 为每个学生获取报名和团队信息
+        for student in students:
+            # 获取报名记录
+            cursor.execute(f"""
+                SELECT r.id, r.contest_id, c.name as name, r.status
+                FROM {registrations_table} r
+                LEFT JOIN contests c ON r.contest_id = c.id
+                WHERE r.student_id = %s
+            """, (student['student_id'],))
+            student['registeredContests'] = cursor.fetchall()
+            
+            # 获取团队信息
+            cursor.execute("""
+                SELECT tm.team_id, t.name, tm.role
+                FROM team_members tm
+                LEFT JOIN contest_teams t ON tm.team_id = t.id
+                WHERE tm.student_id = %s AND t.status != 'disbanded'
+            """, (student['student_id'],))
+            student['teams'] = cursor.fetchall()
+            
+            # 处理JSON字段
+            import json
+            if student.get('skills'):
+                student['skills'] = json.loads(student['skills']) if isinstance(student['skills'], str) else student['skills']
+            if student.get('achievements'):
+                student['achievements'] = json.loads(student['achievements']) if isinstance(student['achievements'], str) else student['achievements']
+            
+            # 转换时间
+            if student.get('created_at'):
+                student['created_at'] = student['created_at'].isoformat() if hasattr(student['created_at'], 'isoformat') else str(student['created_at'])
+            if student.get('updated_at'):
+                student['updated_at'] = student['updated_at'].isoformat() if hasattr(student['updated_at'], 'isoformat') else str(student['updated_at'])
+        
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': students
+        }), 200
+        
+    except Exception as e:
+        print(f"获取学生列表错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取学生列表失败: {str(e)}'
+        }), 500
+
+
+# 获取学生详情
+@app.route('/api/students/<student_id>', methods=['GET'])
+def get_student_detail(student_id):
+    """获取学生详情"""
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
+        student = cursor.fetchone()
+        
+        if not student:
+            return jsonify({
+                'success': False,
+                'message': '学生不存在'
+            }), 404
+        
+        # 获取报名记录
+        registrations_table = archive.source('contest_registrations',
+                                             archive.include_archived(request.args.get('include_archived')))
+        cursor.execute(f"""
+            SELECT r.*, c.name as contest_name
+            FROM {registrations_table} r
+            LEFT JOIN contests c ON r.contest_id = c.id
+            WHERE r.student_id = %s
+        """, (student_id,))
+        student['registeredContests'] = cursor.fetchall()
+        
+        # 获取团队信息
+        cursor.execute("""
+            SELECT tm.*, t.name as team_name
+            FROM team_members tm
+            LEFT JOIN contest_teams t ON tm.team_id = t.id
+            WHERE tm.student_id = %s AND t.status != 'disbanded'
+        """, (student_id,))
+        student['teams'] = cursor.fetchall()
+        
+        # 处理JSON字段
+        import json
+        if student.get('skills'):
+            student['skills'] = json.loads(student['skills']) if isinstance(student['skills'], str) else student['skills']
+        if student.get('achievements'):
+            student['achievements'] = json.loads(student['achievements']) if isinstance(student['achievements'], str) else student['achievements']
+        
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': student
+        }), 200
+        
+    except Exception as e:
+        print(f"获取学生详情错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取学生详情失败: {str(e)}'
+        }), 500
+
+
+# ==================== 评审管理API ====================
+
+# 获取专家列表
+@app.route('/api/experts', methods=['GET'])
+@conditional('experts')
+def get_experts():
+    """获取专家列表"""
+    try:
+        field = request.args.get('field', None)
+        status = request.args.get('status', 'active')
+        
+        try:
+            columns = select_columns('experts', fields=request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        query = f"SELECT {columns} FROM experts WHERE status = %s"
+        params = [status]
+        
+        if field:
+            query += " AND field = %s"
+            params.append(field)
+        
+        query += " ORDER BY rating DESC, review_count DESC"
+        
+        cursor.execute(query, params)
+        experts = cursor.fetchall()
+        
+        # 处理JSON字段
+        import json
+        for expert in experts:
+            if expert.get('expertise'):
+                expert['expertise'] = json.loads(expert['expertise']) if isinstance(expert['expertise'], str) else expert['expertise']
+            if expert.get('created_at'):
+                expert['created_at'] = expert['created_at'].isoformat() if hasattr(expert['created_at'], 'isoformat') else str(expert['created_at'])
+            if expert.get('updated_at'):
+                expert['updated_at'] = expert['updated_at'].isoformat() if hasattr(expert['updated_at'], 'isoformat') else str(expert['updated_at'])
+        
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': experts
+        }), 200
+        
+    except Exception as e:
+        print(f"获取专家列表错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取专家列表失败: {str(e)}'
+        }), 500
+
+
+# 添加专家
+@app.route('/api/experts', methods=['POST'])
+def add_expert():
+    """添加专家"""
+    try:
+        data = request.json
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        import json
+        cursor.execute("""
+            INSERT INTO experts (name, title, organization, field, email, phone, expertise, experience, bio)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data.get('name'),
+            data.get('title'),
+            data.get('organization'),
+            data.get('field'),
+            data.get('email'),
+            data.get('phone'),
+            json.dumps(data.get('expertise', [])),
+            data.get('experience', 0),
+            data.get('bio', '')
+        ))
+        
+        connection.commit()
+        expert_id = cursor.lastrowid
+        bump_versions(cursor, 'experts')
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'message': '专家添加成功',
+            'data': {'id': expert_id}
+        }), 201
+        
+    except Exception as e:
+        print(f"添加专家错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'添加专家失败: {str(e)}'
+        }), 500
+
+
+# 获取评审分配列表
+@app.route('/api/judge-assignments', methods=['GET'])
+def get_judge_assignments():
+    """获取评审分配列表"""
+    try:
+        contest_id = request.args.get('contest_id', None)
+        status = request.args.get('status', None)
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        query = """
+            SELECT 
+                ja.*,
+                e.name as expert_name,
+                e.title as expert_title,
+                e.organization as expert_organization,
+                c.name as contest_name
+            FROM judge_assignments ja
+            LEFT JOIN experts e ON ja.expert_id = e.id
+            LEFT JOIN contests c ON ja.contest_id = c.id
+            WHERE 1=1
+        """
+        params = []
+        
+        if contest_id:
+            query += " AND ja.contest_id = %s"
+            params.append(contest_id)
+        
+        if status:
+            query += " AND ja.status = %s"
+            params.append(status)
+        
+        query += " ORDER BY ja.created_at DESC"
+        
+        cursor.execute(query, params)
+        assignments = cursor.fetchall()
+        
+        # 转换时间
+        for assignment in assignments:
+            if assignment.get('assigned_date'):
+                assignment['assigned_date'] = str(assignment['assigned_date'])
+            if assignment.get('submitted_at'):
+                assignment['submitted_at'] = assignment['submitted_at'].isoformat() if hasattr(assignment['submitted_at'], 'isoformat') else str(assignment['submitted_at'])
+            if assignment.get('created_at'):
+                assignment['created_at'] = assignment['created_at'].isoformat() if hasattr(assignment['created_at'], 'isoformat') else str(assignment['created_at'])
+        
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': assignments
+        }), 200
+        
+    except Exception as e:
+        print(f"获取评审分配错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取评审分配失败: {str(e)}'
+        }), 500
+
+
+# 分配评审
+@app.route('/api/judge-assignments', methods=['POST'])
+def assign_judge():
+    """分配评审"""
+    try:
+        data = request.json
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        cursor.execute("""
+            INSERT INTO judge_assignments (contest_id, expert_id, role, assigned_date, status)
+            VALUES (%s, %s, %s, CURDATE(), 'pending')
+        """, (
+            data.get('contest_id'),
+            data.get('expert_id'),
+            data.get('role', 'primary')
+        ))
+        
+        connection.commit()
+        assignment_id = cursor.lastrowid
+        dashboard.mark_dirty(cursor, [data.get('contest_id')])
+        bump_versions(cursor, 'judge_assignments')
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'message': '评审分配成功',
+            'data': {'id': assignment_id}
+        }), 201
+        
+    except Exception as e:
+        print(f"分配评审错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'分配评审失败: {str(e)}'
+        }), 500
+
+
+# 获取竞赛结果列表
+@app.route('/api/contest-results', methods=['GET'])
+@conditional('contest_results', 'contests')
+def get_contest_results():
+    """获取竞赛结果列表"""
+    try:
+        contest_id = request.args.get('contest_id', None)
+        is_published = request.args.get('is_published', None)
+        
+        try:
+            columns = select_columns('contest_results', 'cr', request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        query = f"""
+            SELECT 
+                {columns},
+                c.name as contest_name
+            FROM contest_results cr
+            LEFT JOIN contests c ON cr.contest_id = c.id
+            WHERE 1=1
+        """
+        params = []
+        
+        if contest_id:
+            query += " AND cr.contest_id = %s"
+            params.append(contest_id)
+        
+        if is_published is not None:
+            query += " AND cr.is_published = %s"
+            params.append(1 if is_published == 'true' else 0)
+        
+        query += " ORDER BY cr.ranking ASC, cr.final_score DESC"
+        
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        
+        # 转换时间
+        for result in results:
+            if result.get('published_at'):
+                result['published_at'] = result['published_at'].isoformat() if hasattr(result['published_at'], 'isoformat') else str(result['published_at'])
+            if result.get('created_at'):
+                result['created_at'] = result['created_at'].isoformat() if hasattr(result['created_at'], 'isoformat') else str(result['created_at'])
+        
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': results
+        }), 200
+        
+    except Exception as e:
+        print(f"获取竞赛结果错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取竞赛结果失败: {str(e)}'
+        }), 500
+
+
+# 发布结果
+@app.route('/api/contest-results/<int:result_id>/publish', methods=['POST'])
+def publish_result(result_id):
+    """发布竞赛结果"""
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        
+        cursor.execute("""
+            UPDATE contest_results
+            SET is_published = TRUE,
+                published_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (result_id,))
+        
+        connection.commit()
+        dashboard.mark_dirty_by(cursor, 'contest_results', [result_id])
+        bump_versions(cursor, 'contest_results')
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'message': '结果已发布'
+        }), 200
+        
+    except Exception as e:
+        print(f"发布结果错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'发布结果失败: {str(e)}'
+        }), 500
+
+
+# 批量发布结果
+@app.route('/api/contest-results/batch-publish', methods=['POST'])
+@heavy
+def batch_publish_results():
+    """批量发布结果"""
+    try:
+        data = request.json
+        contest_id = data.get('contest_id')
+        
+        # 传 async=1 时登记为后台任务分批发布，立即返回任务ID
+        if jobs.parse_async(request.args.get('async', data.get('async'))):
+            if not contest_id:
+                return jsonify({
+                    'success': False,
+                    'message': '请指定赛事'
+                }), 400
+            job_id = jobs.enqueue('batch_publish_results', {'contest_id': contest_id})
+            return jsonify({
+                'success': True,
+                'message': '批量发布任务已提交',
+                'data': {'job_id': job_id}
+            }), 202
+        
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        cursor = connection.cursor()
+        
+        cursor.execute("""
+            UPDATE contest_results
+            SET is_published = TRUE,
+                published_at = CURRENT_TIMESTAMP
+            WHERE contest_id = %s AND is_published = FALSE
+        """, (contest_id,))
+        affected_rows = cursor.rowcount
+        
+        # 通知所有报名学生和团队成员（后台扇出）
+        if affected_rows:
+            fanout.enqueue(cursor, contest_id, 'result_published', '赛事结果已公示',
+                           '赛事结果已公示，请登录系统查看获奖情况。')
+        
+        connection.commit()
+        dashboard.mark_dirty(cursor, [contest_id])
+        bump_versions(cursor, 'contest_results')
+        if affected_rows:
+            fanout.wake()
+        cursor.close()
+        connection.close()
+        
+        return jsonify({
+            'success': True,
+            'message': f'已发布 {affected_rows} 个结果'
+        }), 200
+        
+    except Exception as e:
+        print(f"批量发布错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'批量发布失败: {str(e)}'
+        }), 500
+
+
+# ==================== 赛事看板 API ====================
+
+# 获取单个赛事看板统计
+@app.route('/api/contests/<int:contest_id>/dashboard', methods=['GET'])
+@use_primary
+@conditional('contest_registrations', 'contest_teams', 'judge_assignments', 'contest_results')
+def get_contest_dashboard(contest_id):
+    """
+    获取赛事看板统计：报名状态分布与通过率、团队状态分布、评审完成率、结果公示数、报名学生专业/年级分布
+    统计结果缓存在 contest_dashboard_rollups 中，只有相关数据变更后才重新聚合
+    """
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        try:
+            stats = dashboard.get_contest_dashboard(cursor, contest_id)
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        
+        if stats is None:
+            return jsonify({
+                'success': False,
+                'message': '赛事不存在'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': stats
+        }), 200
+        
+    except Exception as e:
+        print(f"获取赛事看板错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取赛事看板失败: {str(e)}'
+        }), 500
+
+
+# 获取全部赛事看板汇总
+@app.route('/api/dashboard/summary', methods=['GET'])
+@heavy
+@use_primary
+@conditional('contests', 'contest_registrations', 'contest_teams', 'judge_assignments', 'contest_results')
+def get_dashboard_summary():
+    """获取所有赛事的看板统计及全局合计"""
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        try:
+            summary = dashboard.get_summary(cursor)
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': summary
+        }), 200
+        
+    except Exception as e:
+        print(f"获取看板汇总错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取看板汇总失败: {str(e)}'
+        }), 500
+
+
+def _activity_window(cursor, contest_id):
+    # 默认查询范围随当前时间变化，ETag 包含解析后的范围和粒度参数
+    window = activity.resolve_range(cursor, contest_id, request.args.get('start'), request.args.get('end'))
+    if window is None:
+        return None
+    return f"{window[0].isoformat()}/{window[1].isoformat()}/{request.args.get('interval') or 'auto'}"
+
+
+# 报名活动曲线
+@app.route('/api/contests/<int:contest_id>/registration-activity', methods=['GET'])
+@deadline(15)
+@conditional('contest_registrations', 'registration_activity', key=_activity_window)
+def get_registration_activity(contest_id):
+    """
+    获取赛事报名活动曲线（每个时间桶的提交、通过、驳回数）
+    参数: start / end（ISO时间，默认为报名时间窗口）、interval（minute/5min/15min/hour/6hour/day/auto）
+    """
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        cursor = connection.cursor()
+        try:
+            try:
+                window = activity.resolve_range(cursor, contest_id, request.args.get('start'),
+                                                request.args.get('end'))
+                if window is None:
+                    return jsonify({
+                        'success': False,
+                        'message': '赛事不存在'
+                    }), 404
+                data = activity.query_activity(cursor, contest_id, *window, request.args.get('interval'))
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+        finally:
+            cursor.close()
+            connection.close()
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        }), 200
+        
+    except Exception as e:
+        print(f"获取报名活动曲线错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取报名活动曲线失败: {str(e)}'
+        }), 500
+
+
+# ==================== 证书生成API ====================
+
+# 创建证书生成任务
+@app.route('/api/contests/<int:contest_id>/certificates', methods=['POST'])
+@heavy
+def generate_certificates(contest_id):
+    """为赛事已公示的结果批量生成证书（登记为后台任务，由 jobs.py worker 执行）"""
+    try:
+        data = request.get_json(silent=True) or {}
+        output_mode = data.get('output_mode', 'dir')
+
+        if output_mode not in ['dir', 'zip']:
+            return jsonify({
+                'success': False,
+                'message': 'output_mode 必须是 dir 或 zip'
+            }), 400
+
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
+        cursor = connection.cursor()
+        cursor.execute('SELECT id, certificate FROM contests WHERE id = %s', (contest_id,))
+        contest = cursor.fetchone()
+        cursor.close()
+        connection.close()
+
+        if not contest:
+            return jsonify({
+                'success': False,
+                'message': '赛事不存在'
+            }), 404
+
+        if not contest['certificate']:
+            return jsonify({
+                'success': False,
+                'message': '该赛事未设置颁发证书'
+            }), 400
+
+        job_id = certificates.create_job(contest_id, output_mode)
+
+        # 渲染由后台任务 worker 使用进程池执行，不占用请求线程，也不在 API 进程中派生子进程
+        background_job_id = jobs.enqueue('generate_certificates', {'certificate_job_id': job_id})
+
+        return jsonify({
+            'success': True,
+            'message': '证书生成任务已创建',
+            'data': {'job_id': job_id, 'background_job_id': background_job_id}
+        }), 202
+
+    except Exception as e:
+        print(f"创建证书任务错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'创建证书任务失败: {str(e)}'
+        }), 500
+
+
+# 查询证书生成进度
+@app.route('/api/certificate-jobs/<int:job_id>', methods=['GET'])
+def get_certificate_job(job_id):
+    """查询证书生成任务进度"""
+    try:
+        job = certificates.get_job(job_id)
+
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': '任务不存在'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': job
+        }), 200
+
+    except Exception as e:
+        print(f"查询证书任务错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'查询证书任务失败: {str(e)}'
+        }), 500
+
+
+# ==================== 场地分配 API ====================
+
+# 获取场地池
+@app.route('/api/venues', methods=['GET'])
+@conditional('venues')
+def get_venues():
+    """获取共享场地池"""
+    try:
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
+        cursor = connection.cursor()
+        cursor.execute('SELECT * FROM venues ORDER BY capacity, name')
+        venues = cursor.fetchall()
+        cursor.close()
+        connection.close()
+
+        for venue in venues:
+            for key, value in venue.items():
+                if isinstance(value, datetime):
+                    venue[key] = value.isoformat()
+
+        return jsonify({
+            'success': True,
+            'data': venues
+        }), 200
+
+    except Exception as e:
+        print(f"获取场地池错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'获取场地池失败: {str(e)}'
+        }), 500
+
+
+# 登记场地
+@app.route('/api/venues', methods=['POST'])
+def save_venue():
+    """新增或更新场地池中的场地（按场地名称）"""
+    try:
+        data = request.get_json(silent=True) or {}
+        name = (data.get('name') or '').strip()
+        capacity = data.get('capacity')
+        status = data.get('status', 'active')
+
+        if not name or not isinstance(capacity, int) or capacity <= 0:
+            return jsonify({
+                'success': False,
+                'message': '请填写场地名称和容纳人数（正整数）'
+            }), 400
+
+        if status not in ['active', 'inactive']:
+            return jsonify({
+                'success': False,
+                'message': 'status 必须是 active 或 inactive'
+            }), 400
+
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO venues (name, capacity, address, facilities, status)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                capacity = VALUES(capacity),
+                address = VALUES(address),
+                facilities = VALUES(facilities),
+                status = VALUES(status)
+        """, (name, capacity, data.get('address'),
+              json.dumps(data.get('facilities', []), ensure_ascii=False), status))
+        connection.commit()
+        bump_versions(cursor, 'venues')
+        cursor.close()
+        connection.close()
+
+        return jsonify({
+            'success': True,
+            'message': '场地已保存'
+        }), 200
+
+    except Exception as e:
+        print(f"保存场地错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'保存场地失败: {str(e)}'
+        }), 500
+
+
+# 智能场地分配
+@app.route('/api/venue-allocation/plan', methods=['POST'])
+@heavy
+def plan_venue_allocation():
+    """
+    从场地池为赛事分配场地：时间重叠的赛事不共用场地，满足容量和设施要求，浪费的容量最小
+    请求体：contest_ids（缺省为全部未结束的线下赛事）、time_limit（局部搜索秒数）、apply（是否写回赛事场地）
+    """
+    connection = None
+    try:
+        data = request.get_json(silent=True) or {}
+        contest_ids = data.get('contest_ids') or None
+        apply = data.get('apply', False) is True
+
+        try:
+            time_limit = min(float(data.get('time_limit', venue_allocation.DEFAULT_TIME_LIMIT)), 10.0)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'time_limit 必须是数字'
+            }), 400
+
+        connection = get_connection()
+        if not connection:
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+
+        cursor = connection.cursor()
+        venues = venue_allocation.load_venues(cursor)
+        contests = venue_allocation.load_contests(cursor, contest_ids)
+        fixed = venue_allocation.load_fixed_bookings(cursor, contests)
+        connection.commit()
+
+        result = venue_allocation.plan(venues, contests, time_limit, fixed)
+
+        if apply:
+            applied = venue_allocation.apply_plan(connection, cursor, result['assignments'], venues)
+            conflicts.check_capacity(connection, cursor, applied)
+            result['applied'] = len(applied)
+
+        cursor.close()
+        connection.close()
+
+        return jsonify({
+            'success': True,
+            'message': f"已分配 {len(result['assignments'])} 个赛事，未分配 {len(result['unassigned'])} 个",
+            'data': result
+        }), 200
+
+    except Exception as e:
+        if connection:
+            connection.rollback()
+            connection.close()
+        print(f"场地分配错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'场地分配失败: {str(e)}'
+        }), 500
+
+
+# ==================== 后台任务 API ====================
+
+# 查询后台任务进度
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@use_primary
+def get_job(job_id):
+    """查询后台任务状态、进度和结果"""
+    try:
+        job = jobs.get_job(job_id)
+
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': '任务不存在'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': job
+        }), 200
+
+    except Exception as e:
+        print(f"查询后台任务错误: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'查询后台任务失败: {str(e)}'
+        }), 500
+
+
+# ==================== 数据库状态 API ====================
+
+# 连接池与读写分离统计
+@app.route('/api/db/stats', methods=['GET'])
+@exempt
+def get_db_stats():
+    """各库连接池统计、从库复制延迟、读请求路由计数、准入控制与接口超时统计"""
+    stats = pool_stats()
+    stats['requests'] = dict(routing_stats)
+    stats['admission'] = admission_snapshot()
+    stats['timeouts'] = deadline_snapshot()
+    return jsonify({
+        'success': True,
+        'data': stats
+    }), 200
+
+
+def get_application(init_db=False):
+    """
+    返回模块级的 Flask 应用 app（不是工厂：每次调用返回同一个实例，路由和钩子在导入本模块时注册）
+    生产环境由 gunicorn（见 gunicorn.conf.py）在 master 进程中预加载，数据库初始化只在 master 中执行一次；
+    直接调用时可传 init_db=True 在返回前初始化数据库。
+    """
+    if init_db:
+        init_database()
+    return app
+
+
 if __name__ == '__main__':
+    # 开发服务器：单进程 + 自动重载 + 调试器，生产环境请使用 gunicorn -c gunicorn.conf.py wsgi:application
     # 启动前先初始化数据库
     print("="*50)
     print("正在初始化数据库...")
@@ -1720,24 +2900,35 @@ if __name__ == '__main__':
     print("   - POST   /api/contests                      - 创建赛事")
     print("   - GET    /api/contests                      - 获取赛事列表")
     print("   - GET    /api/contests/<id>                 - 获取赛事详情")
+    print("   - GET    /api/contests/batch?ids=&include=  - 批量获取赛事详情")
+    print("   - POST   /api/contests/<id>/reschedule      - 赛事改期（通知报名学生）")
     print("\n【审核管理】")
     print("   - POST   /api/contests/<id>/review          - 审核赛事")
     print("   - GET    /api/reviews                       - 获取审核记录")
     print("   - GET    /api/reviews/stats                 - 获取审核统计")
     print("\n【冲突检测】")
     print("   - GET    /api/contests/<id>/conflicts       - 获取冲突列表")
-    print("   - POST   /api/contests/<id>/detect-conflicts- 检测冲突")
+    print("   - POST   /api/contests/<id>/detect-conflicts- 检测冲突（?async=1 后台执行）")
     print("   - POST   /api/conflicts/<id>/resolve        - 解决冲突")
+    print("   - POST   /api/conflicts/detect-personnel    - 全量检测人员冲突（?async=1 后台执行）")
+    print("   - POST   /api/conflicts/detect-resources    - 全量检测设备冲突（?async=1 后台执行）")
+    print("   - POST   /api/conflicts/check-capacity      - 全量校验场地容量（?async=1 后台执行）")
+    print("   - GET    /api/equipment-inventory           - 获取设备库存")
+    print("   - POST   /api/equipment-inventory           - 登记设备库存")
     print("\n【通知管理】")
     print("   - GET    /api/notifications                 - 获取通知列表")
     print("\n【学生管理】")
     print("   - GET    /api/registrations                 - 获取报名列表")
+    print("   - POST   /api/contests/<id>/registrations   - 提交报名")
     print("   - POST   /api/registrations/<id>/approve    - 审核通过")
     print("   - POST   /api/registrations/<id>/reject     - 驳回报名")
-    print("   - POST   /api/registrations/batch-approve   - 批量审核")
+    print("   - POST   /api/registrations/batch-approve   - 批量审核（?async=1 后台执行）")
     print("   - GET    /api/teams                         - 获取团队列表")
     print("   - DELETE /api/teams/<id>                    - 解散团队")
     print("   - DELETE /api/teams/<id>/members/<mid>      - 移除成员")
+    print("   - POST   /api/teams/<id>/members            - 加入团队")
+    print("   - POST   /api/teams/<id>/leave              - 退出团队")
+    print("   - POST   /api/teams/<id>/transfer           - 转队")
     print("   - GET    /api/students                      - 获取学生列表")
     print("   - GET    /api/students/<id>                 - 获取学生详情")
     print("\n【评审管理】")
@@ -1747,9 +2938,25 @@ if __name__ == '__main__':
     print("   - POST   /api/judge-assignments             - 分配评审")
     print("   - GET    /api/contest-results               - 获取竞赛结果")
     print("   - POST   /api/contest-results/<id>/publish  - 发布结果")
-    print("   - POST   /api/contest-results/batch-publish - 批量发布")
+    print("   - POST   /api/contest-results/batch-publish - 批量发布（?async=1 后台执行）")
+    print("\n【赛事看板】")
+    print("   - GET    /api/contests/<id>/dashboard       - 赛事看板统计")
+    print("   - GET    /api/dashboard/summary             - 全部赛事看板汇总")
+    print("   - GET    /api/contests/<id>/registration-activity - 报名活动曲线")
+    print("\n【证书生成】")
+    print("   - POST   /api/contests/<id>/certificates    - 生成证书")
+    print("   - GET    /api/certificate-jobs/<id>         - 证书任务进度")
+    print("\n【场地分配】")
+    print("   - GET    /api/venues                        - 获取场地池")
+    print("   - POST   /api/venues                        - 登记场地")
+    print("   - POST   /api/venue-allocation/plan         - 智能场地分配")
+    print("\n【后台任务】")
+    print("   - GET    /api/jobs/<id>                     - 后台任务进度")
+    print("\n【数据库】")
+    print("   - GET    /api/db/stats                      - 连接池、读写分离、准入控制与超时统计")
     print("\n【系统】")
-    print("   - GET    /api/health                        - 健康检查")
+    print("   - GET    /api/health                        - 健康检查（deep=1 附带就绪报告）")
+    print("   - GET    /api/ready                         - 就绪检查（数据库延迟、连接池、队列、熔断器）")
     print("   - GET    /api/test                          - 测试接口")
     print("="*50 + "\n")
     
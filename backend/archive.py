@@ -0,0 +1,237 @@
+"""
+冷热数据分离
+状态为 completed / archived 的赛事，其报名、通知、冲突、审核记录从热表分批移入对应的 *_archive 冷表，
+热表只保留进行中赛事的数据。读接口默认只查热表，传 include_archived=1 时合并冷表。
+
+每批在一个短事务中完成：锁定 chunk_size 行 -> 复制到冷表 -> 从热表删除 -> 提交，批次之间暂停 sleep 秒，
+避免长事务和大量行锁影响线上写入。移动前先刷新赛事看板统计，归档后的赛事看板不再重新聚合。
+
+用法:
+    python archive.py run [--contest ID ...] [--chunk-size 1000] [--sleep 0.05]   归档已结束赛事
+    python archive.py status                                                       查看冷热表行数
+"""
+import argparse
+import time
+
+import dashboard
+from database import get_connection
+from http_cache import bump_versions
+
+ARCHIVE_TABLES = ['contest_registrations', 'contest_notifications', 'contest_conflicts', 'contest_reviews']
+
+# 赛事处于这些状态时归档其明细数据
+ARCHIVE_STATUSES = ('completed', 'archived')
+
+_NOTHING_NEW = '已归档，热表中没有新数据'
+
+# 归档前等待看板统计刷新锁的秒数
+DASHBOARD_LOCK_TIMEOUT = 30
+
+
+def include_archived(value):
+    """
+    解析 include_archived 查询参数
+    """
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def source(table, with_archive=False):
+    """
+    返回查询使用的表表达式：默认只查热表，with_archive 时合并冷表
+    MySQL 8.0.22+ 会把外层 WHERE 条件下推到 UNION 的每个分支，仍然可以使用各自的索引
+    """
+    if table not in ARCHIVE_TABLES:
+        raise ValueError(f'不支持归档的表: {table}')
+    if not with_archive:
+        return table
+    return f'(SELECT * FROM {table} UNION ALL SELECT * FROM {table}_archive)'
+
+
+def archivable_contests(cursor, contest_ids=None):
+    """
+    需要归档的赛事ID：已结束，且从未归档或归档后热表中又出现了新数据
+    传入 contest_ids 时只在这些赛事中筛选
+    """
+    statuses = ','.join(['%s'] * len(ARCHIVE_STATUSES))
+    hot_rows = ' OR '.join(f'EXISTS (SELECT 1 FROM {table} x WHERE x.contest_id = c.id)'
+                           for table in ARCHIVE_TABLES)
+    params = list(ARCHIVE_STATUSES)
+    id_filter = ''
+    if contest_ids is not None:
+        if not contest_ids:
+            return []
+        id_filter = f"AND c.id IN ({','.join(['%s'] * len(contest_ids))})"
+        params.extend(contest_ids)
+    cursor.execute(f"""
+        SELECT c.id FROM contests c
+        WHERE c.status IN ({statuses})
+          AND (c.archived_at IS NULL OR {hot_rows})
+          {id_filter}
+        ORDER BY c.id
+    """, params)
+    return [row['id'] for row in cursor.fetchall()]
+
+
+def _rejected_contests(cursor, contest_ids, archivable):
+    """
+    指定的赛事中不能归档的，返回 {赛事ID: 原因}
+    """
+    others = sorted(set(contest_ids) - set(archivable))
+    if not others:
+        return {}
+    placeholders = ','.join(['%s'] * len(others))
+    cursor.execute(f'SELECT id, status, archived_at FROM contests WHERE id IN ({placeholders})', others)
+    rows = {row['id']: row for row in cursor.fetchall()}
+    reasons = {}
+    for contest_id in others:
+        row = rows.get(contest_id)
+        if row is None:
+            reasons[contest_id] = '赛事不存在'
+        elif row['status'] not in ARCHIVE_STATUSES:
+            reasons[contest_id] = f"状态为 {row['status']}，未结束的赛事不能归档"
+        else:
+            reasons[contest_id] = _NOTHING_NEW
+    return reasons
+
+
+def _move_chunk(cursor, table, contest_id, chunk_size):
+    cursor.execute(f"""
+        SELECT id FROM {table} WHERE contest_id = %s ORDER BY id LIMIT %s FOR UPDATE
+    """, (contest_id, chunk_size))
+    ids = [row['id'] for row in cursor.fetchall()]
+    if not ids:
+        return 0
+    placeholders = ','.join(['%s'] * len(ids))
+    cursor.execute(f'INSERT INTO {table}_archive SELECT * FROM {table} WHERE id IN ({placeholders})', ids)
+    cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', ids)
+    return len(ids)
+
+
+def archive_contest(connection, cursor, contest_id, chunk_size=1000, sleep=0.05):
+    """
+    归档单个赛事的明细数据，返回 {表名: 移动行数}
+    """
+    # 归档期间持有看板统计刷新锁：看板不会用只包含部分明细的快照重新聚合
+    if not dashboard.lock_contests(cursor, [contest_id], timeout=DASHBOARD_LOCK_TIMEOUT):
+        raise RuntimeError(f'赛事 {contest_id} 的看板统计正在刷新，{DASHBOARD_LOCK_TIMEOUT} 秒内未取得锁')
+    try:
+        # 先刷新看板统计，归档后报名明细不在热表中，不能再重新聚合
+        dashboard.refresh(cursor, [contest_id])
+        connection.commit()
+
+        moved = {}
+        for table in ARCHIVE_TABLES:
+            moved[table] = 0
+            while True:
+                count = _move_chunk(cursor, table, contest_id, chunk_size)
+                connection.commit()
+                if not count:
+                    break
+                moved[table] += count
+                if sleep:
+                    time.sleep(sleep)
+
+        cursor.execute('UPDATE contests SET archived_at = CURRENT_TIMESTAMP WHERE id = %s', (contest_id,))
+        connection.commit()
+        return moved
+    finally:
+        dashboard.unlock_contests(cursor, [contest_id])
+
+
+def run(contest_ids=None, chunk_size=1000, sleep=0.05):
+    """
+    归档指定赛事（默认为全部已结束赛事），返回是否成功
+    指定的赛事同样要求已结束，未结束或不存在的赛事被拒绝，此时其余赛事照常归档，返回 False
+    """
+    connection = get_connection()
+    if not connection:
+        print("❌ 数据库连接失败")
+        return False
+
+    cursor = connection.cursor()
+    try:
+        rejected = {}
+        if contest_ids is None:
+            contest_ids = archivable_contests(cursor)
+        else:
+            requested = list(dict.fromkeys(contest_ids))
+            contest_ids = archivable_contests(cursor, requested)
+            rejected = _rejected_contests(cursor, requested, contest_ids)
+        connection.commit()
+        for contest_id, reason in rejected.items():
+            print(f"⚠️  跳过赛事 {contest_id}: {reason}")
+        # 已归档且没有新数据的赛事不算失败
+        failed = any(reason != _NOTHING_NEW for reason in rejected.values())
+        if not contest_ids:
+            print("✅ 没有需要归档的赛事")
+            return not failed
+
+        total = 0
+        for index, contest_id in enumerate(contest_ids, 1):
+            started = time.time()
+            try:
+                moved = archive_contest(connection, cursor, contest_id, chunk_size, sleep)
+            except Exception:
+                # 出错前已提交的分批移动同样要让缓存失效
+                connection.rollback()
+                bump_versions(cursor, *ARCHIVE_TABLES)
+                raise
+            # 每个赛事归档后立即递增版本号，后面的赛事失败时已移动的数据不会停留在旧 ETag 下
+            if any(moved.values()):
+                bump_versions(cursor, *ARCHIVE_TABLES)
+            total += sum(moved.values())
+            detail = '  '.join(f'{table}: {count}' for table, count in moved.items())
+            print(f"   [{index}/{len(contest_ids)}] 赛事 {contest_id} 耗时 {time.time() - started:.2f}s  {detail}")
+
+        print(f"✅ 共归档 {len(contest_ids)} 个赛事，{total} 行")
+        return not failed
+    except Exception as e:
+        connection.rollback()
+        print(f"归档错误: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def status():
+    """
+    打印各表热表 / 冷表行数（information_schema 估算值）
+    """
+    connection = get_connection()
+    if not connection:
+        print("❌ 数据库连接失败")
+        return
+    cursor = connection.cursor()
+    try:
+        names = ARCHIVE_TABLES + [f'{table}_archive' for table in ARCHIVE_TABLES]
+        placeholders = ','.join(['%s'] * len(names))
+        cursor.execute(f"""
+            SELECT table_name AS name, table_rows AS row_count
+            FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN ({placeholders})
+        """, names)
+        rows = {row['name']: row['row_count'] for row in cursor.fetchall()}
+        print(f"{'表':<28}{'热表行数':>12}{'冷表行数':>12}")
+        for table in ARCHIVE_TABLES:
+            print(f"{table:<28}{rows.get(table, 0):>12}{rows.get(table + '_archive', 0):>12}")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='已结束赛事明细数据归档')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='把已结束赛事的明细数据移入冷表')
+    run_parser.add_argument('--contest', type=int, action='append', help='只归档指定赛事，可重复')
+    run_parser.add_argument('--chunk-size', type=int, default=1000, help='每批移动的行数')
+    run_parser.add_argument('--sleep', type=float, default=0.05, help='批次之间的暂停秒数')
+    subparsers.add_parser('status', help='查看冷热表行数')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if not run(args.contest, args.chunk_size, args.sleep):
+            raise SystemExit(1)
+    elif args.command == 'status':
+        status()
@@ -0,0 +1,82 @@
+"""
+过载时的准入控制压测（不需要 MySQL）
+    python -m benchmarks.bench_admission [--rate 600] [--duration 5]
+
+用一个最多同时执行 --db-slots 条查询、每条耗时 --query-ms 的信号量模拟变慢的数据库，
+以超过其处理能力的固定速率（开环）发送 GET 请求，分别在关闭和开启准入控制时统计：
+被接受请求的 p50 / p99 / max 延迟、503 数量。关闭准入控制时排队无上限，延迟随时间线性增长；
+开启后被接受请求的延迟不超过 排队上限 + 查询耗时。
+"""
+import argparse
+import threading
+import time
+
+from flask import Flask, jsonify
+
+import admission
+from benchmarks.loadgen import percentile
+
+
+def make_app(enabled, db_slots, query_ms):
+    app = Flask(__name__)
+    if enabled:
+        admission.init_admission(app)
+    database = threading.Semaphore(db_slots)
+
+    @app.route('/slow', methods=['GET'])
+    def slow():
+        with database:
+            time.sleep(query_ms / 1000)
+        return jsonify({'success': True})
+
+    return app
+
+
+def run(enabled, rate, duration, db_slots, query_ms):
+    client = make_app(enabled, db_slots, query_ms).test_client()
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one():
+        started = time.perf_counter()
+        status = client.get('/slow').status_code
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    threads = []
+    started = time.perf_counter()
+    for seq in range(int(rate * duration)):
+        delay = started + seq / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        thread = threading.Thread(target=one)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    label = '开启准入控制' if enabled else '关闭准入控制'
+    print(f"\n【{label}】 状态码: {dict(sorted(statuses.items()))}")
+    print(f"   接受请求 p50: {percentile(latencies, 50) * 1000:.0f} ms  p99: {percentile(latencies, 99) * 1000:.0f} ms  "
+          f"max: {(latencies[-1] if latencies else 0) * 1000:.0f} ms")
+    if enabled:
+        print(f"   {admission.snapshot()['classes']['read']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='准入控制压测')
+    parser.add_argument('--rate', type=float, default=600, help='每秒请求数')
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--db-slots', type=int, default=8, help='模拟数据库的并发查询数')
+    parser.add_argument('--query-ms', type=float, default=20, help='模拟查询耗时')
+    args = parser.parse_args()
+
+    capacity = args.db_slots * 1000 / args.query_ms
+    print(f"模拟数据库处理能力 {capacity:.0f} 请求/秒，发送速率 {args.rate:.0f} 请求/秒")
+    for enabled in (False, True):
+        run(enabled, args.rate, args.duration, args.db_slots, args.query_ms)
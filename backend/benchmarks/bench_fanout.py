@@ -0,0 +1,106 @@
+"""
+通知扇出压测
+    python -m benchmarks.bench_fanout [--registrants 50000]
+
+1. 创建测试赛事并批量写入 --registrants 条报名
+2. 登记一次扇出，在后台线程中执行 fanout.drain()
+3. 扇出期间另一个连接持续逐条审核该赛事的报名，统计审核语句的最大 / p99 延迟（验证扇出不长时间持锁）
+4. 校验每个报名学生恰好收到一条通知，输出扇出耗时与吞吐
+"""
+import argparse
+import threading
+import time
+
+import fanout
+from benchmarks.loadgen import percentile
+from database import get_connection
+
+
+def seed(registrants):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO contests (name, type, status) VALUES ('扇出压测赛事', 'benchmark', 'published')")
+    contest_id = cursor.lastrowid
+    rows = [(contest_id, f'压测学生{seq}', f'F{seq:08d}', f'F{seq:08d}@bench.local') for seq in range(registrants)]
+    for offset in range(0, len(rows), 5000):
+        cursor.executemany("""
+            INSERT INTO contest_registrations (contest_id, student_name, student_id, email)
+            VALUES (%s, %s, %s, %s)
+        """, rows[offset:offset + 5000])
+        connection.commit()
+    cursor.close()
+    connection.close()
+    return contest_id
+
+
+def review_loop(contest_id, stop, latencies):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute('SELECT id FROM contest_registrations WHERE contest_id = %s ORDER BY id', (contest_id,))
+    ids = [row['id'] for row in cursor.fetchall()]
+    connection.commit()
+    index = 0
+    while not stop.is_set() and ids:
+        started = time.perf_counter()
+        cursor.execute("UPDATE contest_registrations SET status = 'approved' WHERE id = %s", (ids[index % len(ids)],))
+        connection.commit()
+        latencies.append(time.perf_counter() - started)
+        index += 1
+    cursor.close()
+    connection.close()
+
+
+def cleanup(contest_id):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM contests WHERE id = %s', (contest_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='通知扇出压测')
+    parser.add_argument('--registrants', type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"🔄 写入 {args.registrants} 条报名...")
+    test_contest_id = seed(args.registrants)
+    try:
+        connection = get_connection()
+        cursor = connection.cursor()
+        fanout_id = fanout.enqueue(cursor, test_contest_id, 'system', '扇出压测', '压测通知')
+        connection.commit()
+
+        stop = threading.Event()
+        latencies = []
+        reviewer = threading.Thread(target=review_loop, args=(test_contest_id, stop, latencies))
+        reviewer.start()
+        started = time.perf_counter()
+        fanout.drain()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        reviewer.join()
+
+        cursor.execute('SELECT status, sent_count FROM notification_fanouts WHERE id = %s', (fanout_id,))
+        task = cursor.fetchone()
+        cursor.execute("""
+            SELECT COUNT(*) AS total, COUNT(DISTINCT recipient) AS recipients
+            FROM contest_notifications WHERE contest_id = %s
+        """, (test_contest_id,))
+        counts = cursor.fetchone()
+        cursor.close()
+        connection.close()
+
+        latencies.sort()
+        print(f"\n【扇出 {args.registrants} 名收件人】")
+        print(f"   状态: {task['status']}  发送: {task['sent_count']}  耗时: {elapsed:.2f}s  "
+              f"吞吐: {task['sent_count'] / elapsed:.0f} 条/秒")
+        print(f"   并发审核 {len(latencies)} 次  p99: {percentile(latencies, 99) * 1000:.2f} ms  "
+              f"max: {(latencies[-1] if latencies else 0) * 1000:.2f} ms")
+        if counts['total'] == counts['recipients'] == args.registrants:
+            print("   ✅ 每个报名学生恰好收到一条通知")
+        else:
+            print(f"   ❌ 通知 {counts['total']} 条 / 收件人 {counts['recipients']} / 报名 {args.registrants}")
+    finally:
+        cleanup(test_contest_id)
@@ -0,0 +1,57 @@
+"""
+热点查询基准：对 index_advisor 中登记的查询模板计时，并输出 EXPLAIN 分析结果
+    python -m benchmarks.bench_queries [--iterations 50] [--strict]
+
+--strict: 存在全表扫描/filesort 或缺失建议索引时以非零状态退出，便于接入CI
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.loadgen import percentile
+from database import get_connection
+from index_advisor import QUERY_TEMPLATES, analyze, print_report
+
+
+def time_templates(iterations):
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+
+    timings = {}
+    try:
+        cursor = connection.cursor()
+        for template in QUERY_TEMPLATES:
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                cursor.execute(template['sql'], template['params'])
+                cursor.fetchall()
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            timings[template['name']] = {
+                'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                'p99_ms': round(percentile(samples, 99) * 1000, 2)
+            }
+        cursor.close()
+    finally:
+        connection.close()
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='热点查询基准与索引分析')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--strict', action='store_true')
+    args = parser.parse_args()
+
+    report = analyze()
+    print_report(report)
+
+    print("\n" + "=" * 50)
+    for name, timing in time_templates(args.iterations).items():
+        print(f"{name:<20} p50: {timing['p50_ms']} ms  p99: {timing['p99_ms']} ms")
+    print("=" * 50)
+
+    if args.strict and any(item['issues'] or item['missing_index'] for item in report):
+        sys.exit(1)
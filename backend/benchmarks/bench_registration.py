@@ -0,0 +1,107 @@
+"""
+报名开放瞬间的高并发压测
+    python -m benchmarks.bench_registration [--rate 2000] [--duration 30] [--quota 20000] [--port 5000]
+
+1. 在数据库中创建一个报名窗口已开放、带名额上限的测试赛事
+2. 以目标速率向 POST /api/contests/<id>/registrations 提交报名，约 5% 为重复学号
+3. 压测结束后校验：实际报名数不超过名额、计数器与实际行数一致、没有重复报名，并输出 p99 延迟
+
+需要先启动服务（建议使用 gunicorn -c gunicorn.conf.py wsgi:application）。
+"""
+import argparse
+import random
+import sys
+
+from benchmarks.loadgen import print_result, run_load
+from database import get_connection
+
+
+def create_test_contest(quota):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute("""
+        INSERT INTO contests (name, type, registration_start, registration_end, registration_quota, status)
+        VALUES ('报名压测赛事', 'benchmark', NOW() - INTERVAL 1 MINUTE, NOW() + INTERVAL 1 DAY, %s, 'published')
+    """, (quota,))
+    connection.commit()
+    contest_id = cursor.lastrowid
+    cursor.close()
+    connection.close()
+    return contest_id
+
+
+def verify(contest_id, quota):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) AS total, COUNT(DISTINCT student_id) AS students
+        FROM contest_registrations WHERE contest_id = %s
+    """, (contest_id,))
+    counts = cursor.fetchone()
+    cursor.execute('SELECT registration_count FROM contests WHERE id = %s', (contest_id,))
+    counter = cursor.fetchone()['registration_count']
+    cursor.close()
+    connection.close()
+
+    problems = []
+    if counts['total'] > quota:
+        problems.append(f"超额报名: {counts['total']} > 名额 {quota}")
+    if counts['total'] != counter:
+        problems.append(f"计数器 {counter} 与实际报名数 {counts['total']} 不一致")
+    if counts['total'] != counts['students']:
+        problems.append(f"存在重复报名: {counts['total']} 行 / {counts['students']} 名学生")
+    return counts['total'], counter, problems
+
+
+def cleanup(contest_id):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM contests WHERE id = %s', (contest_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='报名接口高并发压测')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--rate', type=int, default=2000, help='目标总速率（请求/秒）')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--quota', type=int, default=20000)
+    parser.add_argument('--keep', action='store_true', help='保留测试赛事和报名数据')
+    args = parser.parse_args()
+
+    test_contest_id = create_test_contest(args.quota)
+    path = f'/api/contests/{test_contest_id}/registrations'
+
+    def make_request(worker_index, seq):
+        # 约 5% 的请求复用之前的学号，验证唯一键去重
+        if seq > 0 and random.random() < 0.05:
+            seq = random.randrange(seq)
+        student_id = f'B{worker_index:04d}{seq:07d}'
+        return 'POST', path, {
+            'student_name': f'压测学生{student_id}',
+            'student_id': student_id,
+            'email': f'{student_id}@bench.local',
+            'major': '计算机科学与技术',
+            'grade': '大二'
+        }
+
+    try:
+        result = run_load(args.host, args.port, make_request,
+                          concurrency=args.concurrency, duration=args.duration, rate=args.rate)
+        print_result(f'报名提交 目标 {args.rate} req/s', result)
+
+        total, counter, issues = verify(test_contest_id, args.quota)
+        print(f"\n   名额: {args.quota}  实际报名: {total}  计数器: {counter}")
+        for issue in issues:
+            print(f"   ❌ {issue}")
+        if not issues:
+            print("   ✅ 无超额、无重复，计数器一致")
+    finally:
+        if not args.keep:
+            cleanup(test_contest_id)
+
+    sys.exit(1 if issues else 0)
@@ -0,0 +1,65 @@
+"""
+开发服务器 vs 生产服务器(gunicorn) 吞吐量/延迟对比
+    python -m benchmarks.bench_server [--duration 15] [--concurrency 64]
+
+依次启动两种服务器，对轻量接口 /api/health 和读库接口 /api/contests 施压并输出对比结果。
+需要 MySQL 可用；gunicorn 仅支持类 Unix 系统。
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+from benchmarks.loadgen import print_result, run_load, wait_for_port
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 开发服务器即 python app.py（固定端口5000，debug + reloader）
+SERVERS = {
+    'dev': lambda port: ([sys.executable, 'app.py'], 5000),
+    'gunicorn': lambda port: ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                               '--bind', f'127.0.0.1:{port}', 'wsgi:application'], port),
+}
+
+ENDPOINTS = ['/api/health', '/api/contests']
+
+
+def bench_server(name, port, duration, concurrency):
+    command, port = SERVERS[name](port)
+    process = subprocess.Popen(command, cwd=BACKEND_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    try:
+        if not wait_for_port('127.0.0.1', port):
+            print(f"❌ {name} 服务器启动失败")
+            return {}
+        results = {}
+        for path in ENDPOINTS:
+            results[path] = run_load('127.0.0.1', port, lambda i, n, p=path: ('GET', p, None),
+                                     concurrency=concurrency, duration=duration)
+            print_result(f'{name} {path}', results[path])
+        return results
+    finally:
+        # 开发服务器的 reloader 会再派生一个子进程，按进程组整体结束
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='开发服务器与生产服务器性能对比')
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--port', type=int, default=5050)
+    args = parser.parse_args()
+
+    all_results = {name: bench_server(name, args.port, args.duration, args.concurrency) for name in SERVERS}
+
+    print("\n" + "=" * 50)
+    print(f"{'接口':<20}{'dev req/s':>12}{'gunicorn req/s':>16}{'dev p99':>10}{'gunicorn p99':>14}")
+    for path in ENDPOINTS:
+        dev = all_results['dev'].get(path, {})
+        prod = all_results['gunicorn'].get(path, {})
+        print(f"{path:<20}{dev.get('rps', '-'):>12}{prod.get('rps', '-'):>16}"
+              f"{dev.get('p99_ms', '-'):>10}{prod.get('p99_ms', '-'):>14}")
+    print("=" * 50)
@@ -0,0 +1,164 @@
+"""
+团队加入并发压测
+    python -m benchmarks.bench_team_join [--joins 500] [--max-members 10] [--port 5000]
+
+1. 创建一个测试赛事和两个团队（容量 --max-members，含队长）
+2. --joins 个线程在同一时刻向团队 A 发起加入请求（约 10% 为重复学号）
+3. 再让一批线程同时在 A/B 之间转队、退出、重新加入
+4. 每一轮结束后校验：成员数不超过上限、member_count 等于 1 + 成员行数、201 响应数与成员行数一致
+
+需要先启动服务（建议使用 gunicorn -c gunicorn.conf.py wsgi:application）。
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+
+from database import get_connection
+
+
+def create_test_teams(max_members):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO contests (name, type, status) VALUES ('组队压测赛事', 'benchmark', 'published')")
+    contest_id = cursor.lastrowid
+    team_ids = []
+    for name in ('压测团队A', '压测团队B'):
+        cursor.execute("""
+            INSERT INTO contest_teams (contest_id, name, captain_name, captain_student_id, max_members, member_count)
+            VALUES (%s, %s, %s, %s, %s, 1)
+        """, (contest_id, name, f'{name}队长', f'CAP-{name}', max_members))
+        team_ids.append(cursor.lastrowid)
+    connection.commit()
+    cursor.close()
+    connection.close()
+    return contest_id, team_ids
+
+
+def verify(team_ids):
+    connection = get_connection()
+    cursor = connection.cursor()
+    problems = []
+    sizes = {}
+    for team_id in team_ids:
+        cursor.execute('SELECT member_count, max_members FROM contest_teams WHERE id = %s', (team_id,))
+        team = cursor.fetchone()
+        cursor.execute('SELECT COUNT(*) AS members FROM team_members WHERE team_id = %s', (team_id,))
+        members = cursor.fetchone()['members']
+        sizes[team_id] = members
+        if team['member_count'] != members + 1:
+            problems.append(f"团队 {team_id}: member_count {team['member_count']} 与 1 + 成员行数 {members} 不一致")
+        if team['member_count'] > team['max_members']:
+            problems.append(f"团队 {team_id}: 超员 {team['member_count']} > {team['max_members']}")
+    cursor.close()
+    connection.close()
+    return sizes, problems
+
+
+def cleanup(contest_id):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM contests WHERE id = %s', (contest_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def burst(host, port, calls):
+    """
+    所有线程在同一时刻发出请求，calls 为 (method, path, body) 列表，返回状态码计数
+    """
+    barrier = threading.Barrier(len(calls))
+    status_counts = {}
+    lock = threading.Lock()
+
+    def worker(method, path, body):
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        barrier.wait()
+        try:
+            connection.request(method, path, body=json.dumps(body).encode('utf-8'),
+                               headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except Exception:
+            status = 'error'
+        finally:
+            connection.close()
+        with lock:
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=call) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return status_counts
+
+
+def join_call(team_id, student_id):
+    return 'POST', f'/api/teams/{team_id}/members', {
+        'student_name': f'压测学生{student_id}',
+        'student_id': student_id
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='团队加入并发压测')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--joins', type=int, default=500)
+    parser.add_argument('--max-members', type=int, default=10)
+    parser.add_argument('--keep', action='store_true', help='保留测试数据')
+    args = parser.parse_args()
+
+    test_contest_id, (team_a, team_b) = create_test_teams(args.max_members)
+    issues = []
+    try:
+        # 第一轮：同时加入团队 A
+        students = [f'T{seq:06d}' for seq in range(args.joins)]
+        calls = [join_call(team_a, random.choice(students[:seq]) if seq and random.random() < 0.1 else student)
+                 for seq, student in enumerate(students)]
+        status_counts = burst(args.host, args.port, calls)
+        sizes, problems = verify([team_a, team_b])
+        print(f"\n【{args.joins} 个并发加入，容量 {args.max_members}】")
+        print(f"   状态码: {status_counts}  团队A成员: {sizes[team_a]}")
+        if status_counts.get(201, 0) != sizes[team_a]:
+            problems.append(f"201 响应数 {status_counts.get(201, 0)} 与成员行数 {sizes[team_a]} 不一致")
+        if sizes[team_a] != args.max_members - 1:
+            problems.append(f"团队A未被填满: {sizes[team_a]} / {args.max_members - 1}")
+        issues.extend(problems)
+
+        # 第二轮：A 的成员同时转入 B 或退出，其余学生同时抢 A 空出的名额
+        connection = get_connection()
+        cursor = connection.cursor()
+        cursor.execute('SELECT student_id FROM team_members WHERE team_id = %s', (team_a,))
+        members = [row['student_id'] for row in cursor.fetchall()]
+        cursor.close()
+        connection.close()
+
+        calls = []
+        for student_id in members:
+            if random.random() < 0.5:
+                calls.append(('POST', f'/api/teams/{team_a}/transfer',
+                              {'student_id': student_id, 'target_team_id': team_b}))
+            else:
+                calls.append(('POST', f'/api/teams/{team_a}/leave', {'student_id': student_id}))
+        calls.extend(join_call(random.choice([team_a, team_b]), f'R{seq:06d}') for seq in range(args.joins))
+        status_counts = burst(args.host, args.port, calls)
+        sizes, problems = verify([team_a, team_b])
+        print(f"\n【转队 / 退出 / 加入混合 {len(calls)} 个并发请求】")
+        print(f"   状态码: {status_counts}  团队A成员: {sizes[team_a]}  团队B成员: {sizes[team_b]}")
+        issues.extend(problems)
+
+        for issue in issues:
+            print(f"   ❌ {issue}")
+        if not issues:
+            print("   ✅ 无超员，member_count 与成员行数一致")
+    finally:
+        if not args.keep:
+            cleanup(test_contest_id)
+
+    sys.exit(1 if issues else 0)
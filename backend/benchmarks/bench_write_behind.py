@@ -0,0 +1,124 @@
+"""
+写后批量提交与逐行提交的写入吞吐对比
+    python -m benchmarks.bench_write_behind [--rows 20000] [--threads 32]
+
+两种方式都用 --threads 个线程并发写入 --rows 条通知：
+- 逐行提交：每条通知独立取连接、INSERT、COMMIT（原来的写法）
+- 写后队列：每条通知 submit() 进入 notification_queue，等待确认后返回
+输出每秒写入行数，结束后删除测试数据。
+"""
+import argparse
+import threading
+import time
+
+from database import get_connection
+from write_behind import WriteBehindQueue, insert_writer
+
+NOTIFICATION_COLUMNS = ['contest_id', 'notification_type', 'title', 'content', 'recipient']
+BENCH_TYPE = 'system'
+
+
+def create_test_contest():
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO contests (name, type, status) VALUES ('写入压测赛事', 'benchmark', 'draft')")
+    connection.commit()
+    contest_id = cursor.lastrowid
+    cursor.close()
+    connection.close()
+    return contest_id
+
+
+def cleanup(contest_id):
+    connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM contest_notifications WHERE contest_id = %s', (contest_id,))
+    cursor.execute('DELETE FROM contests WHERE id = %s', (contest_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def run_threads(threads, rows, write_one):
+    """
+    threads 个线程分摊 rows 次写入，返回 (耗时秒数, 失败数)
+    """
+    failures = []
+    counter = iter(range(rows))
+    counter_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with counter_lock:
+                seq = next(counter, None)
+            if seq is None:
+                return
+            try:
+                write_one(seq)
+            except Exception as e:
+                failures.append(e)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, len(failures)
+
+
+def bench_row_at_a_time(contest_id, rows, threads):
+    sql = (f"INSERT INTO contest_notifications ({', '.join(NOTIFICATION_COLUMNS)}) "
+           f"VALUES ({', '.join(['%s'] * len(NOTIFICATION_COLUMNS))})")
+
+    def write_one(seq):
+        connection = get_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, (contest_id, BENCH_TYPE, f'逐行 {seq}', '压测通知', None))
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+
+    return run_threads(threads, rows, write_one)
+
+
+def bench_write_behind(contest_id, rows, threads, max_batch, flush_interval):
+    # 单独建一个不递增数据版本号的队列，避免压测数据影响缓存
+    write_queue = WriteBehindQueue('bench', insert_writer('contest_notifications', NOTIFICATION_COLUMNS),
+                                   max_batch=max_batch, flush_interval=flush_interval)
+
+    def write_one(seq):
+        write_queue.submit((contest_id, BENCH_TYPE, f'批量 {seq}', '压测通知', None), wait=True, timeout=30)
+
+    elapsed, failed = run_threads(threads, rows, write_one)
+    write_queue.close()
+    return elapsed, failed, write_queue.stats['batches']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='写后批量提交吞吐对比')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--max-batch', type=int, default=500)
+    parser.add_argument('--flush-interval', type=float, default=0.02)
+    args = parser.parse_args()
+
+    test_contest_id = create_test_contest()
+    try:
+        print(f"\n📊 写入 {args.rows} 条通知，{args.threads} 个并发线程")
+
+        elapsed, failed = bench_row_at_a_time(test_contest_id, args.rows, args.threads)
+        row_rate = (args.rows - failed) / elapsed
+        print(f"   逐行提交:   {row_rate:10.0f} 行/秒  耗时 {elapsed:.2f}s  失败 {failed}")
+
+        elapsed, failed, batches = bench_write_behind(test_contest_id, args.rows, args.threads,
+                                                      args.max_batch, args.flush_interval)
+        batch_rate = (args.rows - failed) / elapsed
+        print(f"   写后队列:   {batch_rate:10.0f} 行/秒  耗时 {elapsed:.2f}s  失败 {failed}  "
+              f"批次 {batches}（平均 {args.rows / max(batches, 1):.0f} 行/批）")
+
+        print(f"   提升: {batch_rate / row_rate:.1f}x")
+    finally:
+        cleanup(test_contest_id)
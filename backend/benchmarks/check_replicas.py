@@ -0,0 +1,128 @@
+"""
+读写分离检查（需要一个主库和至少一个从库）
+    DB_REPLICAS=127.0.0.1:3306 python -m benchmarks.check_replicas [--reads 200]
+
+本地两个实例：主库 3305（server-id=1、开启 binlog），从库 3306（server-id=2），在从库上执行
+CHANGE REPLICATION SOURCE TO SOURCE_HOST='127.0.0.1', SOURCE_PORT=3305, ... ; START REPLICA;
+
+1. 输出主库和各从库的 @@server_id 与复制延迟
+2. 在主库写入一行后轮询从库，测量写入在从库上可见的耗时
+3. 用 Flask 测试客户端检查路由：GET 连接从库；POST 成功后响应带 X-Primary-Until，带回该值的 GET 连接主库；
+   复制延迟超过阈值（停止从库 SQL 线程可模拟）时 GET 回退到主库
+4. 输出各库连接池统计
+"""
+import argparse
+import time
+
+from flask import Flask, jsonify
+
+import database
+from database import get_connection, pool_stats
+from db_routing import STICKY_HEADER, init_db_routing
+
+
+def server_id(connection):
+    cursor = connection.cursor()
+    cursor.execute('SELECT @@server_id AS server_id')
+    value = cursor.fetchone()['server_id']
+    cursor.close()
+    connection.commit()
+    return value
+
+
+def make_app():
+    app = Flask(__name__)
+    init_db_routing(app)
+
+    @app.route('/server-id', methods=['GET', 'POST'])
+    def current_server():
+        connection = get_connection()
+        try:
+            return jsonify({'server_id': server_id(connection), 'target': connection.target})
+        finally:
+            connection.close()
+
+    return app
+
+
+def replication_delay(timeout=10.0):
+    """
+    主库写入一行后轮询第一个从库，返回写入可见的秒数（超时返回 None）
+    """
+    primary = get_connection(primary=True)
+    cursor = primary.cursor()
+    cursor.execute('CREATE TABLE IF NOT EXISTS replica_check (id INT PRIMARY KEY, token DOUBLE NOT NULL)')
+    token = time.time()
+    cursor.execute('REPLACE INTO replica_check (id, token) VALUES (1, %s)', (token,))
+    primary.commit()
+    started = time.perf_counter()
+
+    replica = database._replicas[0].pool.acquire()
+    replica_cursor = replica.cursor()
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                replica_cursor.execute('SELECT token FROM replica_check WHERE id = 1')
+                row = replica_cursor.fetchone()
+            except database.Error:
+                row = None
+            replica.commit()
+            if row and row['token'] == token:
+                return time.perf_counter() - started
+            time.sleep(0.005)
+        return None
+    finally:
+        replica_cursor.close()
+        replica.close()
+        cursor.execute('DROP TABLE IF EXISTS replica_check')
+        primary.commit()
+        cursor.close()
+        primary.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='读写分离检查')
+    parser.add_argument('--reads', type=int, default=200, help='路由检查的 GET 请求数')
+    args = parser.parse_args()
+
+    if not database.REPLICA_CONFIGS:
+        raise SystemExit('❌ 未配置从库：设置环境变量 DB_REPLICAS=host:port[,host:port]')
+
+    print("\n【实例】")
+    connection = get_connection(primary=True)
+    primary_id = server_id(connection)
+    connection.close()
+    print(f"   主库 {database.DB_CONFIG['host']}:{database.DB_CONFIG['port']}  server_id={primary_id}")
+    for replica in database._replicas:
+        try:
+            connection = replica.pool.acquire()
+            replica_id = server_id(connection)
+            connection.close()
+        except database.Error as e:
+            replica_id = f'不可达（{e}）'
+        print(f"   从库 {replica.pool.name}  server_id={replica_id}  复制延迟={replica.current_lag()}")
+
+    delay = replication_delay()
+    print(f"   写入在从库可见耗时: {'超时' if delay is None else f'{delay * 1000:.1f} ms'}")
+
+    print("\n【路由】")
+    client = make_app().test_client()
+    targets = {}
+    for _ in range(args.reads):
+        target = client.get('/server-id').get_json()['target']
+        targets[target] = targets.get(target, 0) + 1
+    print(f"   {args.reads} 次 GET: {targets}")
+    if 'primary' in targets:
+        print(f"   ⚠️  有 {targets['primary']} 次回退到主库（从库复制未运行或延迟超过 {database.MAX_REPLICA_LAG}s）")
+
+    response = client.post('/server-id')
+    until = response.headers.get(STICKY_HEADER)
+    sticky = client.get('/server-id', headers={STICKY_HEADER: until}).get_json()
+    print(f"   POST 后 {STICKY_HEADER}={until}，带回后的 GET 连接: {sticky['target']}")
+    print("   ✅ 读己之写" if sticky['target'] == 'primary' else "   ❌ 写后读没有访问主库")
+
+    print("\n【连接池】")
+    stats = pool_stats()
+    for snapshot in [stats['primary']] + stats['replicas']:
+        print(f"   {snapshot}")
+    print(f"   路由: {stats['routing']}")
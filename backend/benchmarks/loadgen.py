@@ -0,0 +1,117 @@
+"""
+基于标准库的简单HTTP压测工具：多线程 + keep-alive 连接，统计吞吐量和延迟分位数
+"""
+import http.client
+import json
+import threading
+import time
+
+
+def percentile(sorted_values, pct):
+    """
+    计算已排序列表的分位数（最近秩法）
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load(host, port, requests, concurrency=32, duration=10.0, rate=None):
+    """
+    以 concurrency 个线程持续发送请求 duration 秒
+    requests: 可调用对象 (worker_index, seq) -> (method, path, body_dict或None)
+    rate: 可选的总目标速率（请求/秒），为空时尽可能快地发送
+    返回包含吞吐量、延迟分位数和状态码分布的字典
+    """
+    latencies = []
+    status_counts = {}
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    interval = concurrency / float(rate) if rate else 0.0
+
+    def worker(worker_index):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local_latencies = []
+        local_status = {}
+        local_errors = 0
+        seq = 0
+        next_send = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if interval:
+                if now < next_send:
+                    time.sleep(next_send - now)
+                next_send += interval
+            method, path, body = requests(worker_index, seq)
+            seq += 1
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload else {}
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                local_latencies.append(time.perf_counter() - start)
+                local_status[response.status] = local_status.get(response.status, 0) + 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+                    connection = http.client.HTTPConnection(host, port, timeout=30)
+            except Exception:
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            for status, count in local_status.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'status': status_counts
+    }
+
+
+def wait_for_port(host, port, timeout=30.0):
+    """
+    等待服务端口可连接
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request('GET', '/api/health')
+            connection.getresponse().read()
+            connection.close()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def print_result(title, result):
+    print(f"\n【{title}】")
+    print(f"   请求数: {result['requests']}  错误: {result['errors']}  吞吐量: {result['rps']} req/s")
+    print(f"   延迟 p50: {result['p50_ms']} ms  p95: {result['p95_ms']} ms  "
+          f"p99: {result['p99_ms']} ms  max: {result['max_ms']} ms")
+    print(f"   状态码: {result['status']}")
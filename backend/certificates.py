@@ -0,0 +1,453 @@
+"""
+证书批量生成模块
+为已公示的竞赛结果逐条渲染PDF证书，使用进程池在所有CPU核心上并行生成。
+
+用法:
+    python certificates.py create <contest_id> [--mode dir|zip]   创建任务并立即执行
+    python certificates.py run <job_id>                           执行（或断点续跑）指定任务
+    python certificates.py status <job_id>                        查看任务进度
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import socket
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from database import get_connection
+from http_cache import bump_versions
+
+# 证书输出根目录
+CERTIFICATE_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'certificate_output')
+
+# 每批从数据库读取并渲染的结果条数，每批结束后更新一次任务记录
+BATCH_SIZE = 500
+# running 状态超过该秒数没有心跳（每批更新一次）的任务视为执行进程已退出，可以被重新领取
+STALE_AFTER = 120
+
+# 证书模板：每行为 (文本模板, 字号, 距页面底部的纵坐标)，文本水平居中
+CERTIFICATE_TEMPLATE = [
+    ('荣誉证书', 48, 470),
+    ('{recipient}：', 22, 390),
+    ('在「{contest_name}」中表现优异，荣获{award_name}。', 20, 340),
+    ('最终得分：{final_score}    排名：第{ranking}名', 16, 290),
+    ('特发此证，以资鼓励。', 16, 250),
+    ('证书编号：{certificate_number}', 12, 120),
+    ('{issued_date}', 14, 90),
+]
+
+AWARD_NAMES = {
+    'first': '一等奖',
+    'second': '二等奖',
+    'third': '三等奖',
+    'excellence': '优秀奖',
+    'participation': '参与奖'
+}
+
+# A4 横向
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+
+
+def make_certificate_number(contest_id, result_id):
+    """
+    为没有证书编号的结果生成确定性的编号（重复执行得到相同编号）
+    """
+    return f"CERT-{contest_id:05d}-{result_id:08d}"
+
+
+def shard_path(contest_id, certificate_number):
+    """
+    证书文件的相对路径：按编号哈希前两位分片，避免单目录下文件过多
+    """
+    shard = hashlib.md5(certificate_number.encode('utf-8')).hexdigest()[:2]
+    return os.path.join(f'contest_{contest_id}', shard, f'{certificate_number}.pdf')
+
+
+def _pdf_text(text):
+    """
+    将文本编码为 UniGB-UCS2-H 所需的 UTF-16BE 十六进制串
+    """
+    return '<' + text.encode('utf-16-be', errors='replace').hex().upper() + '>'
+
+
+def _text_width(text, font_size):
+    # STSong-Light 中汉字为全角，ASCII字符按半角估算
+    units = sum(500 if ord(ch) < 128 else 1000 for ch in text)
+    return units * font_size / 1000.0
+
+
+def render_certificate(fields, template=None):
+    """
+    根据模板渲染单张证书，返回PDF字节
+    只使用PDF阅读器内置的 STSong-Light 中文字体，不依赖任何第三方库或字体文件
+    """
+    lines = []
+    # 双线边框
+    lines.append('0.62 0.45 0.12 RG 3 w 30 30 782 535 re S 1 w 42 42 758 511 re S')
+    lines.append('0 0 0 rg')
+    for text_template, font_size, y in (template or CERTIFICATE_TEMPLATE):
+        text = text_template.format(**fields)
+        x = (PAGE_WIDTH - _text_width(text, font_size)) / 2
+        lines.append(f'BT /F1 {font_size} Tf {x:.1f} {y} Td {_pdf_text(text)} Tj ET')
+    content = '\n'.join(lines).encode('ascii')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+         f'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>').encode('ascii'),
+        b'<< /Length ' + str(len(content)).encode('ascii') + b' >>\nstream\n' + content + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H '
+        b'/DescendantFonts [6 0 R] >>',
+        b'<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light '
+        b'/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> '
+        b'/FontDescriptor 7 0 R /DW 1000 /W [1 95 500] >>',
+        b'<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] '
+        b'/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>',
+    ]
+
+    pdf = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for index, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f'{index} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+    xref_offset = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    for offset in offsets:
+        pdf += f'{offset:010d} 00000 n \n'.encode('ascii')
+    pdf += (f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+            f'startxref\n{xref_offset}\n%%EOF\n').encode('ascii')
+    return bytes(pdf)
+
+
+def _render_task(task):
+    """
+    进程池任务：渲染一张证书；目录模式下直接在子进程中写文件，zip模式下把字节返回给主进程
+    """
+    result_id, relative_path, fields, output_root = task
+    data = render_certificate(fields)
+    if output_root is None:
+        return result_id, relative_path, data
+    full_path = os.path.join(output_root, relative_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'wb') as f:
+        f.write(data)
+    return result_id, relative_path, None
+
+
+def create_job(contest_id, output_mode='dir'):
+    """
+    为赛事创建证书生成任务，返回任务ID
+    """
+    if output_mode not in ('dir', 'zip'):
+        raise ValueError('output_mode 必须是 dir 或 zip')
+
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) AS total FROM contest_results
+            WHERE contest_id = %s AND is_published = TRUE
+        """, (contest_id,))
+        total = cursor.fetchone()['total']
+
+        if output_mode == 'zip':
+            output_path = os.path.join(CERTIFICATE_OUTPUT_DIR, f'contest_{contest_id}.zip')
+        else:
+            output_path = CERTIFICATE_OUTPUT_DIR
+
+        cursor.execute("""
+            INSERT INTO certificate_jobs (contest_id, status, total, output_mode, output_path)
+            VALUES (%s, 'pending', %s, %s, %s)
+        """, (contest_id, total, output_mode, output_path))
+        connection.commit()
+        job_id = cursor.lastrowid
+        cursor.close()
+        return job_id
+    finally:
+        connection.close()
+
+
+def get_job(job_id):
+    """
+    读取任务记录，附带完成百分比
+    """
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SELECT * FROM certificate_jobs WHERE id = %s', (job_id,))
+        job = cursor.fetchone()
+        cursor.close()
+    finally:
+        connection.close()
+
+    if job:
+        for key, value in job.items():
+            if isinstance(value, datetime):
+                job[key] = value.isoformat()
+        job['progress'] = round(job['processed'] * 100.0 / job['total'], 2) if job['total'] else 100.0
+    return job
+
+
+class _LeaseLost(Exception):
+    """任务已被其他执行进程接管"""
+
+
+def _runner_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _claim(connection, cursor, job_id, runner):
+    """
+    领取任务：待执行、失败或心跳超时（执行进程已退出）的任务才能被领取，返回是否领取成功
+    """
+    cursor.execute("""
+        UPDATE certificate_jobs
+        SET status = 'running', error = NULL, locked_by = %s, heartbeat_at = NOW(),
+            started_at = COALESCE(started_at, NOW())
+        WHERE id = %s
+          AND (status IN ('pending', 'failed')
+               OR (status = 'running'
+                   AND (heartbeat_at IS NULL OR heartbeat_at < NOW() - INTERVAL %s SECOND)))
+    """, (runner, job_id, STALE_AFTER))
+    claimed = cursor.rowcount == 1
+    connection.commit()
+    return claimed
+
+
+def _parts_dir(output_path):
+    return output_path + '.parts'
+
+
+def _write_part(part_path, entries):
+    """
+    把一批证书写成独立的分卷压缩包：先写临时文件并落盘，再原子重命名
+    中断时只会留下不完整的临时文件，已完成的分卷始终可读
+    """
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    temp_path = part_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_STORED) as part:
+            for relative_path, data in entries:
+                part.writestr(relative_path, data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, part_path)
+
+
+def _merge_parts(output_path):
+    """
+    任务完成时把所有分卷（以及旧版本直接追加写入的压缩包）合并为最终压缩包，原子替换后删除分卷
+    """
+    parts_dir = _parts_dir(output_path)
+    if not os.path.isdir(parts_dir) and os.path.exists(output_path):
+        # 上次执行已合并完成，只是没来得及标记任务完成
+        return
+    sources = []
+    if os.path.exists(output_path):
+        sources.append(output_path)
+    if os.path.isdir(parts_dir):
+        sources.extend(os.path.join(parts_dir, name) for name in sorted(os.listdir(parts_dir))
+                       if name.endswith('.zip'))
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = output_path + '.tmp'
+    names = set()
+    with open(temp_path, 'wb') as f:
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_STORED) as merged:
+            for source in sources:
+                try:
+                    archive = zipfile.ZipFile(source)
+                except zipfile.BadZipFile:
+                    print(f"跳过损坏的压缩包: {source}")
+                    continue
+                with archive:
+                    for name in archive.namelist():
+                        if name not in names:
+                            names.add(name)
+                            merged.writestr(name, archive.read(name))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, output_path)
+    if os.path.isdir(parts_dir):
+        shutil.rmtree(parts_dir)
+
+
+def run_job(job_id, workers=None):
+    """
+    执行证书生成任务
+    按结果ID顺序分批处理，每批的证书落盘后（zip 模式下每批一个分卷，原子写入）才把水位(last_result_id)和进度
+    写回任务记录，中断后再次执行同一任务会从水位处继续。执行前先领取任务租约，同一任务只有一个执行进程，
+    其他进程执行中时直接返回任务当前状态。
+    """
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+
+    cursor = connection.cursor()
+    cursor.execute('SELECT * FROM certificate_jobs WHERE id = %s', (job_id,))
+    job = cursor.fetchone()
+    if not job:
+        cursor.close()
+        connection.close()
+        raise ValueError(f'证书任务 {job_id} 不存在')
+    if job['status'] == 'completed':
+        cursor.close()
+        connection.close()
+        return job
+
+    contest_id = job['contest_id']
+    cursor.execute('SELECT id, name FROM contests WHERE id = %s', (contest_id,))
+    contest = cursor.fetchone()
+    if not contest:
+        cursor.close()
+        connection.close()
+        raise ValueError(f'赛事 {contest_id} 不存在')
+
+    runner = _runner_name()
+    if not _claim(connection, cursor, job_id, runner):
+        cursor.close()
+        connection.close()
+        print(f"证书任务 {job_id} 正在由其他进程执行")
+        return get_job(job_id)
+
+    # 领取之后重新读取水位：可能是接管了被中断的任务
+    cursor.execute('SELECT processed, last_result_id FROM certificate_jobs WHERE id = %s', (job_id,))
+    job.update(cursor.fetchone())
+    connection.commit()
+
+    zip_mode = job['output_mode'] == 'zip'
+    output_root = None if zip_mode else job['output_path']
+    issued_date = datetime.now().strftime('%Y年%m月%d日')
+    last_result_id = job['last_result_id'] or 0
+    processed = job['processed'] or 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            while True:
+                cursor.execute("""
+                    SELECT id, team_name, student_name, student_id, award_level,
+                           final_score, ranking, certificate_number
+                    FROM contest_results
+                    WHERE contest_id = %s AND is_published = TRUE AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (contest_id, last_result_id, BATCH_SIZE))
+                results = cursor.fetchall()
+                connection.commit()
+                if not results:
+                    break
+
+                tasks = []
+                new_numbers = []
+                for result in results:
+                    certificate_number = result['certificate_number']
+                    if not certificate_number:
+                        certificate_number = make_certificate_number(contest_id, result['id'])
+                        new_numbers.append((certificate_number, result['id']))
+                    relative_path = shard_path(contest_id, certificate_number)
+                    recipient = result['student_name'] or result['team_name'] or ''
+                    if result['student_name'] and result['team_name']:
+                        recipient = f"{result['student_name']}（{result['team_name']}）"
+                    fields = {
+                        'recipient': recipient,
+                        'contest_name': contest['name'],
+                        'award_name': AWARD_NAMES.get(result['award_level'], '奖项'),
+                        'final_score': result['final_score'] if result['final_score'] is not None else '-',
+                        'ranking': result['ranking'] if result['ranking'] is not None else '-',
+                        'certificate_number': certificate_number,
+                        'issued_date': issued_date
+                    }
+                    tasks.append((result['id'], relative_path, fields, output_root))
+
+                chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+                rendered = [(relative_path, data)
+                            for _, relative_path, data in pool.map(_render_task, tasks, chunksize=chunksize)]
+                if zip_mode:
+                    # 分卷按本批第一条结果ID命名：中断后重跑同一批会覆盖同名分卷
+                    _write_part(os.path.join(_parts_dir(job['output_path']), f"part-{results[0]['id']:010d}.zip"),
+                                rendered)
+
+                last_result_id = results[-1]['id']
+                processed += len(results)
+
+                if new_numbers:
+                    cursor.executemany(
+                        'UPDATE contest_results SET certificate_number = %s WHERE id = %s',
+                        new_numbers
+                    )
+                cursor.execute("""
+                    UPDATE certificate_jobs
+                    SET processed = %s, last_result_id = %s, heartbeat_at = NOW()
+                    WHERE id = %s AND locked_by = %s
+                """, (processed, last_result_id, job_id, runner))
+                if cursor.rowcount != 1:
+                    raise _LeaseLost()
+                connection.commit()
+                if new_numbers:
+                    bump_versions(cursor, 'contest_results')
+
+        if zip_mode:
+            _merge_parts(job['output_path'])
+
+        cursor.execute("""
+            UPDATE certificate_jobs
+            SET status = 'completed', total = %s, finished_at = NOW(), heartbeat_at = NOW()
+            WHERE id = %s AND locked_by = %s
+        """, (processed, job_id, runner))
+        connection.commit()
+
+    except _LeaseLost:
+        connection.rollback()
+        print(f"证书任务 {job_id} 已被其他进程接管，停止执行")
+
+    except Exception as e:
+        connection.rollback()
+        cursor.execute(
+            "UPDATE certificate_jobs SET status = 'failed', error = %s WHERE id = %s AND locked_by = %s",
+            (str(e), job_id, runner)
+        )
+        connection.commit()
+        print(f"证书生成错误: {e}")
+        raise
+
+    finally:
+        cursor.close()
+        connection.close()
+
+    return get_job(job_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='竞赛证书批量生成')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help='创建任务并执行')
+    create_parser.add_argument('contest_id', type=int)
+    create_parser.add_argument('--mode', choices=['dir', 'zip'], default='dir')
+    create_parser.add_argument('--workers', type=int, default=None)
+
+    run_parser = subparsers.add_parser('run', help='执行或续跑任务')
+    run_parser.add_argument('job_id', type=int)
+    run_parser.add_argument('--workers', type=int, default=None)
+
+    status_parser = subparsers.add_parser('status', help='查看任务进度')
+    status_parser.add_argument('job_id', type=int)
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        new_job_id = create_job(args.contest_id, args.mode)
+        print(f"✅ 已创建证书任务 {new_job_id}")
+        print(run_job(new_job_id, args.workers))
+    elif args.command == 'run':
+        print(run_job(args.job_id, args.workers))
+    else:
+        print(get_job(args.job_id))
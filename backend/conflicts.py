@@ -0,0 +1,778 @@
+"""
+赛事冲突检测
+检测单个赛事与其他赛事的时间冲突、场地冲突、人员冲突、设备冲突，并保存到 contest_conflicts。
+同步接口、后台任务和定期巡检共用这里的逻辑。
+
+保存时与已有的未解决冲突逐条对比：新出现的冲突插入并发送通知，已经不存在的冲突自动标记为已解决，
+仍然存在的冲突保持原记录不变（不删除重建）。
+
+定期巡检只重新检测上次巡检之后修改过的赛事（contests.updated_at、contest_venues.updated_at），
+以及与它们时间重叠、或把它们记为冲突对象的赛事，不对全部赛事两两比较。
+
+人员冲突：赛事人员（按归一化的联系方式识别同一人）和评审专家被安排到时间重叠的赛事。
+设备冲突：同一时刻在用赛事对某种设备的合计需求超过 equipment_inventory 中的库存；单个赛事的需求已超过库存时
+记为不指向其他赛事的 resource 冲突。
+场地容量：已通过报名数（contests.approved_count，审核时增量维护）超过赛事场地总容量，记为不指向其他赛事的 venue 冲突。
+
+用法:
+    python conflicts.py sweep [--full] [--interval 300]   增量巡检（--full 检测全部赛事，--interval 循环执行）
+    python conflicts.py personnel                         全量检测人员冲突
+    python conflicts.py resources                         全量检测设备冲突
+    python conflicts.py capacity                          全量校验场地容量
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from archive import ARCHIVE_STATUSES
+from database import get_connection
+from http_cache import bump_versions
+from write_behind import notification_queue
+
+AUTO_RESOLUTION = '自动检测：冲突已消失'
+
+# 水位回退秒数：updated_at 取语句执行时间，事务可能晚于巡检开始才提交，回退一段时间重复检测不会产生重复记录
+SWEEP_OVERLAP = 60
+SWEEP_LOCK = 'conflict_sweep'
+NEIGHBOUR_CHUNK_SIZE = 500
+
+
+def find_conflicts(cursor, contest):
+    """
+    检测 contest（contests 表的一行）与其他赛事的冲突，返回冲突列表
+    """
+    contest_id = contest['id']
+    detected_conflicts = []
+
+    # 1. 检测时间冲突
+    if contest['start_date'] and contest['end_date']:
+        cursor.execute("""
+            SELECT id, name, start_date, end_date
+            FROM contests
+            WHERE id != %s
+            AND status != 'rejected'
+            AND start_date IS NOT NULL
+            AND end_date IS NOT NULL
+            AND (
+                (start_date <= %s AND end_date >= %s) OR
+                (start_date <= %s AND end_date >= %s) OR
+                (start_date >= %s AND end_date <= %s)
+            )
+        """, (contest_id,
+              contest['start_date'], contest['start_date'],
+              contest['end_date'], contest['end_date'],
+              contest['start_date'], contest['end_date']))
+
+        for conflict in cursor.fetchall():
+            detected_conflicts.append({
+                'type': 'time',
+                'with_id': conflict['id'],
+                'with_name': conflict['name'],
+                'description': f"与赛事《{conflict['name']}》时间冲突",
+                'severity': 'high'
+            })
+
+    # 2. 检测场地冲突
+    cursor.execute("""
+        SELECT name, address
+        FROM contest_venues
+        WHERE contest_id = %s
+    """, (contest_id,))
+
+    for venue in cursor.fetchall():
+        cursor.execute("""
+            SELECT DISTINCT c.id, c.name
+            FROM contest_venues v
+            JOIN contests c ON v.contest_id = c.id
+            WHERE c.id != %s
+            AND c.status != 'rejected'
+            AND (v.name = %s OR v.address = %s)
+            AND c.start_date IS NOT NULL
+            AND c.end_date IS NOT NULL
+            AND (
+                (c.start_date <= %s AND c.end_date >= %s) OR
+                (c.start_date <= %s AND c.end_date >= %s)
+            )
+        """, (contest_id, venue['name'], venue['address'],
+              contest['start_date'], contest['start_date'],
+              contest['end_date'], contest['end_date']))
+
+        for conflict in cursor.fetchall():
+            detected_conflicts.append({
+                'type': 'venue',
+                'with_id': conflict['id'],
+                'with_name': conflict['name'],
+                'description': f"场地《{venue['name']}》与赛事《{conflict['name']}》冲突",
+                'severity': 'high'
+            })
+
+    # 3. 检测人员冲突（同一人员 / 评审专家被安排到时间重叠的赛事）
+    if contest['start_date'] and contest['end_date']:
+        bookings = load_bookings(cursor, (contest['start_date'], contest['end_date']))
+        detected_conflicts.extend(personnel_overlaps(bookings, only=contest_id).get(contest_id, []))
+
+    # 4. 检测设备冲突（时间重叠的赛事合计需求超过库存）
+    if contest['start_date'] and contest['end_date']:
+        demands = load_equipment_demands(cursor, (contest['start_date'], contest['end_date']))
+        detected_conflicts.extend(resource_overlaps(demands, only=contest_id).get(contest_id, []))
+
+    # 5. 检测场地容量（已通过报名数超过场地总容量）
+    detected_conflicts.extend(capacity_overflows(cursor, [contest_id]).get(contest_id, []))
+
+    return detected_conflicts
+
+
+# ==================== 人员冲突 ====================
+
+PERSONNEL_ROLES = {'organizer': '组织者', 'judge': '评委', 'volunteer': '志愿者', 'expert': '评审专家'}
+
+# 人员安排：赛事人员表 + 评审分配（专家优先按手机号、其次按邮箱与赛事人员匹配）
+_BOOKINGS = """
+    SELECT p.contest_id, c.name AS contest_name, c.start_date, c.end_date,
+           p.name, p.role, p.contact, NULL AS expert_id
+    FROM contest_personnel p
+    JOIN contests c ON p.contest_id = c.id
+    WHERE c.status != 'rejected' AND c.start_date IS NOT NULL AND c.end_date IS NOT NULL {window}
+    UNION ALL
+    SELECT j.contest_id, c.name AS contest_name, c.start_date, c.end_date,
+           e.name, 'expert' AS role, COALESCE(NULLIF(e.phone, ''), e.email) AS contact, e.id AS expert_id
+    FROM judge_assignments j
+    JOIN experts e ON j.expert_id = e.id
+    JOIN contests c ON j.contest_id = c.id
+    WHERE j.status != 'rejected'
+      AND c.status != 'rejected' AND c.start_date IS NOT NULL AND c.end_date IS NOT NULL {window}
+"""
+
+
+def normalize_contact(value):
+    """
+    联系方式归一化：去掉空白和分隔符、转小写，手机号去掉 +86 前缀；为空时返回 None
+    """
+    if not value:
+        return None
+    contact = ''.join(ch for ch in str(value).strip().lower() if not ch.isspace() and ch not in '-()（）')
+    if contact.startswith('+'):
+        contact = contact[1:]
+    if contact.isdigit() and len(contact) == 13 and contact.startswith('86'):
+        contact = contact[2:]
+    return contact or None
+
+
+def _person_key(booking):
+    contact = normalize_contact(booking['contact'])
+    if contact:
+        return contact
+    # 没有联系方式的专家按专家ID识别，没有联系方式的赛事人员无法识别为同一人
+    return f"expert:{booking['expert_id']}" if booking['expert_id'] else None
+
+
+def load_bookings(cursor, window=None):
+    """
+    读取人员安排；window 为 (开始, 结束) 时只读取与该时间段重叠的赛事
+    """
+    if window is None:
+        cursor.execute(_BOOKINGS.format(window=''))
+    else:
+        start, end = window
+        cursor.execute(_BOOKINGS.format(window='AND c.start_date <= %s AND c.end_date >= %s'),
+                       (end, start, end, start))
+    return cursor.fetchall()
+
+
+def personnel_overlaps(bookings, only=None):
+    """
+    按人员建立 人员 -> 时间段 的哈希索引，每个人员的时间段按开始时间排序后一次扫描找出所有重叠，
+    返回 {赛事ID: [冲突, ...]}；only 不为空时只返回涉及该赛事的冲突
+    """
+    index = {}
+    for booking in bookings:
+        key = _person_key(booking)
+        if key:
+            index.setdefault(key, []).append(booking)
+
+    overlaps = {}
+    seen = set()
+
+    def add(booking, other, key):
+        if only is not None and booking['contest_id'] != only:
+            return
+        marker = (booking['contest_id'], other['contest_id'], key)
+        if marker in seen:
+            return
+        seen.add(marker)
+        role = PERSONNEL_ROLES.get(booking['role'], booking['role'])
+        overlaps.setdefault(booking['contest_id'], []).append({
+            'type': 'personnel',
+            'with_id': other['contest_id'],
+            'with_name': other['contest_name'],
+            'description': f"人员 {booking['name']}（{role}）同时安排在赛事《{other['contest_name']}》",
+            'severity': 'medium'
+        })
+
+    for key, person_bookings in index.items():
+        if len(person_bookings) < 2:
+            continue
+        person_bookings.sort(key=lambda booking: booking['start_date'])
+        active = []
+        for booking in person_bookings:
+            # 已结束的时间段不会再与后面（开始更晚）的时间段重叠
+            active = [other for other in active if other['end_date'] >= booking['start_date']]
+            for other in active:
+                if other['contest_id'] != booking['contest_id']:
+                    add(booking, other, key)
+                    add(other, booking, key)
+            active.append(booking)
+    return overlaps
+
+
+# ==================== 设备冲突 ====================
+
+# 每个赛事对每种库存设备的需求量（维修中的设备不计入需求）
+_DEMANDS = """
+    SELECT e.contest_id, c.name AS contest_name, c.start_date, c.end_date,
+           i.id AS item_id, i.name AS item_name, i.total_quantity, SUM(e.quantity) AS quantity
+    FROM contest_equipment e
+    JOIN equipment_inventory i ON i.name = e.name
+    JOIN contests c ON e.contest_id = c.id
+    WHERE e.status != 'maintenance'
+      AND c.status != 'rejected' AND c.start_date IS NOT NULL AND c.end_date IS NOT NULL {window}
+    GROUP BY e.contest_id, c.name, c.start_date, c.end_date, i.id, i.name, i.total_quantity
+"""
+
+
+def load_equipment_demands(cursor, window=None):
+    """
+    读取设备需求；window 为 (开始, 结束) 时只读取与该时间段重叠的赛事
+    """
+    if window is None:
+        cursor.execute(_DEMANDS.format(window=''))
+    else:
+        start, end = window
+        cursor.execute(_DEMANDS.format(window='AND c.start_date <= %s AND c.end_date >= %s'), (end, start))
+    return cursor.fetchall()
+
+
+def resource_overlaps(demands, only=None):
+    """
+    扫描线计算每种设备随时间变化的同时需求量，超过库存时为当时在用的每个赛事记录一条冲突
+    每个赛事、每种设备只保留需求峰值时的一条，冲突对象为峰值时需求量最大的另一个赛事；
+    峰值时只有该赛事在用（自身需求超过库存）时冲突对象为空
+    返回 {赛事ID: [冲突, ...]}；only 不为空时只返回该赛事的冲突
+    """
+    items = {}
+    for demand in demands:
+        if demand['quantity']:
+            items.setdefault(demand['item_id'], []).append(demand)
+
+    # (赛事ID, 设备ID) -> (峰值需求, 峰值时在用的需求列表)
+    peaks = {}
+    for item_demands in items.values():
+        capacity = item_demands[0]['total_quantity']
+        if sum(int(demand['quantity']) for demand in item_demands) <= capacity:
+            continue
+        # 时间段两端都包含在内：同一时刻先处理开始事件再处理结束事件
+        events = []
+        for index, demand in enumerate(item_demands):
+            events.append((demand['start_date'], 0, index))
+            events.append((demand['end_date'], 1, index))
+        events.sort()
+
+        active = {}
+        in_use = 0
+        for moment, kind, index in events:
+            demand = item_demands[index]
+            if kind == 1:
+                in_use -= int(active.pop(index)['quantity'])
+                continue
+            active[index] = demand
+            in_use += int(demand['quantity'])
+            if in_use <= capacity:
+                continue
+            for current in active.values():
+                key = (current['contest_id'], current['item_id'])
+                if only is not None and current['contest_id'] != only:
+                    continue
+                if key not in peaks or in_use > peaks[key][0]:
+                    peaks[key] = (in_use, list(active.values()))
+
+    overlaps = {}
+    for (contest_id, item_id), (peak, concurrent) in sorted(peaks.items()):
+        others = sorted((demand for demand in concurrent if demand['contest_id'] != contest_id),
+                        key=lambda demand: (-int(demand['quantity']), demand['contest_id']))
+        item = concurrent[0]
+        excess = peak - item['total_quantity']
+        # 描述只包含设备和库存，需求量或同时使用的赛事变化时不重复产生冲突记录；
+        # 超出数量、严重程度和冲突对象随检测结果更新到原记录
+        overlaps.setdefault(contest_id, []).append({
+            'type': 'resource',
+            'with_id': others[0]['contest_id'] if others else None,
+            'with_name': others[0]['contest_name'] if others else None,
+            'description': f"设备《{item['item_name']}》同时需求超过库存 {item['total_quantity']}",
+            'severity': 'high' if excess >= item['total_quantity'] else 'medium',
+            'over_allocation': excess
+        })
+    return overlaps
+
+
+# ==================== 场地容量 ====================
+
+# 场地总容量：只统计所有场地都填写了容量的线下赛事
+_CAPACITY = """
+    SELECT c.id AS contest_id, c.approved_count, SUM(v.capacity) AS capacity
+    FROM contests c
+    JOIN contest_venues v ON v.contest_id = c.id
+    WHERE c.online_mode = FALSE {contest_filter}
+    GROUP BY c.id, c.approved_count
+    HAVING COUNT(*) = COUNT(v.capacity) AND c.approved_count > SUM(v.capacity)
+    {locking}
+"""
+
+
+def capacity_overflows(cursor, contest_ids=None, lock=False):
+    """
+    已通过报名数超过场地总容量的赛事，一条分组查询算出，返回 {赛事ID: [冲突]}
+    contest_ids 为空时检查全部赛事；lock 时对读到的赛事和场地行加共享锁（在事务中调用）
+    """
+    locking = 'FOR SHARE' if lock else ''
+    if contest_ids is None:
+        cursor.execute(_CAPACITY.format(contest_filter='', locking=locking))
+    else:
+        contest_ids = list(contest_ids)
+        if not contest_ids:
+            return {}
+        placeholders = ','.join(['%s'] * len(contest_ids))
+        cursor.execute(_CAPACITY.format(contest_filter=f'AND c.id IN ({placeholders})', locking=locking),
+                       contest_ids)
+
+    overflows = {}
+    for row in cursor.fetchall():
+        capacity = int(row['capacity'])
+        # 描述只包含容量，通过人数变化时不重复产生冲突记录；超出人数随检测结果返回
+        overflows[row['contest_id']] = [{
+            'type': 'venue',
+            'with_id': None,
+            'with_name': None,
+            'description': f"场地总容量 {capacity} 人，已通过报名人数超出容量",
+            'severity': 'high',
+            'over_allocation': row['approved_count'] - capacity
+        }]
+    return overflows
+
+
+def _locked_capacity(cursor, contest_id):
+    """
+    传给 sync_conflicts 的检测函数：锁定赛事行之后再读取通过人数和场地容量
+    """
+    return lambda: capacity_overflows(cursor, [contest_id], lock=True).get(contest_id, [])
+
+
+def check_capacity(connection, cursor, contest_ids):
+    """
+    审核提交之后增量校验这些赛事的场地容量（须在业务写入提交之后调用，本函数会自行提交）
+    每个赛事在 sync_conflicts 锁定赛事行之后再计算容量：与同时进行的审核、其他校验串行，
+    不会用锁外读到的旧通过人数覆盖较新的结果
+    """
+    contest_ids = sorted({contest_id for contest_id in contest_ids if contest_id is not None})
+    if not contest_ids:
+        return
+    try:
+        changed = False
+        for contest_id in contest_ids:
+            added, resolved, updated = sync_conflicts(connection, cursor, contest_id,
+                                                      _locked_capacity(cursor, contest_id), scope='capacity')
+            changed = changed or bool(added or resolved or updated)
+            _notify(contest_id, added)
+        if changed:
+            bump_versions(cursor, 'contest_conflicts')
+    except Exception as e:
+        # 审核已经提交，校验失败时由下一次审核或全量校验补上
+        connection.rollback()
+        print(f"场地容量校验错误: {e}")
+
+
+def check_capacity_by(connection, cursor, registration_ids):
+    """
+    按报名ID反查所属赛事并校验场地容量（须在业务写入提交之后调用）
+    """
+    registration_ids = list(registration_ids)
+    if not registration_ids:
+        return
+    placeholders = ','.join(['%s'] * len(registration_ids))
+    cursor.execute(f"""
+        SELECT DISTINCT contest_id FROM contest_registrations WHERE id IN ({placeholders})
+    """, registration_ids)
+    contest_ids = [row['contest_id'] for row in cursor.fetchall()]
+    connection.commit()
+    check_capacity(connection, cursor, contest_ids)
+
+
+# 全量检测只对比对应范围内的已有冲突，其他冲突保持不变
+_SCOPES = {
+    'personnel': "conflict_type = 'personnel'",
+    'resource': "conflict_type = 'resource'",
+    'capacity': "conflict_type = 'venue' AND conflict_with_id IS NULL",
+}
+
+
+def _key(conflict_type, with_id, description):
+    # 设备冲突的冲突对象（峰值时需求最大的另一个赛事）随需求变化，不参与识别同一冲突
+    if conflict_type == 'resource':
+        with_id = None
+    return conflict_type, with_id, description
+
+
+def sync_conflicts(connection, cursor, contest_id, detected_conflicts, scope=None):
+    """
+    把检测结果写入 contest_conflicts，返回 (新增的冲突列表, 自动解决的冲突数, 更新的冲突数)
+    scope 不为空时只与该范围（见 _SCOPES）内的已有冲突对比；
+    仍然存在的冲突保留原记录，只更新冲突对象、严重程度和 over_allocation
+    detected_conflicts 可以是无参函数，在锁定赛事行之后调用，检测与写入在同一事务中完成
+    """
+    connection.begin()
+    # 锁定赛事行，同一赛事的并发检测（接口、后台任务、巡检）依次执行，不会重复插入
+    cursor.execute('SELECT id FROM contests WHERE id = %s FOR UPDATE', (contest_id,))
+    if not cursor.fetchone():
+        connection.commit()
+        return [], 0, 0
+    if callable(detected_conflicts):
+        detected_conflicts = detected_conflicts()
+
+    scope_filter = f'AND {_SCOPES[scope]}' if scope else ''
+    cursor.execute(f"""
+        SELECT id, conflict_type, conflict_with_id, conflict_description, severity, over_allocation
+        FROM contest_conflicts
+        WHERE contest_id = %s AND is_resolved = FALSE {scope_filter}
+        ORDER BY id
+    """, (contest_id,))
+    existing = {}
+    for row in cursor.fetchall():
+        key = _key(row['conflict_type'], row['conflict_with_id'], row['conflict_description'])
+        existing.setdefault(key, []).append(row)
+
+    added = []
+    vanished = []
+    updates = []
+    seen = set()
+    for conflict in detected_conflicts:
+        key = _key(conflict['type'], conflict['with_id'], conflict['description'])
+        if key in seen:
+            continue
+        seen.add(key)
+        if key in existing:
+            # 保留最早的一条，重复记录一并解决
+            kept, *duplicates = existing.pop(key)
+            vanished.extend(row['id'] for row in duplicates)
+            current = (conflict['with_id'], conflict['severity'], conflict.get('over_allocation'))
+            if current != (kept['conflict_with_id'], kept['severity'], kept['over_allocation']):
+                updates.append(current + (kept['id'],))
+        else:
+            added.append(conflict)
+    for rows in existing.values():
+        vanished.extend(row['id'] for row in rows)
+
+    if added:
+        cursor.executemany("""
+            INSERT INTO contest_conflicts
+            (contest_id, conflict_type, conflict_with_id, conflict_description, severity, over_allocation)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(contest_id, conflict['type'], conflict['with_id'], conflict['description'],
+               conflict['severity'], conflict.get('over_allocation')) for conflict in added])
+    if updates:
+        cursor.executemany("""
+            UPDATE contest_conflicts SET conflict_with_id = %s, severity = %s, over_allocation = %s WHERE id = %s
+        """, updates)
+    if vanished:
+        placeholders = ','.join(['%s'] * len(vanished))
+        cursor.execute(f"""
+            UPDATE contest_conflicts
+            SET is_resolved = TRUE, resolution = %s, resolved_time = CURRENT_TIMESTAMP
+            WHERE id IN ({placeholders}) AND is_resolved = FALSE
+        """, [AUTO_RESOLUTION] + vanished)
+    connection.commit()
+    return added, len(vanished), len(updates)
+
+
+def _notify(contest_id, conflicts):
+    # 每个新冲突创建一条通知（写后队列批量落库）
+    for conflict in conflicts:
+        notification_queue.submit((contest_id, 'conflict_alert', '检测到冲突', conflict['description'], None))
+
+
+def detect_contest_conflicts(connection, cursor, contest_id):
+    """
+    检测并保存单个赛事的冲突，返回当前冲突列表；赛事不存在时返回 None
+    """
+    cursor.execute('SELECT * FROM contests WHERE id = %s', (contest_id,))
+    contest = cursor.fetchone()
+    if not contest:
+        return None
+
+    detected_conflicts = find_conflicts(cursor, contest)
+    added, resolved, updated = sync_conflicts(connection, cursor, contest_id, detected_conflicts)
+    if added or resolved or updated:
+        bump_versions(cursor, 'contest_conflicts')
+    _notify(contest_id, added)
+    return detected_conflicts
+
+
+def changed_contests(cursor, since):
+    """
+    since 之后修改过赛事信息或场地的赛事ID；since 为空时返回全部赛事
+    """
+    if since is None:
+        cursor.execute('SELECT id FROM contests')
+    else:
+        cursor.execute("""
+            SELECT id FROM contests WHERE updated_at >= %s
+            UNION
+            SELECT contest_id FROM contest_venues WHERE updated_at >= %s
+        """, (since, since))
+    return {row['id'] for row in cursor.fetchall()}
+
+
+def with_neighbours(cursor, contest_ids):
+    """
+    加上受影响的赛事：与这些赛事时间重叠的赛事（可能新增冲突），
+    以及存在以这些赛事为对象的未解决冲突的赛事（冲突可能已消失）
+    """
+    affected = set(contest_ids)
+    ids = sorted(contest_ids)
+    for start in range(0, len(ids), NEIGHBOUR_CHUNK_SIZE):
+        chunk = ids[start:start + NEIGHBOUR_CHUNK_SIZE]
+        placeholders = ','.join(['%s'] * len(chunk))
+        cursor.execute(f"""
+            SELECT DISTINCT n.id
+            FROM contests c
+            JOIN contests n ON n.id != c.id
+                AND n.start_date <= c.end_date AND n.end_date >= c.start_date
+            WHERE c.id IN ({placeholders})
+            UNION
+            SELECT DISTINCT contest_id FROM contest_conflicts
+            WHERE conflict_with_id IN ({placeholders}) AND is_resolved = FALSE
+        """, chunk + chunk)
+        affected.update(row['id'] for row in cursor.fetchall())
+    return affected
+
+
+def _active(cursor, contest_ids):
+    # 已结束 / 已归档赛事的冲突记录会移入冷表，不再检测
+    ids = sorted(contest_ids)
+    active = []
+    statuses = ','.join(['%s'] * len(ARCHIVE_STATUSES))
+    for start in range(0, len(ids), NEIGHBOUR_CHUNK_SIZE):
+        chunk = ids[start:start + NEIGHBOUR_CHUNK_SIZE]
+        placeholders = ','.join(['%s'] * len(chunk))
+        cursor.execute(f"""
+            SELECT id FROM contests
+            WHERE id IN ({placeholders}) AND archived_at IS NULL AND status NOT IN ({statuses})
+        """, chunk + list(ARCHIVE_STATUSES))
+        active.extend(row['id'] for row in cursor.fetchall())
+    return sorted(active)
+
+
+def sweep(connection, cursor, full=False, progress=None):
+    """
+    增量巡检：检测上次巡检之后修改过的赛事及其相邻赛事并写入差异
+    返回统计字典；已有其他巡检在执行时返回 None
+    progress 为可选的进度回调 progress(done, total)
+    """
+    cursor.execute('SELECT GET_LOCK(%s, 0) AS locked', (SWEEP_LOCK,))
+    if not cursor.fetchone()['locked']:
+        return None
+    try:
+        cursor.execute('SELECT NOW() AS now')
+        started_at = cursor.fetchone()['now']
+        cursor.execute('SELECT last_swept_at FROM conflict_sweep_state WHERE id = 1')
+        state = cursor.fetchone()
+        since = None
+        if state and not full:
+            since = state['last_swept_at'] - timedelta(seconds=SWEEP_OVERLAP)
+
+        changed = changed_contests(cursor, since)
+        targets = _active(cursor, with_neighbours(cursor, changed) if since is not None else changed)
+        connection.commit()
+
+        added_total = 0
+        resolved_total = 0
+        updated_total = 0
+        for index, contest_id in enumerate(targets, 1):
+            cursor.execute('SELECT * FROM contests WHERE id = %s', (contest_id,))
+            contest = cursor.fetchone()
+            if contest:
+                added, resolved, updated = sync_conflicts(connection, cursor, contest_id,
+                                                          find_conflicts(cursor, contest))
+                added_total += len(added)
+                resolved_total += resolved
+                updated_total += updated
+                _notify(contest_id, added)
+            else:
+                connection.commit()
+            if progress:
+                progress(index, len(targets))
+
+        cursor.execute("""
+            INSERT INTO conflict_sweep_state
+            (id, last_swept_at, last_finished_at, contests_checked, conflicts_added, conflicts_resolved)
+            VALUES (1, %s, NOW(), %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                last_swept_at = VALUES(last_swept_at), last_finished_at = VALUES(last_finished_at),
+                contests_checked = VALUES(contests_checked), conflicts_added = VALUES(conflicts_added),
+                conflicts_resolved = VALUES(conflicts_resolved)
+        """, (started_at, len(targets), added_total, resolved_total))
+        connection.commit()
+        if added_total or resolved_total or updated_total:
+            bump_versions(cursor, 'contest_conflicts')
+        return {
+            'since': since.isoformat() if since else None,
+            'changed_contests': len(changed),
+            'contests_checked': len(targets),
+            'conflicts_added': added_total,
+            'conflicts_resolved': resolved_total
+        }
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        try:
+            cursor.execute('SELECT RELEASE_LOCK(%s)', (SWEEP_LOCK,))
+            cursor.fetchall()
+            connection.commit()
+        except Exception:
+            # 锁随连接关闭释放：释放失败的连接不能放回连接池
+            connection.discard()
+            raise
+
+
+def _detect_season(connection, cursor, scope, overlaps, progress=None, recheck=None):
+    """
+    把一次全量扫描的结果写入各赛事，只对比 scope 范围内的已有冲突，返回统计字典
+    recheck(cursor, 赛事ID) 不为空时，扫描结果只用于确定检测哪些赛事，写入的冲突由它在锁内重新计算
+    """
+    # 已有该范围未解决冲突的赛事也要检测，冲突可能已消失
+    cursor.execute(f"""
+        SELECT DISTINCT contest_id FROM contest_conflicts
+        WHERE {_SCOPES[scope]} AND is_resolved = FALSE
+    """)
+    targets = _active(cursor, set(overlaps) | {row['contest_id'] for row in cursor.fetchall()})
+    connection.commit()
+
+    added_total = 0
+    resolved_total = 0
+    updated_total = 0
+    for index, contest_id in enumerate(targets, 1):
+        detected = recheck(cursor, contest_id) if recheck else overlaps.get(contest_id, [])
+        added, resolved, updated = sync_conflicts(connection, cursor, contest_id, detected, scope=scope)
+        added_total += len(added)
+        resolved_total += resolved
+        updated_total += updated
+        _notify(contest_id, added)
+        if progress:
+            progress(index, len(targets))
+
+    if added_total or resolved_total or updated_total:
+        bump_versions(cursor, 'contest_conflicts')
+    return {
+        'contests_checked': len(targets),
+        'conflicts_added': added_total,
+        'conflicts_resolved': resolved_total
+    }
+
+
+def detect_personnel_conflicts(connection, cursor, progress=None):
+    """
+    全量检测人员冲突：一次读取全部人员安排，一次扫描算出所有赛事的人员冲突
+    """
+    overlaps = personnel_overlaps(load_bookings(cursor))
+    return _detect_season(connection, cursor, 'personnel', overlaps, progress)
+
+
+def detect_resource_conflicts(connection, cursor, progress=None):
+    """
+    全量检测设备冲突：一次读取全部设备需求，每种设备一次扫描算出所有赛事的设备冲突
+    """
+    overlaps = resource_overlaps(load_equipment_demands(cursor))
+    return _detect_season(connection, cursor, 'resource', overlaps, progress)
+
+
+def detect_capacity_conflicts(connection, cursor, progress=None):
+    """
+    全量校验场地容量：一条分组查询比较所有赛事的已通过报名数与场地总容量
+    """
+    return _detect_season(connection, cursor, 'capacity', capacity_overflows(cursor), progress,
+                          recheck=_locked_capacity)
+
+
+def run_season(label, detect):
+    """
+    执行一次全量检测并打印结果，返回是否成功
+    """
+    connection = get_connection()
+    if not connection:
+        print("❌ 数据库连接失败")
+        return False
+    cursor = connection.cursor()
+    try:
+        started = time.time()
+        summary = detect(connection, cursor)
+        print(f"✅ {label}检测完成，耗时 {time.time() - started:.2f}s：检测 {summary['contests_checked']} 个赛事，"
+              f"新增冲突 {summary['conflicts_added']} 个，自动解决 {summary['conflicts_resolved']} 个")
+        return True
+    except Exception as e:
+        connection.rollback()
+        print(f"{label}检测错误: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def run_sweep(full=False):
+    """
+    执行一次巡检并打印结果，返回是否成功
+    """
+    connection = get_connection()
+    if not connection:
+        print("❌ 数据库连接失败")
+        return False
+    cursor = connection.cursor()
+    try:
+        started = time.time()
+        summary = sweep(connection, cursor, full)
+        if summary is None:
+            print("⚠️  已有冲突巡检正在执行，跳过本次")
+            return True
+        print(f"✅ 冲突巡检完成，耗时 {time.time() - started:.2f}s：修改赛事 {summary['changed_contests']} 个，"
+              f"检测 {summary['contests_checked']} 个，新增冲突 {summary['conflicts_added']} 个，"
+              f"自动解决 {summary['conflicts_resolved']} 个")
+        return True
+    except Exception as e:
+        connection.rollback()
+        print(f"冲突巡检错误: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='赛事冲突检测')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    sweep_parser = subparsers.add_parser('sweep', help='增量巡检修改过的赛事')
+    sweep_parser.add_argument('--full', action='store_true', help='忽略水位，检测全部赛事')
+    sweep_parser.add_argument('--interval', type=float, default=0, help='循环执行的间隔秒数（默认只执行一次）')
+    subparsers.add_parser('personnel', help='全量检测人员冲突')
+    subparsers.add_parser('resources', help='全量检测设备冲突')
+    subparsers.add_parser('capacity', help='全量校验场地容量')
+    args = parser.parse_args()
+
+    if args.command == 'personnel':
+        run_season('人员冲突', detect_personnel_conflicts)
+    elif args.command == 'resources':
+        run_season('设备冲突', detect_resource_conflicts)
+    elif args.command == 'capacity':
+        run_season('场地容量', detect_capacity_conflicts)
+    elif args.command == 'sweep':
+        run_sweep(args.full)
+        while args.interval:
+            time.sleep(args.interval)
+            run_sweep()
@@ -0,0 +1,141 @@
+"""
+赛事文档查询
+把赛事基础信息与预算、场地、人员、设备、物资组装成完整文档：
+- 单个赛事用一条 JSON_ARRAYAGG / JSON_OBJECT 子查询语句完成，只需一次往返
+- 多个赛事按子表分组执行 IN 查询，往返次数为 1 + 子表数，与赛事数量无关
+"""
+import json
+from datetime import datetime
+
+# 子资源名 -> (表名, 列定义)；列定义为 (列名, 是否为DECIMAL)，DECIMAL 转成字符串与原接口保持一致
+CHILD_RESOURCES = {
+    'budget': ('contest_budget', [('id', False), ('contest_id', False), ('total', True),
+                                  ('category_name', False), ('category_amount', True)]),
+    'venues': ('contest_venues', [('id', False), ('contest_id', False), ('venue_id', False), ('name', False),
+                                  ('capacity', False), ('address', False), ('facilities', False)]),
+    'personnel': ('contest_personnel', [('id', False), ('contest_id', False), ('role', False),
+                                        ('name', False), ('contact', False)]),
+    'equipment': ('contest_equipment', [('id', False), ('contest_id', False), ('name', False),
+                                        ('quantity', False), ('status', False)]),
+    'materials': ('contest_materials', [('id', False), ('contest_id', False), ('name', False),
+                                        ('quantity', False), ('unit', False)]),
+}
+
+# 赛事文档依赖的表：详情 / 批量接口的 ETag 包含这些表的版本号，写入任何一张表后都要递增其版本号
+CONTEST_DOCUMENT_TABLES = ('contests',) + tuple(table for table, _ in CHILD_RESOURCES.values())
+
+# 单次批量查询允许的最大赛事数
+MAX_BATCH_SIZE = 200
+
+
+def parse_include(include):
+    """
+    解析 include 参数，为空时返回全部子资源；包含未知子资源时抛出 ValueError
+    """
+    if not include:
+        return list(CHILD_RESOURCES)
+    names = [name.strip() for name in include.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CHILD_RESOURCES]
+    if unknown:
+        raise ValueError(f"不支持的 include: {', '.join(unknown)}")
+    return [name for name in CHILD_RESOURCES if name in names]
+
+
+def _format_contest(contest):
+    for key, value in contest.items():
+        if isinstance(value, datetime):
+            contest[key] = value.isoformat()
+    return contest
+
+
+def _parse_facilities(venue):
+    facilities = venue.get('facilities')
+    if isinstance(facilities, str):
+        try:
+            venue['facilities'] = json.loads(facilities)
+        except ValueError:
+            venue['facilities'] = []
+    return venue
+
+
+def _json_object(alias, columns):
+    parts = []
+    for column, is_decimal in columns:
+        value = f'CAST({alias}.{column} AS CHAR)' if is_decimal else f'{alias}.{column}'
+        parts.append(f"'{column}', {value}")
+    return f"JSON_OBJECT({', '.join(parts)})"
+
+
+def fetch_contest_document(cursor, contest_id, include=None):
+    """
+    用一条SQL读取完整赛事文档，赛事不存在时返回 None
+    """
+    include = include or list(CHILD_RESOURCES)
+    subqueries = []
+    for name in include:
+        table, columns = CHILD_RESOURCES[name]
+        subqueries.append(
+            f"(SELECT COALESCE(JSON_ARRAYAGG({_json_object('x', columns)}), JSON_ARRAY()) "
+            f"FROM {table} x WHERE x.contest_id = c.id) AS `__{name}`"
+        )
+    select_list = ', '.join(['c.*'] + subqueries)
+    cursor.execute(f'SELECT {select_list} FROM contests c WHERE c.id = %s', (contest_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    document = {}
+    children = {}
+    for key, value in row.items():
+        if key.startswith('__'):
+            items = json.loads(value) if isinstance(value, (str, bytes)) else (value or [])
+            # JSON_ARRAYAGG 不保证顺序，按主键排序与逐表查询的结果保持一致
+            children[key[2:]] = sorted(items, key=lambda item: item['id'])
+        else:
+            document[key] = value
+
+    document = _format_contest(document)
+    for name in include:
+        document[name] = children[name]
+    if 'venues' in document:
+        document['venues'] = [_parse_facilities(venue) for venue in document['venues']]
+    return document
+
+
+def fetch_contest_documents(cursor, contest_ids, include=None):
+    """
+    批量读取赛事文档：一条查询取赛事，每个子资源再各用一条 IN 查询，按 contest_id 分组组装
+    返回按 contest_ids 顺序排列的文档列表（不存在的赛事被忽略）
+    """
+    include = include or list(CHILD_RESOURCES)
+    if not contest_ids:
+        return []
+
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    cursor.execute(f'SELECT * FROM contests WHERE id IN ({placeholders})', list(contest_ids))
+    documents = {row['id']: _format_contest(row) for row in cursor.fetchall()}
+    if not documents:
+        return []
+
+    found_ids = list(documents)
+    found_placeholders = ','.join(['%s'] * len(found_ids))
+    for document in documents.values():
+        for name in include:
+            document[name] = []
+
+    for name in include:
+        table, columns = CHILD_RESOURCES[name]
+        column_list = ', '.join(column for column, _ in columns)
+        cursor.execute(
+            f'SELECT {column_list} FROM {table} WHERE contest_id IN ({found_placeholders}) ORDER BY contest_id, id',
+            found_ids
+        )
+        for row in cursor.fetchall():
+            for column, is_decimal in columns:
+                if is_decimal and row[column] is not None:
+                    row[column] = str(row[column])
+            if name == 'venues':
+                _parse_facilities(row)
+            documents[row['contest_id']][name].append(row)
+
+    return [documents[contest_id] for contest_id in contest_ids if contest_id in documents]
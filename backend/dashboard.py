@@ -0,0 +1,293 @@
+"""
+赛事看板统计
+报名状态分布、审核通过率、团队状态分布、评审完成率、结果公示数、报名学生专业/年级分布，
+对任意多个赛事都只用固定几条 GROUP BY 查询算出，结果缓存在 contest_dashboard_rollups 中。
+
+增量刷新：影响统计的写接口在事务提交之后调用 mark_dirty() 递增相关赛事的 version（与 bump_versions 相同，
+不在业务事务中持有看板行锁）；读取时只重新聚合 computed_version < version 的赛事。
+刷新时先读 version 再在同一一致性快照中聚合，写回时只在 computed_version 更小时覆盖：
+快照中可见的 version 递增一定发生在对应写入提交之后，统计结果不会比记录的 version 更旧。
+
+归档把明细分批移出热表，期间的快照只包含部分明细。归档和刷新都持有赛事的命名锁（REFRESH_LOCK）：
+刷新不等待，正在归档的赛事跳过重新聚合、继续使用缓存结果；归档开始前会先刷新一次。
+"""
+import json
+from datetime import datetime
+
+from database import without_deadline
+
+REGISTRATION_STATUSES = ['pending', 'approved', 'rejected']
+TEAM_STATUSES = ['recruiting', 'active', 'disbanded']
+JUDGE_STATUSES = ['pending', 'accepted', 'rejected', 'completed']
+
+# 可以按记录ID反查赛事的表
+_CONTEST_TABLES = {'contest_registrations', 'contest_teams', 'judge_assignments', 'contest_results'}
+
+# 赛事统计刷新 / 归档共用的命名锁
+REFRESH_LOCK = 'dashboard_rollup:{}'
+# 每条 GET_LOCK / RELEASE_LOCK 语句处理的锁数
+_LOCK_CHUNK = 200
+
+
+def mark_dirty(cursor, contest_ids):
+    """
+    标记赛事统计已过期（须在业务写入提交之后调用，本函数会自行提交）
+    按赛事ID排序加锁，避免并发事务交叉加锁死锁
+    """
+    contest_ids = sorted({contest_id for contest_id in contest_ids if contest_id is not None})
+    if not contest_ids:
+        return
+    try:
+        with without_deadline():
+            cursor.executemany("""
+                INSERT INTO contest_dashboard_rollups (contest_id, version) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """, [(contest_id,) for contest_id in contest_ids])
+            cursor.connection.commit()
+    except Exception as e:
+        # 业务写入已经提交，标记失败时统计会在下一次相关写入后刷新
+        print(f"标记看板统计过期错误: {e}")
+
+
+def mark_dirty_by(cursor, table, ids):
+    """
+    按业务表记录ID反查所属赛事并标记统计过期（须在业务写入提交之后调用）
+    """
+    if table not in _CONTEST_TABLES:
+        raise ValueError(f'不支持的表: {table}')
+    ids = list(ids)
+    if not ids:
+        return
+    placeholders = ','.join(['%s'] * len(ids))
+    with without_deadline():
+        cursor.execute(f'SELECT DISTINCT contest_id FROM {table} WHERE id IN ({placeholders})', ids)
+    mark_dirty(cursor, [row['contest_id'] for row in cursor.fetchall()])
+
+
+def _rate(part, total):
+    return round(part / total, 4) if total else None
+
+
+def _empty_stats():
+    return {
+        'registrations': dict({status: 0 for status in REGISTRATION_STATUSES}, total=0, approval_rate=None),
+        'teams': dict({status: 0 for status in TEAM_STATUSES}, total=0),
+        'judging': dict({status: 0 for status in JUDGE_STATUSES}, total=0, completion_rate=None),
+        'results': {'total': 0, 'published': 0},
+        'distribution': {'major': [], 'grade': []}
+    }
+
+
+def compute_stats(cursor, contest_ids):
+    """
+    对一组赛事执行分组聚合，返回 {contest_id: stats}
+    查询次数固定为 5 条，与赛事数量无关
+    """
+    stats = {contest_id: _empty_stats() for contest_id in contest_ids}
+    if not contest_ids:
+        return stats
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    ids = list(contest_ids)
+
+    grouped_counts = [
+        ('registrations', 'contest_registrations'),
+        ('teams', 'contest_teams'),
+        ('judging', 'judge_assignments'),
+    ]
+    for key, table in grouped_counts:
+        cursor.execute(f"""
+            SELECT contest_id, status, COUNT(*) AS count
+            FROM {table}
+            WHERE contest_id IN ({placeholders})
+            GROUP BY contest_id, status
+        """, ids)
+        for row in cursor.fetchall():
+            section = stats[row['contest_id']][key]
+            if row['status'] in section:
+                section[row['status']] = row['count']
+            section['total'] += row['count']
+
+    cursor.execute(f"""
+        SELECT contest_id, COUNT(*) AS total, COALESCE(SUM(is_published), 0) AS published
+        FROM contest_results
+        WHERE contest_id IN ({placeholders})
+        GROUP BY contest_id
+    """, ids)
+    for row in cursor.fetchall():
+        stats[row['contest_id']]['results'] = {'total': row['total'], 'published': int(row['published'])}
+
+    cursor.execute(f"""
+        SELECT contest_id, 'major' AS dimension, COALESCE(major, '未填写') AS name, COUNT(*) AS count
+        FROM contest_registrations
+        WHERE contest_id IN ({placeholders})
+        GROUP BY contest_id, major
+        UNION ALL
+        SELECT contest_id, 'grade' AS dimension, COALESCE(grade, '未填写') AS name, COUNT(*) AS count
+        FROM contest_registrations
+        WHERE contest_id IN ({placeholders})
+        GROUP BY contest_id, grade
+    """, ids + ids)
+    for row in cursor.fetchall():
+        stats[row['contest_id']]['distribution'][row['dimension']].append(
+            {'name': row['name'], 'count': row['count']}
+        )
+
+    for contest_stats in stats.values():
+        registrations = contest_stats['registrations']
+        # 通过率 = 通过 / 已审核（通过 + 驳回）
+        registrations['approval_rate'] = _rate(registrations['approved'],
+                                               registrations['approved'] + registrations['rejected'])
+        judging = contest_stats['judging']
+        judging['completion_rate'] = _rate(judging['completed'], judging['total'])
+        for items in contest_stats['distribution'].values():
+            items.sort(key=lambda item: -item['count'])
+    return stats
+
+
+def lock_contests(cursor, contest_ids, timeout=0):
+    """
+    取得这些赛事的统计刷新锁（同一连接可以重复取得），返回取得锁的赛事ID
+    """
+    contest_ids = sorted(set(contest_ids))
+    locked = []
+    for index in range(0, len(contest_ids), _LOCK_CHUNK):
+        chunk = contest_ids[index:index + _LOCK_CHUNK]
+        columns = ', '.join(f'GET_LOCK(%s, %s) AS `{contest_id}`' for contest_id in chunk)
+        params = []
+        for contest_id in chunk:
+            params.extend([REFRESH_LOCK.format(contest_id), timeout])
+        cursor.execute(f'SELECT {columns}', params)
+        row = cursor.fetchone()
+        locked.extend(contest_id for contest_id in chunk if row[str(contest_id)] == 1)
+    return locked
+
+
+def unlock_contests(cursor, contest_ids):
+    """
+    释放 lock_contests 取得的锁
+    """
+    contest_ids = list(contest_ids)
+    try:
+        for index in range(0, len(contest_ids), _LOCK_CHUNK):
+            chunk = contest_ids[index:index + _LOCK_CHUNK]
+            cursor.execute(f"SELECT {', '.join(['RELEASE_LOCK(%s)'] * len(chunk))}",
+                           [REFRESH_LOCK.format(contest_id) for contest_id in chunk])
+            cursor.fetchall()
+    except Exception:
+        # 命名锁随连接关闭释放：关闭底层连接，连接池不会再复用它
+        try:
+            cursor.connection.close()
+        except Exception:
+            pass
+        raise
+
+
+def refresh(cursor, contest_ids):
+    """
+    重新聚合一组赛事并写回缓存（调用方负责提交），返回 {contest_id: stats}
+    正在归档的赛事（刷新锁被占用）不重新聚合，也不出现在返回结果中
+    会先提交当前事务，使聚合使用取得锁之后的新快照
+    """
+    locked = lock_contests(cursor, contest_ids)
+    try:
+        cursor.connection.commit()
+        return _refresh(cursor, locked)
+    finally:
+        unlock_contests(cursor, locked)
+
+
+def _refresh(cursor, contest_ids):
+    if not contest_ids:
+        return {}
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    # 先读 version，统计查询与之处于同一快照
+    cursor.execute(f"""
+        SELECT contest_id, version FROM contest_dashboard_rollups WHERE contest_id IN ({placeholders})
+    """, contest_ids)
+    versions = {row['contest_id']: row['version'] for row in cursor.fetchall()}
+
+    stats = compute_stats(cursor, contest_ids)
+    refreshed_at = datetime.now()
+    cursor.executemany("""
+        INSERT INTO contest_dashboard_rollups (contest_id, version, computed_version, stats, refreshed_at)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            stats = IF(computed_version < VALUES(computed_version), VALUES(stats), stats),
+            refreshed_at = IF(computed_version < VALUES(computed_version), VALUES(refreshed_at), refreshed_at),
+            computed_version = GREATEST(computed_version, VALUES(computed_version))
+    """, [(contest_id, versions.get(contest_id, 0), versions.get(contest_id, 0),
+           json.dumps(stats[contest_id], ensure_ascii=False), refreshed_at)
+          for contest_id in contest_ids])
+    for contest_stats in stats.values():
+        contest_stats['refreshed_at'] = refreshed_at.isoformat()
+    return stats
+
+
+def _load(row):
+    if row['stats'] is None:
+        return dict(_empty_stats(), refreshed_at=None)
+    contest_stats = json.loads(row['stats']) if isinstance(row['stats'], (str, bytes)) else row['stats']
+    contest_stats['refreshed_at'] = row['refreshed_at'].isoformat() if row['refreshed_at'] else None
+    return contest_stats
+
+
+def _is_stale(row):
+    # 明细已归档的赛事不能再从热表聚合，保留归档前的统计结果
+    if row['stats'] is None:
+        return True
+    return row['computed_version'] < row['version'] and row['archived_at'] is None
+
+
+def get_contest_dashboard(cursor, contest_id):
+    """
+    读取单个赛事的看板统计，缓存过期时重新聚合；赛事不存在时返回 None
+    """
+    cursor.execute("""
+        SELECT c.id, c.archived_at, r.version, r.computed_version, r.stats, r.refreshed_at
+        FROM contests c
+        LEFT JOIN contest_dashboard_rollups r ON r.contest_id = c.id
+        WHERE c.id = %s
+    """, (contest_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    if not _is_stale(row):
+        return _load(row)
+    return refresh(cursor, [contest_id]).get(contest_id) or _load(row)
+
+
+def get_summary(cursor):
+    """
+    所有赛事的看板统计：先一次性重新聚合全部过期赛事，再读取缓存，并汇总全局合计
+    """
+    cursor.execute("""
+        SELECT c.id, c.name, c.status, c.start_date, c.end_date, c.archived_at,
+               r.version, r.computed_version, r.stats, r.refreshed_at
+        FROM contests c
+        LEFT JOIN contest_dashboard_rollups r ON r.contest_id = c.id
+        ORDER BY c.id
+    """)
+    rows = cursor.fetchall()
+    stale = [row['id'] for row in rows if _is_stale(row)]
+    refreshed = refresh(cursor, stale) if stale else {}
+
+    contests = []
+    totals = _empty_stats()
+    del totals['distribution']
+    for row in rows:
+        contest_stats = refreshed[row['id']] if row['id'] in refreshed else _load(row)
+        contests.append(dict(contest_stats, contest_id=row['id'], contest_name=row['name'],
+                             contest_status=row['status'],
+                             start_date=row['start_date'].isoformat() if row['start_date'] else None,
+                             end_date=row['end_date'].isoformat() if row['end_date'] else None))
+        for key in ('registrations', 'teams', 'judging', 'results'):
+            for field, value in contest_stats[key].items():
+                if not field.endswith('_rate'):
+                    totals[key][field] += value
+
+    totals['registrations']['approval_rate'] = _rate(
+        totals['registrations']['approved'],
+        totals['registrations']['approved'] + totals['registrations']['rejected']
+    )
+    totals['judging']['completion_rate'] = _rate(totals['judging']['completed'], totals['judging']['total'])
+    return {'totals': totals, 'contests': contests, 'refreshed': len(stale)}
@@ -1,10 +1,35 @@
 """
 数据库连接和初始化模块
+
+读写分离：DB_CONFIG 为主库，环境变量 DB_REPLICAS（如 "127.0.0.1:3306,127.0.0.1:3307"）配置只读从库，
+从库与主库使用相同的用户、密码和数据库名。每个库各有一个进程内连接池，connection.close() 把连接归还连接池。
+get_connection() 默认连接主库；请求处理期间调用 use_replica(True) 后（见 db_routing.py）读请求改为连接从库：
+按轮询选择复制延迟不超过 MAX_REPLICA_LAG 秒的从库，复制延迟每 LAG_CHECK_INTERVAL 秒查询一次，
+没有可用从库时回退到主库。
+
+熔断：每个库的连接池带一个熔断器。连续 BREAKER_FAILURES 次连接失败后熔断打开，期间取连接立即失败
+（get_connection() 返回 None），不再等待连接超时；打开 backoff 秒后进入半开状态，只放行一个探测连接，
+成功则关闭熔断，失败则重新打开并把 backoff 加倍（上限 BREAKER_MAX_BACKOFF）。状态见 pool_stats()。
+
+请求截止时间：set_deadline(seconds) 之后（见 deadlines.py）当前请求取得的连接每次执行语句前检查剩余时间，
+SELECT 加 MAX_EXECUTION_TIME 提示由 MySQL 中止超时的查询，并把 socket 读写超时设为剩余时间；
+写语句等到 socket 超时时另开连接 KILL QUERY。超时后 deadline_exceeded() 为 True。
+业务写入提交之后的版本号、看板标记等收尾语句放在 without_deadline() 中执行，不受截止时间限制。
 """
+import contextlib
+import contextvars
+import itertools
+import os
+import random
+import re
+import threading
+import time
+
 import pymysql
 from pymysql import Error
+from pymysql.constants import SERVER_STATUS
 
-# 数据库配置
+# 数据库配置（主库）
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
@@ -16,419 +41,608 @@ DB_CONFIG = {
 
 DATABASE_NAME = 'competition_system'
 
+# 每个库最多保留的空闲连接数
+POOL_MAX_IDLE = int(os.environ.get('DB_POOL_MAX_IDLE', 16))
+# 空闲超过该秒数的连接取出时先 ping，避免拿到被服务端断开的连接
+POOL_PING_AFTER = 30
+# 取连接耗时移动平均中最新一次的权重
+WAIT_EWMA_WEIGHT = 0.1
+# 从库复制延迟超过该秒数时不再路由读请求
+MAX_REPLICA_LAG = float(os.environ.get('DB_MAX_REPLICA_LAG', 2))
+LAG_CHECK_INTERVAL = 1.0
+# 连接池连接的超时秒数（migrate.py 执行 DDL 的连接不受限制）
+CONNECT_TIMEOUT = float(os.environ.get('DB_CONNECT_TIMEOUT', 3))
+READ_TIMEOUT = float(os.environ.get('DB_READ_TIMEOUT', 60))
+WRITE_TIMEOUT = float(os.environ.get('DB_WRITE_TIMEOUT', 60))
+# 从库连接超时：从库宕机时尽快回退到主库
+REPLICA_CONNECT_TIMEOUT = min(2, CONNECT_TIMEOUT)
+
+# 熔断：连续失败次数阈值、首次打开时长、打开时长上限（秒）
+BREAKER_FAILURES = int(os.environ.get('DB_BREAKER_FAILURES', 3))
+BREAKER_BACKOFF = float(os.environ.get('DB_BREAKER_BACKOFF', 1))
+BREAKER_MAX_BACKOFF = float(os.environ.get('DB_BREAKER_MAX_BACKOFF', 30))
+
+
+def _parse_replicas(value):
+    replicas = []
+    for item in (value or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(':')
+        if not host:
+            host, port = port, DB_CONFIG['port']
+        replicas.append(dict(DB_CONFIG, host=host, port=int(port), connect_timeout=REPLICA_CONNECT_TIMEOUT))
+    return replicas
+
+
+REPLICA_CONFIGS = _parse_replicas(os.environ.get('DB_REPLICAS'))
+
+
+class CircuitOpenError(pymysql.err.OperationalError):
+    """
+    熔断打开期间取连接时抛出
+    """
+
+
+class CircuitBreaker:
+    """
+    连接熔断器：closed（正常）→ open（快速失败）→ half_open（放行一个探测连接）
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name):
+        self.name = name
+        self.state = self.CLOSED
+        self.failures = 0
+        self.backoff = BREAKER_BACKOFF
+        self.retry_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        取连接前调用：熔断打开时抛出 CircuitOpenError；返回 True 表示本次是半开状态下的探测
+        """
+        if self.state == self.CLOSED:
+            return False
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN and time.monotonic() >= self.retry_at:
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(2003, f'{self.name} 熔断中，暂停连接数据库')
+
+    def success(self):
+        if self.state == self.CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.backoff = BREAKER_BACKOFF
+
+    def failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == self.HALF_OPEN:
+                # 探测失败：重新打开，打开时长加倍
+                self.backoff = min(self.backoff * 2, BREAKER_MAX_BACKOFF)
+            elif self.state == self.CLOSED and self.failures >= BREAKER_FAILURES:
+                self.trips += 1
+            else:
+                return
+            self.state = self.OPEN
+            # 加随机抖动，避免多个进程同时探测
+            self.retry_at = time.monotonic() + self.backoff * random.uniform(0.8, 1.2)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'backoff': self.backoff,
+                'retry_in': round(max(self.retry_at - time.monotonic(), 0), 3) if self.state == self.OPEN else 0,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'last_error': self.last_error
+            }
 
-def get_connection():
+
+class PooledConnection:
     """
-    获取数据库连接
+    连接池中的连接：除 close() 归还连接池外与 pymysql 连接用法相同
+    修改了会话状态（SET SESSION、GET_LOCK 未释放等）的连接应调用 discard()，归还时直接关闭
     """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._reusable = True
+        self.target = pool.name
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args):
+        cursor = self._raw.cursor(*args)
+        state = _deadline.get()
+        if state is None:
+            return cursor
+        return _DeadlineCursor(cursor, self, state)
+
+    def discard(self):
+        self._reusable = False
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool.release(raw, self._reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Pool:
+    """
+    单个库的连接池：空闲连接后进先出，取出时不足则新建；不限制同时借出的连接数
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.breaker = CircuitBreaker(name)
+        self.stats = {'created': 0, 'reused': 0, 'released': 0, 'discarded': 0, 'errors': 0, 'in_use': 0}
+        # 取连接耗时（含新建连接）：指数移动平均与最大值，秒
+        self._wait_avg = None
+        self._wait_max = 0.0
+
+    def _connect(self):
+        options = {'connect_timeout': CONNECT_TIMEOUT, 'read_timeout': READ_TIMEOUT, 'write_timeout': WRITE_TIMEOUT}
+        options.update(self.config)
+        return pymysql.connect(database=DATABASE_NAME, **options)
+
+    def _take_idle(self):
+        with self._lock:
+            # gunicorn 预加载后 fork 出的子进程不能复用父进程的连接（socket 共享），直接丢弃不关闭
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._idle = []
+                self.stats['in_use'] = 0
+            if self._idle:
+                return self._idle.pop()
+        return None
+
+    def acquire(self):
+        """
+        取出一个连接，连接失败时抛出 pymysql.Error（熔断打开时为 CircuitOpenError）
+        """
+        started = time.monotonic()
+        connection = self._acquire()
+        waited = time.monotonic() - started
+        with self._lock:
+            self._wait_avg = waited if self._wait_avg is None else (
+                self._wait_avg + WAIT_EWMA_WEIGHT * (waited - self._wait_avg))
+            self._wait_max = max(self._wait_max, waited)
+        return connection
+
+    def _acquire(self):
+        probing = self.breaker.allow()
+        while True:
+            idle = self._take_idle()
+            if idle is None:
+                break
+            raw, returned_at = idle
+            # 半开探测时空闲连接也要先 ping，确认数据库已恢复
+            if probing or time.monotonic() - returned_at > POOL_PING_AFTER:
+                try:
+                    raw.ping(reconnect=False)
+                except Error:
+                    self._close(raw)
+                    continue
+                self.breaker.success()
+            with self._lock:
+                self.stats['reused'] += 1
+                self.stats['in_use'] += 1
+            return PooledConnection(self, raw)
+
+        try:
+            raw = self._connect()
+        except Exception as e:
+            self.breaker.failure(e)
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        self.breaker.success()
+        with self._lock:
+            self.stats['created'] += 1
+            self.stats['in_use'] += 1
+        return PooledConnection(self, raw)
+
+    def release(self, raw, reusable=True):
+        # 恢复截止时间修改过的 socket 超时
+        raw._read_timeout = self.config.get('read_timeout', READ_TIMEOUT)
+        raw._write_timeout = self.config.get('write_timeout', WRITE_TIMEOUT)
+        if reusable and raw.open:
+            try:
+                # 借用方未提交的事务一律回滚，连接归还时不带事务状态
+                if raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                    raw.rollback()
+            except Error:
+                reusable = False
+        with self._lock:
+            self.stats['in_use'] = max(self.stats['in_use'] - 1, 0)
+            if reusable and raw.open and len(self._idle) < POOL_MAX_IDLE:
+                self._idle.append((raw, time.monotonic()))
+                self.stats['released'] += 1
+                return
+            self.stats['discarded'] += 1
+        self._close(raw)
+
+    def kill_query(self, thread_id):
+        """
+        另开一个连接中止指定连接上正在执行的语句
+        """
+        killer = self.acquire()
+        try:
+            cursor = killer._raw.cursor()
+            cursor.execute('KILL QUERY %s', (thread_id,))
+            cursor.close()
+        finally:
+            killer.close()
+
+    @staticmethod
+    def _close(raw):
+        try:
+            raw.close()
+        except Error:
+            pass
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = dict(self.stats, target=self.name, idle=len(self._idle),
+                            wait_avg_ms=round((self._wait_avg or 0) * 1000, 2),
+                            wait_max_ms=round(self._wait_max * 1000, 2))
+        snapshot['breaker'] = self.breaker.snapshot()
+        return snapshot
+
+
+class _Replica:
+    """
+    从库连接池及复制延迟：延迟为 None 表示复制未运行或从库不可达
+    """
+
+    def __init__(self, index, config):
+        self.pool = _Pool(f"replica{index}:{config['host']}:{config['port']}", config)
+        self.lag = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def _measure(self):
+        connection = self.pool.acquire()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SHOW REPLICA STATUS')
+                row = cursor.fetchone()
+                key = 'Seconds_Behind_Source'
+            except Error:
+                # MySQL 8.0.22 之前的版本
+                cursor.execute('SHOW SLAVE STATUS')
+                row = cursor.fetchone()
+                key = 'Seconds_Behind_Master'
+            cursor.close()
+        finally:
+            connection.close()
+        if not row or row.get(key) is None:
+            return None
+        return float(row[key])
+
+    def current_lag(self):
+        """
+        返回缓存的复制延迟，超过 LAG_CHECK_INTERVAL 时由一个线程重新查询，其他线程继续使用旧值
+        """
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < LAG_CHECK_INTERVAL:
+            return self.lag
+        if not self._lock.acquire(blocking=False):
+            return self.lag
+        try:
+            try:
+                self.lag = self._measure()
+            except CircuitOpenError:
+                self.lag = None
+            except Error as e:
+                print(f"从库 {self.pool.name} 复制延迟查询错误: {e}")
+                self.lag = None
+            self.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self.lag
+
+    def healthy(self):
+        lag = self.current_lag()
+        return lag is not None and lag <= MAX_REPLICA_LAG
+
+
+_primary = _Pool('primary', DB_CONFIG)
+_replicas = [_Replica(index, config) for index, config in enumerate(REPLICA_CONFIGS, 1)]
+_round_robin = itertools.count()
+_routing_stats = {'replica_reads': 0, 'fallbacks': 0}
+_stats_lock = threading.Lock()
+
+# 当前请求的读操作是否路由到从库（每个线程 / 请求独立）
+_use_replica = contextvars.ContextVar('db_use_replica', default=False)
+
+
+def use_replica(enabled):
+    """
+    设置当前请求后续的 get_connection() 是否连接从库，返回用于 reset_replica() 的 token
+    """
+    return _use_replica.set(bool(enabled) and bool(_replicas))
+
+
+def reset_replica(token):
+    _use_replica.reset(token)
+
+
+def _count(key):
+    with _stats_lock:
+        _routing_stats[key] += 1
+
+
+# ---------- 请求截止时间 ----------
+
+# MySQL 的 socket 超时比剩余时间多留的秒数，优先让 MAX_EXECUTION_TIME 在服务端中止查询
+SOCKET_GRACE = 0.5
+# ER_QUERY_TIMEOUT：超过 MAX_EXECUTION_TIME 被中止；CR_SERVER_LOST：socket 读超时
+_QUERY_TIMEOUT_ERRORS = (3024,)
+_SOCKET_TIMEOUT_ERRORS = (2013,)
+_SELECT = re.compile(r'^(\s*)SELECT\b', re.IGNORECASE)
+
+# 当前请求的截止时间状态 {'at': monotonic 时间, 'exceeded': bool}
+_deadline = contextvars.ContextVar('db_deadline', default=None)
+_deadline_stats = {'query_timeouts': 0, 'socket_timeouts': 0, 'killed': 0}
+
+
+class DeadlineExceeded(pymysql.err.OperationalError):
+    """
+    请求截止时间已到，不再执行语句
+    """
+
+
+def set_deadline(seconds):
+    """
+    设置当前请求 seconds 秒后截止，返回用于 reset_deadline() 的 token
+    """
+    return _deadline.set({'at': time.monotonic() + seconds, 'exceeded': False})
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+@contextlib.contextmanager
+def without_deadline():
+    """
+    块内的语句不受当前请求截止时间限制（已提交写入之后的收尾语句），也不会把请求标记为超时
+    """
+    token = _deadline.set(None)
     try:
-        connection = pymysql.connect(
-            host=DB_CONFIG['host'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            port=DB_CONFIG['port'],
-            database=DATABASE_NAME,
-            charset=DB_CONFIG['charset'],
-            cursorclass=DB_CONFIG['cursorclass']
-        )
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """
+    当前请求剩余秒数，未设置截止时间时返回 None
+    """
+    state = _deadline.get()
+    return None if state is None else state['at'] - time.monotonic()
+
+
+def deadline_exceeded():
+    state = _deadline.get()
+    return bool(state and state['exceeded'])
+
+
+def _count_deadline(key):
+    with _stats_lock:
+        _deadline_stats[key] += 1
+
+
+class _DeadlineCursor:
+    """
+    按剩余时间限制每条语句的游标
+    """
+
+    def __init__(self, cursor, connection, state):
+        self._cursor = cursor
+        self._connection = connection
+        self._state = state
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def _run(self, method, query, args):
+        raw = self._connection._raw
+        if _deadline.get() is None:
+            # without_deadline() 块内：恢复连接池的 socket 超时，语句不加限制
+            config = self._connection._pool.config
+            raw._read_timeout = config.get('read_timeout', READ_TIMEOUT)
+            raw._write_timeout = config.get('write_timeout', WRITE_TIMEOUT)
+            return method(query, args)
+
+        remaining = self._state['at'] - time.monotonic()
+        if remaining <= 0:
+            self._state['exceeded'] = True
+            raise DeadlineExceeded(3024, '请求截止时间已到')
+
+        raw._read_timeout = raw._write_timeout = remaining + SOCKET_GRACE
+        if isinstance(query, str):
+            hint = f'SELECT /*+ MAX_EXECUTION_TIME({max(int(remaining * 1000), 1)}) */'
+            query = _SELECT.sub(lambda match: match.group(1) + hint, query, count=1)
+        try:
+            return method(query, args)
+        except pymysql.err.OperationalError as e:
+            if e.args and e.args[0] in _QUERY_TIMEOUT_ERRORS:
+                self._state['exceeded'] = True
+                _count_deadline('query_timeouts')
+            elif e.args and e.args[0] in _SOCKET_TIMEOUT_ERRORS and time.monotonic() >= self._state['at']:
+                # 服务端的语句仍在执行：中止它，连接已不可用
+                self._state['exceeded'] = True
+                _count_deadline('socket_timeouts')
+                self._connection.discard()
+                self._kill(raw)
+            raise
+
+    def _kill(self, raw):
+        try:
+            self._connection._pool.kill_query(raw.server_thread_id[0])
+            _count_deadline('killed')
+        except Exception as e:
+            print(f"中止超时查询错误: {e}")
+
+    def execute(self, query, args=None):
+        return self._run(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._run(self._cursor.executemany, query, args)
+
+
+def _replica_connection():
+    start = next(_round_robin)
+    for offset in range(len(_replicas)):
+        replica = _replicas[(start + offset) % len(_replicas)]
+        if not replica.healthy():
+            continue
+        try:
+            connection = replica.pool.acquire()
+        except Error as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"从库 {replica.pool.name} 连接错误: {e}")
+            replica.lag = None
+            continue
+        _count('replica_reads')
         return connection
+    _count('fallbacks')
+    return None
+
+
+def get_connection(primary=False):
+    """
+    获取数据库连接；当前请求已设置 use_replica(True) 且 primary=False 时连接可用的从库
+    连接失败、主库熔断打开或当前请求已超过截止时间时返回 None
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        _deadline.get()['exceeded'] = True
+        return None
+    if not primary and _use_replica.get():
+        connection = _replica_connection()
+        if connection is not None:
+            return connection
+    try:
+        return _primary.acquire()
+    except CircuitOpenError:
+        return None
     except Error as e:
         print(f"数据库连接错误: {e}")
         return None
 
 
+def breaker_states():
+    """
+    各库熔断器状态 {target: state}
+    """
+    states = {_primary.name: _primary.breaker.state}
+    states.update((replica.pool.name, replica.pool.breaker.state) for replica in _replicas)
+    return states
+
+
+def pool_stats():
+    """
+    各库连接池统计、从库复制延迟和读路由计数
+    """
+    replicas = []
+    for replica in _replicas:
+        snapshot = replica.pool.snapshot()
+        snapshot.update(lag=replica.lag, healthy=replica.lag is not None and replica.lag <= MAX_REPLICA_LAG)
+        replicas.append(snapshot)
+    with _stats_lock:
+        routing = dict(_routing_stats)
+        deadlines = dict(_deadline_stats)
+    return {
+        'primary': _primary.snapshot(),
+        'replicas': replicas,
+        'routing': routing,
+        'deadlines': deadlines,
+        'max_replica_lag': MAX_REPLICA_LAG
+    }
+
+
 def init_database():
     """
-    初始化数据库和所有表结构
+    初始化数据库：启动时只执行一次版本查询，数据库已是最新版本时直接返回；
+    数据库不存在或落后于迁移文件时，按顺序执行 migrations/ 下待执行的迁移（见 migrate.py）
     """
+    from migrate import apply_migrations, latest_version
+
+    target = latest_version()
     try:
-        # 首先连接MySQL服务器（不指定数据库）
         connection = pymysql.connect(
             host=DB_CONFIG['host'],
             user=DB_CONFIG['user'],
             password=DB_CONFIG['password'],
             port=DB_CONFIG['port'],
-            charset=DB_CONFIG['charset']
+            database=DATABASE_NAME,
+            charset=DB_CONFIG['charset'],
+            cursorclass=DB_CONFIG['cursorclass']
         )
-        cursor = connection.cursor()
-        
-        # 创建数据库（如果不存在）
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DATABASE_NAME} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-        print(f"✅ 数据库 '{DATABASE_NAME}' 已创建或已存在")
-        
-        # 选择数据库
-        cursor.execute(f"USE {DATABASE_NAME}")
-        
-        # 创建用户表
-        create_users_table = """
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            username VARCHAR(50) NOT NULL,
-            email VARCHAR(100) NOT NULL UNIQUE,
-            password VARCHAR(255) NOT NULL,
-            school VARCHAR(100) NOT NULL,
-            student_id VARCHAR(50) NOT NULL,
-            phone VARCHAR(20) NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_email (email),
-            INDEX idx_username (username)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户表'
-        """
-        cursor.execute(create_users_table)
-        print("✅ 用户表已创建")
-        
-        # 创建赛事表
-        create_contests_table = """
-        CREATE TABLE IF NOT EXISTS contests (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            name VARCHAR(255) NOT NULL COMMENT '赛事名称',
-            type VARCHAR(50) NOT NULL COMMENT '赛事类型',
-            start_date DATETIME COMMENT '赛事开始时间',
-            end_date DATETIME COMMENT '赛事结束时间',
-            registration_start DATETIME COMMENT '报名开始时间',
-            registration_end DATETIME COMMENT '报名截止时间',
-            location VARCHAR(500) COMMENT '赛事地点',
-            online_mode BOOLEAN DEFAULT FALSE COMMENT '是否线上赛事',
-            first_prize VARCHAR(255) COMMENT '一等奖',
-            second_prize VARCHAR(255) COMMENT '二等奖',
-            third_prize VARCHAR(255) COMMENT '三等奖',
-            certificate BOOLEAN DEFAULT FALSE COMMENT '是否颁发证书',
-            scholarship VARCHAR(255) COMMENT '其他奖励',
-            rules TEXT COMMENT '赛事规则',
-            status ENUM('draft', 'published', 'ongoing', 'completed', 'archived') DEFAULT 'draft' COMMENT '赛事状态',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_name (name),
-            INDEX idx_type (type),
-            INDEX idx_status (status)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事表'
-        """
-        cursor.execute(create_contests_table)
-        print("✅ 赛事表已创建")
-        
-        # 创建预算表
-        create_budget_table = """
-        CREATE TABLE IF NOT EXISTS contest_budget (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            total DECIMAL(10, 2) DEFAULT 0 COMMENT '总预算',
-            category_name VARCHAR(100) COMMENT '预算分类名称',
-            category_amount DECIMAL(10, 2) COMMENT '分类金额',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事预算表'
-        """
-        cursor.execute(create_budget_table)
-        print("✅ 预算表已创建")
-        
-        # 创建场地表
-        create_venue_table = """
-        CREATE TABLE IF NOT EXISTS contest_venues (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            name VARCHAR(255) NOT NULL COMMENT '场地名称',
-            capacity INT COMMENT '容纳人数',
-            address VARCHAR(500) COMMENT '详细地址',
-            facilities JSON COMMENT '设施标签',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事场地表'
-        """
-        cursor.execute(create_venue_table)
-        print("✅ 场地表已创建")
-        
-        # 创建人员表
-        create_personnel_table = """
-        CREATE TABLE IF NOT EXISTS contest_personnel (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            role VARCHAR(50) NOT NULL COMMENT '角色类型: organizer/judge/volunteer',
-            name VARCHAR(100) NOT NULL COMMENT '姓名',
-            contact VARCHAR(100) COMMENT '联系方式',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事人员表'
-        """
-        cursor.execute(create_personnel_table)
-        print("✅ 人员表已创建")
-        
-        # 创建设备表
-        create_equipment_table = """
-        CREATE TABLE IF NOT EXISTS contest_equipment (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            name VARCHAR(255) NOT NULL COMMENT '设备名称',
-            quantity INT DEFAULT 1 COMMENT '数量',
-            status ENUM('available', 'reserved', 'maintenance') DEFAULT 'available' COMMENT '状态',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事设备表'
-        """
-        cursor.execute(create_equipment_table)
-        print("✅ 设备表已创建")
-        
-        # 创建物资表
-        create_materials_table = """
-        CREATE TABLE IF NOT EXISTS contest_materials (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            name VARCHAR(255) NOT NULL COMMENT '物资名称',
-            quantity VARCHAR(50) COMMENT '数量',
-            unit VARCHAR(20) COMMENT '单位',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事物资表'
-        """
-        cursor.execute(create_materials_table)
-        print("✅ 物资表已创建")
-        
-        # 创建审核记录表
-        create_reviews_table = """
-        CREATE TABLE IF NOT EXISTS contest_reviews (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            reviewer_name VARCHAR(100) COMMENT '审核员姓名',
-            review_result ENUM('pending', 'approved', 'rejected') DEFAULT 'pending' COMMENT '审核结果',
-            review_comment TEXT COMMENT '审核意见',
-            review_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '审核时间',
-            compliance_check BOOLEAN DEFAULT TRUE COMMENT '合规性检查',
-            budget_check BOOLEAN DEFAULT TRUE COMMENT '预算检查',
-            resource_check BOOLEAN DEFAULT TRUE COMMENT '资源检查',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_review_result (review_result),
-            INDEX idx_review_time (review_time)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='审核记录表'
-        """
-        cursor.execute(create_reviews_table)
-        print("✅ 审核记录表已创建")
-        
-        # 创建冲突检测表
-        create_conflicts_table = """
-        CREATE TABLE IF NOT EXISTS contest_conflicts (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            conflict_type ENUM('time', 'venue', 'resource', 'personnel') NOT NULL COMMENT '冲突类型',
-            conflict_with_id INT COMMENT '冲突的赛事ID',
-            conflict_description TEXT COMMENT '冲突描述',
-            severity ENUM('low', 'medium', 'high') DEFAULT 'medium' COMMENT '严重程度',
-            is_resolved BOOLEAN DEFAULT FALSE COMMENT '是否已解决',
-            resolution TEXT COMMENT '解决方案',
-            detected_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '检测时间',
-            resolved_time TIMESTAMP NULL COMMENT '解决时间',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_conflict_type (conflict_type),
-            INDEX idx_is_resolved (is_resolved)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='冲突检测表'
-        """
-        cursor.execute(create_conflicts_table)
-        print("✅ 冲突检测表已创建")
-        
-        # 创建通知表
-        create_notifications_table = """
-        CREATE TABLE IF NOT EXISTS contest_notifications (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            notification_type ENUM('status_change', 'conflict_alert', 'review_result', 'system') DEFAULT 'system' COMMENT '通知类型',
-            title VARCHAR(255) NOT NULL COMMENT '通知标题',
-            content TEXT COMMENT '通知内容',
-            recipient VARCHAR(100) COMMENT '接收人',
-            is_read BOOLEAN DEFAULT FALSE COMMENT '是否已读',
-            created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_recipient (recipient),
-            INDEX idx_is_read (is_read)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='通知表'
-        """
-        cursor.execute(create_notifications_table)
-        print("✅ 通知表已创建")
-        
-        # 创建学生报名表
-        create_registrations_table = """
-        CREATE TABLE IF NOT EXISTS contest_registrations (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            student_name VARCHAR(100) NOT NULL COMMENT '学生姓名',
-            student_id VARCHAR(50) NOT NULL COMMENT '学号',
-            email VARCHAR(100) NOT NULL COMMENT '邮箱',
-            phone VARCHAR(20) COMMENT '手机号',
-            major VARCHAR(100) COMMENT '专业',
-            grade VARCHAR(20) COMMENT '年级',
-            class_name VARCHAR(50) COMMENT '班级',
-            team_name VARCHAR(100) COMMENT '团队名称',
-            team_role VARCHAR(50) COMMENT '团队角色',
-            skills JSON COMMENT '技能列表',
-            experience TEXT COMMENT '竞赛经验',
-            motivation TEXT COMMENT '参赛动机',
-            status ENUM('pending', 'approved', 'rejected') DEFAULT 'pending' COMMENT '审核状态',
-            reject_reason TEXT COMMENT '驳回原因',
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '申请时间',
-            reviewed_at TIMESTAMP NULL COMMENT '审核时间',
-            reviewer_name VARCHAR(100) COMMENT '审核人',
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_student_id (student_id),
-            INDEX idx_status (status),
-            INDEX idx_applied_at (applied_at)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='报名申请表'
-        """
-        cursor.execute(create_registrations_table)
-        print("✅ 报名申请表已创建")
-        
-        # 创建团队表
-        create_teams_table = """
-        CREATE TABLE IF NOT EXISTS contest_teams (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL,
-            name VARCHAR(100) NOT NULL COMMENT '团队名称',
-            captain_name VARCHAR(100) NOT NULL COMMENT '队长姓名',
-            captain_student_id VARCHAR(50) NOT NULL COMMENT '队长学号',
-            captain_major VARCHAR(100) COMMENT '队长专业',
-            max_members INT DEFAULT 5 COMMENT '最大成员数',
-            member_count INT DEFAULT 1 COMMENT '当前成员数',
-            status ENUM('recruiting', 'active', 'disbanded') DEFAULT 'recruiting' COMMENT '团队状态',
-            skills JSON COMMENT '团队技能',
-            achievements JSON COMMENT '团队成就',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_captain_student_id (captain_student_id),
-            INDEX idx_status (status)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='团队表'
-        """
-        cursor.execute(create_teams_table)
-        print("✅ 团队表已创建")
-        
-        # 创建团队成员表
-        create_team_members_table = """
-        CREATE TABLE IF NOT EXISTS team_members (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            team_id INT NOT NULL,
-            student_name VARCHAR(100) NOT NULL COMMENT '学生姓名',
-            student_id VARCHAR(50) NOT NULL COMMENT '学号',
-            major VARCHAR(100) COMMENT '专业',
-            role VARCHAR(50) DEFAULT '队员' COMMENT '角色',
-            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '加入时间',
-            FOREIGN KEY (team_id) REFERENCES contest_teams(id) ON DELETE CASCADE,
-            INDEX idx_team_id (team_id),
-            INDEX idx_student_id (student_id),
-            UNIQUE KEY uk_team_student (team_id, student_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='团队成员表'
-        """
-        cursor.execute(create_team_members_table)
-        print("✅ 团队成员表已创建")
-        
-        # 创建学生信息扩展表
-        create_students_table = """
-        CREATE TABLE IF NOT EXISTS students (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            student_id VARCHAR(50) NOT NULL UNIQUE COMMENT '学号',
-            name VARCHAR(100) NOT NULL COMMENT '姓名',
-            email VARCHAR(100) NOT NULL COMMENT '邮箱',
-            phone VARCHAR(20) COMMENT '手机号',
-            major VARCHAR(100) COMMENT '专业',
-            grade VARCHAR(20) COMMENT '年级',
-            class_name VARCHAR(50) COMMENT '班级',
-            gpa DECIMAL(3, 2) COMMENT 'GPA成绩',
-            skills JSON COMMENT '技能列表',
-            achievements JSON COMMENT '获奖成就',
-            avatar VARCHAR(255) DEFAULT '👨‍🎓' COMMENT '头像',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '注册时间',
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_student_id (student_id),
-            INDEX idx_name (name),
-            INDEX idx_grade (grade),
-            INDEX idx_major (major)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='学生信息表'
-        """
-        cursor.execute(create_students_table)
-        print("✅ 学生信息表已创建")
-        
-        # 创建专家库表
-        create_experts_table = """
-        CREATE TABLE IF NOT EXISTS experts (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            name VARCHAR(100) NOT NULL COMMENT '专家姓名',
-            title VARCHAR(100) COMMENT '职称',
-            organization VARCHAR(200) COMMENT '所属单位',
-            field VARCHAR(100) COMMENT '专业领域',
-            email VARCHAR(100) COMMENT '邮箱',
-            phone VARCHAR(20) COMMENT '手机号',
-            expertise JSON COMMENT '擅长领域列表',
-            experience INT DEFAULT 0 COMMENT '评审经验（年）',
-            rating DECIMAL(3, 2) DEFAULT 5.0 COMMENT '评分（满分5分）',
-            review_count INT DEFAULT 0 COMMENT '评审次数',
-            status ENUM('active', 'inactive') DEFAULT 'active' COMMENT '状态',
-            bio TEXT COMMENT '个人简介',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_name (name),
-            INDEX idx_field (field),
-            INDEX idx_status (status)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='专家库表'
-        """
-        cursor.execute(create_experts_table)
-        print("✅ 专家库表已创建")
-        
-        # 创建评审分配表
-        create_judge_assignments_table = """
-        CREATE TABLE IF NOT EXISTS judge_assignments (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL COMMENT '赛事ID',
-            expert_id INT NOT NULL COMMENT '专家ID',
-            role ENUM('primary', 'secondary', 'reviewer') DEFAULT 'primary' COMMENT '评审角色',
-            assigned_date DATE COMMENT '分配日期',
-            status ENUM('pending', 'accepted', 'rejected', 'completed') DEFAULT 'pending' COMMENT '状态',
-            score DECIMAL(5, 2) COMMENT '给出的分数',
-            comments TEXT COMMENT '评审意见',
-            submitted_at TIMESTAMP NULL COMMENT '提交时间',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            FOREIGN KEY (expert_id) REFERENCES experts(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_expert_id (expert_id),
-            INDEX idx_status (status)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='评审分配表'
-        """
-        cursor.execute(create_judge_assignments_table)
-        print("✅ 评审分配表已创建")
-        
-        # 创建结果公示表
-        create_results_table = """
-        CREATE TABLE IF NOT EXISTS contest_results (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            contest_id INT NOT NULL COMMENT '赛事ID',
-            team_name VARCHAR(100) COMMENT '团队名称',
-            student_name VARCHAR(100) COMMENT '学生姓名',
-            student_id VARCHAR(50) COMMENT '学号',
-            award_level ENUM('first', 'second', 'third', 'excellence', 'participation') COMMENT '奖项等级',
-            final_score DECIMAL(5, 2) COMMENT '最终得分',
-            ranking INT COMMENT '排名',
-            certificate_number VARCHAR(100) COMMENT '证书编号',
-            remarks TEXT COMMENT '备注',
-            is_published BOOLEAN DEFAULT FALSE COMMENT '是否已公示',
-            published_at TIMESTAMP NULL COMMENT '公示时间',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
-            INDEX idx_contest_id (contest_id),
-            INDEX idx_award_level (award_level),
-            INDEX idx_is_published (is_published)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='竞赛结果表'
-        """
-        cursor.execute(create_results_table)
-        print("✅ 竞赛结果表已创建")
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT MAX(version) AS version FROM schema_version')
+            current = cursor.fetchone()['version'] or 0
+            cursor.close()
+        finally:
+            connection.close()
+
+        if current >= target:
+            print(f"✅ 数据库已是最新版本 ({current:04d})")
+            return True
+    except Error as e:
+        # 1049: 数据库不存在  1146: schema_version 表不存在（首次部署或迁移机制引入前的旧库）
+        if e.args[0] not in (1049, 1146):
+            print(f"❌ 数据库初始化错误: {e}")
+            return False
+
+    try:
+        apply_migrations()
         print("✅ 数据库初始化完成！")
         return True
-        
     except Error as e:
         print(f"❌ 数据库初始化错误: {e}")
         return False
@@ -0,0 +1,88 @@
+"""
+读写分离的请求路由
+GET / HEAD 请求处理期间的 get_connection() 连接从库（见 database.py），以下情况仍连接主库：
+- 视图用 @use_primary 标记：GET 中会写库（看板汇总缓存）或需要读到最新状态（任务进度）的接口
+- 读己之写：客户端最近 STICKY_SECONDS 秒内有成功的写请求。写请求的响应设置 cookie 和 X-Primary-Until 响应头，
+  跨域请求不带 cookie 时客户端可以在请求头 X-Primary-Until 中原样带回
+"""
+import os
+import threading
+import time
+
+from flask import current_app, g, request
+
+import database
+
+# 写请求之后该客户端的读请求固定访问主库的秒数，应大于 MAX_REPLICA_LAG
+STICKY_SECONDS = float(os.environ.get('DB_STICKY_SECONDS', 5))
+STICKY_COOKIE = 'db_primary_until'
+STICKY_HEADER = 'X-Primary-Until'
+
+READ_METHODS = ('GET', 'HEAD')
+
+stats = {'replica_routed': 0, 'sticky': 0, 'primary_only': 0}
+_stats_lock = threading.Lock()
+
+
+def use_primary(view):
+    """
+    标记 GET 视图只使用主库，放在 @app.route 下一行
+    """
+    view.use_primary = True
+    return view
+
+
+def _count(key):
+    with _stats_lock:
+        stats[key] += 1
+
+
+def _sticky_until():
+    value = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def route_request():
+    """
+    before_request 钩子：读请求切换到从库
+    """
+    if request.method not in READ_METHODS or not database.REPLICA_CONFIGS:
+        return
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None:
+        return
+    if getattr(view, 'use_primary', False):
+        _count('primary_only')
+        return
+    if _sticky_until() > time.time():
+        _count('sticky')
+        return
+    g.db_replica_token = database.use_replica(True)
+    _count('replica_routed')
+
+
+def mark_write(response):
+    """
+    after_request 钩子：成功的写请求之后，该客户端的读请求在 STICKY_SECONDS 秒内访问主库
+    """
+    if request.method in READ_METHODS or request.method == 'OPTIONS' or response.status_code >= 400:
+        return response
+    until = f'{time.time() + STICKY_SECONDS:.3f}'
+    response.set_cookie(STICKY_COOKIE, until, max_age=int(STICKY_SECONDS) + 1, httponly=True, samesite='Lax')
+    response.headers[STICKY_HEADER] = until
+    return response
+
+
+def reset_route(exc=None):
+    token = g.pop('db_replica_token', None)
+    if token is not None:
+        database.reset_replica(token)
+
+
+def init_db_routing(app):
+    app.before_request(route_request)
+    app.after_request(mark_write)
+    app.teardown_request(reset_route)
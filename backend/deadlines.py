@@ -0,0 +1,94 @@
+"""
+接口截止时间
+每个请求开始时按路由设置截止时间（database.set_deadline），之后取得的连接执行每条语句前都按剩余时间限制：
+SELECT 加 MAX_EXECUTION_TIME 提示，socket 读写超时设为剩余时间，超时的写语句被 KILL QUERY。
+截止时间到达后接口原本的错误响应统一改为 504，并按接口计数；接口捕获了超时仍返回成功时保留原响应。
+业务写入提交之后的收尾语句（版本号、看板标记）不受截止时间限制，见 database.without_deadline()。
+
+截止时间默认按路由类别（admission.py 的 read / write / heavy），个别接口用 @deadline(seconds) 单独配置。
+"""
+import os
+import threading
+
+from flask import current_app, g, jsonify, request
+
+import database
+
+DEFAULT_DEADLINES = {
+    'read': float(os.environ.get('DEADLINE_READ', 5)),
+    'write': float(os.environ.get('DEADLINE_WRITE', 10)),
+    'heavy': float(os.environ.get('DEADLINE_HEAVY', 120)),
+}
+
+READ_METHODS = ('GET', 'HEAD')
+
+stats = {'exceeded': 0, 'by_endpoint': {}}
+_stats_lock = threading.Lock()
+
+
+def deadline(seconds):
+    """
+    为视图单独设置截止时间（秒），放在 @app.route 下一行
+    """
+    def decorator(view):
+        view.deadline = seconds
+        return view
+    return decorator
+
+
+def _deadline_for(view):
+    seconds = getattr(view, 'deadline', None)
+    if seconds is not None:
+        return seconds
+    route_class = getattr(view, 'route_class', 'read' if request.method in READ_METHODS else 'write')
+    if route_class is None:
+        return None
+    return DEFAULT_DEADLINES[route_class]
+
+
+def start_deadline():
+    """
+    before_request 钩子：设置本次请求的截止时间
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None or request.method == 'OPTIONS':
+        return
+    seconds = _deadline_for(view)
+    if seconds:
+        g.deadline_token = database.set_deadline(seconds)
+
+
+def check_deadline(response):
+    """
+    after_request 钩子：请求中有语句因截止时间被中止、且接口返回错误时改为 504
+    """
+    if not database.deadline_exceeded() or response.status_code < 400:
+        return response
+    with _stats_lock:
+        stats['exceeded'] += 1
+        stats['by_endpoint'][request.endpoint] = stats['by_endpoint'].get(request.endpoint, 0) + 1
+    print(f"接口超时: {request.method} {request.path}")
+    timeout = jsonify({
+        'success': False,
+        'message': '请求处理超时，请缩小查询范围或稍后重试'
+    })
+    timeout.status_code = 504
+    return timeout
+
+
+def reset_deadline(exc=None):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        database.reset_deadline(token)
+
+
+def snapshot():
+    with _stats_lock:
+        return {'exceeded': stats['exceeded'], 'by_endpoint': dict(stats['by_endpoint']),
+                'defaults': dict(DEFAULT_DEADLINES)}
+
+
+def init_deadlines(app):
+    app.before_request(start_deadline)
+    app.after_request(check_deadline)
+    app.teardown_request(reset_deadline)
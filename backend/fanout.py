@@ -0,0 +1,246 @@
+"""
+赛事事件通知扇出
+赛事审核通过、改期、结果公示等事件先在业务事务中写入一条 notification_fanouts 记录（只有一次 INSERT），
+提交后由后台线程把它展开为该赛事每个报名学生 / 团队成员（含队长）一条通知，不占用请求线程。
+
+展开按学号升序分批进行：开始时用一条窗口函数查询对水位之后的收件人排序一次，每 CHUNK_SIZE 个取一个学号作为批次上界；
+每批用一条 INSERT ... SELECT 写入 (水位, 上界] 内的收件人，并在同一事务中推进水位。各批上界用完后再从水位查一次，
+把扇出期间新增的收件人补上，没有新增时结束。收件人集合只排序一次，不随批次数重复展开。
+每批是一个短事务，批次之间短暂停顿；会话使用 READ COMMITTED，INSERT ... SELECT 不对报名表加共享锁，
+扇出期间报名和审核不受影响。进程中断后任意进程可从水位继续；后台任务 worker（jobs.py）启动时也会启动扇出线程，
+Web 进程重启前遗留的任务不需要等到下一次扇出登记。
+
+用法:
+    python fanout.py run     处理所有待执行的扇出任务后退出
+"""
+import argparse
+import os
+import threading
+import time
+
+from database import get_connection
+from http_cache import bump_versions
+
+CHUNK_SIZE = 1000
+CHUNK_PAUSE = 0.01
+POLL_INTERVAL = 5.0
+# running 状态超过该秒数没有进展的任务视为执行进程已退出，可以被重新领取
+STALE_AFTER = 300
+MAX_ATTEMPTS = 3
+
+# 收件人：报名学生 ∪ 团队成员 ∪ 队长（未解散团队），UNION 去重
+_RECIPIENTS = """
+    SELECT student_id FROM contest_registrations
+    WHERE contest_id = %(contest_id)s AND student_id > %(after)s {upper}
+    UNION
+    SELECT m.student_id FROM team_members m
+    JOIN contest_teams t ON m.team_id = t.id
+    WHERE t.contest_id = %(contest_id)s AND t.status != 'disbanded' AND m.student_id > %(after)s {upper_member}
+    UNION
+    SELECT captain_student_id FROM contest_teams
+    WHERE contest_id = %(contest_id)s AND status != 'disbanded' AND captain_student_id > %(after)s {upper_captain}
+"""
+
+
+def _recipients(bounded):
+    if not bounded:
+        return _RECIPIENTS.format(upper='', upper_member='', upper_captain='')
+    return _RECIPIENTS.format(upper='AND student_id <= %(upper)s',
+                              upper_member='AND m.student_id <= %(upper)s',
+                              upper_captain='AND captain_student_id <= %(upper)s')
+
+
+def enqueue(cursor, contest_id, notification_type, title, content):
+    """
+    在业务事务中登记一次扇出，提交后调用 wake()
+    """
+    cursor.execute("""
+        INSERT INTO notification_fanouts (contest_id, notification_type, title, content)
+        VALUES (%s, %s, %s, %s)
+    """, (contest_id, notification_type, title, content))
+    return cursor.lastrowid
+
+
+def _claim(connection, cursor):
+    """
+    领取一个待执行（或执行进程已退出）的扇出任务，返回任务行或 None
+    """
+    claimable = """
+        (status = 'pending'
+         OR (status = 'running' AND heartbeat_at < NOW() - INTERVAL %s SECOND))
+    """
+    cursor.execute(f"""
+        SELECT id FROM notification_fanouts WHERE {claimable} ORDER BY id LIMIT 1
+    """, (STALE_AFTER,))
+    row = cursor.fetchone()
+    connection.commit()
+    if not row:
+        return None
+
+    # 条件 UPDATE 领取，多个进程同时看到同一任务时只有一个成功
+    cursor.execute(f"""
+        UPDATE notification_fanouts
+        SET status = 'running', attempts = attempts + 1,
+            started_at = COALESCE(started_at, NOW()), heartbeat_at = NOW()
+        WHERE id = %s AND {claimable}
+    """, (row['id'], STALE_AFTER))
+    claimed = cursor.rowcount == 1
+    connection.commit()
+    if not claimed:
+        return None
+    cursor.execute('SELECT * FROM notification_fanouts WHERE id = %s', (row['id'],))
+    task = cursor.fetchone()
+    connection.commit()
+    return task
+
+
+def _boundaries(connection, cursor, task):
+    """
+    水位之后的收件人每 CHUNK_SIZE 个一批，返回各批的学号上界（最后一批为最大学号）；没有收件人时返回空列表
+    """
+    params = {'contest_id': task['contest_id'], 'after': task['last_recipient'], 'chunk': CHUNK_SIZE}
+    cursor.execute(f"""
+        SELECT student_id FROM (
+            SELECT student_id,
+                   ROW_NUMBER() OVER (ORDER BY student_id) AS position,
+                   COUNT(*) OVER () AS total
+            FROM ({_recipients(False)}) recipients
+        ) numbered
+        WHERE MOD(position, %(chunk)s) = 0 OR position = total
+        ORDER BY student_id
+    """, params)
+    boundaries = [row['student_id'] for row in cursor.fetchall()]
+    connection.commit()
+    return boundaries
+
+
+def _send_chunk(connection, cursor, task, upper):
+    """
+    发送 (水位, upper] 内的通知并把水位推进到 upper，返回本批发送数
+    """
+    params = {'contest_id': task['contest_id'], 'after': task['last_recipient'], 'upper': upper,
+              'type': task['notification_type'], 'title': task['title'], 'content': task['content']}
+    cursor.execute(f"""
+        INSERT INTO contest_notifications (contest_id, notification_type, title, content, recipient)
+        SELECT %(contest_id)s, %(type)s, %(title)s, %(content)s, recipients.student_id
+        FROM ({_recipients(True)}) recipients
+    """, params)
+    sent = cursor.rowcount
+    cursor.execute("""
+        UPDATE notification_fanouts
+        SET last_recipient = %s, sent_count = sent_count + %s, heartbeat_at = NOW()
+        WHERE id = %s
+    """, (upper, sent, task['id']))
+    connection.commit()
+    task['last_recipient'] = upper
+    return sent
+
+
+def process(task, connection, cursor):
+    """
+    执行一个已领取的扇出任务直到完成
+    """
+    total = 0
+    try:
+        while True:
+            boundaries = _boundaries(connection, cursor, task)
+            if not boundaries:
+                break
+            for upper in boundaries:
+                sent = _send_chunk(connection, cursor, task, upper)
+                if sent:
+                    total += sent
+                    bump_versions(cursor, 'contest_notifications')
+                if CHUNK_PAUSE:
+                    time.sleep(CHUNK_PAUSE)
+        cursor.execute("""
+            UPDATE notification_fanouts SET status = 'completed', finished_at = NOW() WHERE id = %s
+        """, (task['id'],))
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        print(f"通知扇出任务 {task['id']} 错误: {e}")
+        cursor.execute("""
+            UPDATE notification_fanouts
+            SET status = IF(attempts >= %s, 'failed', 'pending'), error_message = %s
+            WHERE id = %s
+        """, (MAX_ATTEMPTS, str(e), task['id']))
+        connection.commit()
+    return total
+
+
+def drain():
+    """
+    处理所有可领取的扇出任务，返回处理的任务数
+    """
+    connection = get_connection()
+    if not connection:
+        print("通知扇出: 数据库连接失败")
+        return 0
+    cursor = connection.cursor()
+    handled = 0
+    try:
+        cursor.execute('SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED')
+        # 会话隔离级别已修改，连接不再放回连接池
+        connection.discard()
+        while True:
+            task = _claim(connection, cursor)
+            if not task:
+                return handled
+            process(task, connection, cursor)
+            handled += 1
+    finally:
+        cursor.close()
+        connection.close()
+
+
+class _Worker:
+    """
+    进程内后台扇出线程：被 wake() 唤醒或每 POLL_INTERVAL 秒检查一次待执行任务
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def wake(self):
+        # 后台线程按需启动；gunicorn 预加载后 fork 出的 worker 中需要重新启动
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._run, name='notification-fanout', daemon=True)
+                    self._thread.start()
+        self._event.set()
+
+    def _run(self):
+        while True:
+            self._event.wait(POLL_INTERVAL)
+            self._event.clear()
+            try:
+                drain()
+            except Exception as e:
+                print(f"通知扇出线程错误: {e}")
+
+
+_worker = _Worker()
+
+
+def wake():
+    """
+    通知后台线程有新的扇出任务（在登记扇出的事务提交之后调用）
+    """
+    _worker.wake()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='赛事事件通知扇出')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('run', help='处理所有待执行的扇出任务')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        count = drain()
+        print(f"✅ 处理了 {count} 个扇出任务")
@@ -0,0 +1,62 @@
+"""
+Gunicorn 生产服务器配置
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+进程模型：
+- master 进程预加载应用（preload_app），并在启动时执行一次 init_database()
+- worker 进程由 master fork 而来，直接复用已加载的代码，不再重复初始化数据库
+- 平滑重启：kill -HUP <master_pid>  重新读取配置并逐个替换 worker
+- 代码热升级：kill -USR2 <master_pid> 启动新 master，确认正常后对旧 master 发送 WINCH、QUIT
+- 平滑停止：kill -TERM <master_pid> worker 处理完正在执行的请求后退出（最长 graceful_timeout 秒）
+
+所有参数均可通过环境变量覆盖。
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# worker 数量按CPU核数推导：2 * 核数 + 1
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# 接口以数据库IO为主，使用线程 worker 让每个进程能同时处理多个请求，并支持 keep-alive
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# 预加载应用：代码只在 master 中导入一次，worker 通过 fork 共享内存页
+preload_app = True
+
+# keep-alive：前面有反向代理时应略大于代理的空闲连接超时
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 请求超时与平滑退出等待时间
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# 每个 worker 处理一定数量请求后自动替换，加随机抖动避免同时重启
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+backlog = 2048
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """
+    master 进程启动时执行一次数据库初始化，worker 中不会再执行
+    """
+    from database import init_database
+    print("=" * 50)
+    print("正在初始化数据库...")
+    print("=" * 50)
+    init_database()
+
+
+def post_fork(server, worker):
+    server.log.info("worker %s 已启动", worker.pid)
+
+
+def worker_int(worker):
+    worker.log.info("worker %s 收到中断信号，正在退出", worker.pid)
@@ -0,0 +1,114 @@
+"""
+条件请求（ETag / Last-Modified）支持
+
+每张业务表在 table_versions 中有一个版本号，写接口在事务提交后调用 bump_versions() 递增；
+读接口用 @conditional(表名...) 装饰，先用一次主键查询取出相关表的版本号生成校验值，
+客户端携带的 If-None-Match / If-Modified-Since 仍然有效时直接返回 304，不执行查询也不序列化结果。
+
+版本号必须在提交之后递增：先递增再提交时，读请求可能拿到旧数据和新版本号，之后会一直被 304 命中。
+直接用SQL脚本修改数据后，需要手动执行
+    UPDATE table_versions SET version = version + 1 WHERE table_name = '表名';
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+from database import get_connection, without_deadline
+
+
+def bump_versions(cursor, *tables):
+    """
+    递增若干表的版本号（须在写事务提交之后调用，本函数会自行提交）
+    """
+    if not tables:
+        return
+    try:
+        with without_deadline():
+            cursor.executemany("""
+                INSERT INTO table_versions (table_name, version) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """, [(table,) for table in tables])
+            cursor.connection.commit()
+    except Exception as e:
+        # 业务写入已经提交，版本号更新失败不影响本次请求的结果
+        print(f"更新数据版本号错误: {e}")
+
+
+def get_validators(tables, key=None):
+    """
+    查询表版本号，返回 (etag, last_modified)；数据库不可用时返回 (None, None)
+    key(cursor) 返回的字符串一并计入 etag，抛出 ValueError 时返回 (None, None)（参数错误由接口处理）
+    """
+    connection = get_connection()
+    if not connection:
+        return None, None
+    try:
+        cursor = connection.cursor()
+        placeholders = ','.join(['%s'] * len(tables))
+        cursor.execute(f"""
+            SELECT table_name, version, UNIX_TIMESTAMP(updated_at) AS modified
+            FROM table_versions
+            WHERE table_name IN ({placeholders})
+        """, list(tables))
+        rows = {row['table_name']: row for row in cursor.fetchall()}
+        try:
+            extra = key(cursor) if key else None
+        except ValueError:
+            return None, None
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+
+    tag_source = ';'.join(f"{table}:{rows[table]['version'] if table in rows else 0}" for table in tables)
+    if extra is not None:
+        tag_source += f';{extra}'
+    etag = hashlib.sha1(tag_source.encode('utf-8')).hexdigest()[:20]
+
+    modified = [int(row['modified']) for row in rows.values() if row['modified'] is not None]
+    last_modified = datetime.fromtimestamp(max(modified), tz=timezone.utc) if modified else None
+    return etag, last_modified
+
+
+def _not_modified(etag, last_modified):
+    # If-None-Match 优先于 If-Modified-Since（RFC 7232 第6节）
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(*tables, key=None):
+    """
+    GET接口装饰器：根据相关表的版本号处理条件请求
+    tables 需要包含接口结果依赖的所有表（包括只用于 JOIN 取名称的表）
+    结果还取决于表版本号以外的因素（如随当前时间变化的默认查询范围）时，用 key(cursor, **视图参数) 返回这部分的字符串
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = get_validators(
+                tables, (lambda cursor: key(cursor, *args, **kwargs)) if key else None
+            )
+            if etag is None:
+                return view(*args, **kwargs)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            # 弱校验值：同一份数据在压缩/不压缩时字节不同，语义相同
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            # 允许缓存，但每次使用前都要向服务端验证
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,272 @@
+"""
+查询索引分析工具
+用代表性参数对应用中的热点查询模板执行 EXPLAIN，找出全表扫描和 filesort，
+并为缺少匹配复合索引的查询生成在线加索引的迁移文件。
+
+用法:
+    python index_advisor.py                    输出分析报告
+    python index_advisor.py --emit-migration   同时把缺失的索引写成新的迁移文件
+"""
+import argparse
+
+from database import get_connection
+
+# 热点查询模板（与 app.py 中的查询保持一致）
+# params: 代表性参数；sample: 可选的取样查询，数据库中有数据时用真实值替换代表性参数
+# index: 该查询期望命中的复合索引 (表名, 索引名, 列定义列表)
+QUERY_TEMPLATES = [
+    {
+        'name': '报名列表按状态筛选',
+        'sql': """
+            SELECT r.*, c.name as contest_name
+            FROM contest_registrations r
+            LEFT JOIN contests c ON r.contest_id = c.id
+            WHERE r.status = %s
+            ORDER BY r.applied_at DESC
+        """,
+        'params': ('pending',),
+        'index': ('contest_registrations', 'idx_status_applied_at', ['status', 'applied_at'])
+    },
+    {
+        'name': '评审分配按赛事和状态筛选',
+        'sql': """
+            SELECT ja.*, e.name as expert_name, c.name as contest_name
+            FROM judge_assignments ja
+            LEFT JOIN experts e ON ja.expert_id = e.id
+            LEFT JOIN contests c ON ja.contest_id = c.id
+            WHERE ja.contest_id = %s AND ja.status = %s
+            ORDER BY ja.created_at DESC
+        """,
+        'params': (1, 'pending'),
+        'sample': 'SELECT contest_id, status FROM judge_assignments LIMIT 1',
+        'index': ('judge_assignments', 'idx_contest_status_created', ['contest_id', 'status', 'created_at'])
+    },
+    {
+        'name': '竞赛结果按赛事排名',
+        'sql': """
+            SELECT cr.*, c.name as contest_name
+            FROM contest_results cr
+            LEFT JOIN contests c ON cr.contest_id = c.id
+            WHERE cr.contest_id = %s
+            ORDER BY cr.ranking ASC, cr.final_score DESC
+        """,
+        'params': (1,),
+        'sample': 'SELECT contest_id FROM contest_results LIMIT 1',
+        'index': ('contest_results', 'idx_contest_ranking_score', ['contest_id', 'ranking', 'final_score DESC'])
+    },
+    {
+        'name': '学生所在团队',
+        'sql': """
+            SELECT tm.team_id, t.name, tm.role
+            FROM team_members tm
+            LEFT JOIN contest_teams t ON tm.team_id = t.id
+            WHERE tm.student_id = %s AND t.status != 'disbanded'
+        """,
+        'params': ('2021001',),
+        'sample': 'SELECT student_id FROM team_members LIMIT 1',
+        'index': ('team_members', 'idx_student_team', ['student_id', 'team_id'])
+    },
+    {
+        'name': '团队列表按赛事筛选',
+        'sql': """
+            SELECT t.*, c.name as contest_name
+            FROM contest_teams t
+            LEFT JOIN contests c ON t.contest_id = c.id
+            WHERE t.contest_id = %s AND t.status != 'disbanded'
+            ORDER BY t.created_at DESC
+        """,
+        'params': (1,),
+        'sample': 'SELECT contest_id FROM contest_teams LIMIT 1',
+        'index': ('contest_teams', 'idx_contest_created', ['contest_id', 'created_at'])
+    },
+    {
+        'name': '赛事冲突列表',
+        'sql': """
+            SELECT cf.*, c.name as conflict_with_name
+            FROM contest_conflicts cf
+            LEFT JOIN contests c ON cf.conflict_with_id = c.id
+            WHERE cf.contest_id = %s
+            ORDER BY cf.severity DESC, cf.detected_time DESC
+        """,
+        'params': (1,),
+        'sample': 'SELECT contest_id FROM contest_conflicts LIMIT 1',
+        'index': ('contest_conflicts', 'idx_contest_severity_detected',
+                  ['contest_id', 'severity DESC', 'detected_time DESC'])
+    },
+    {
+        'name': '专家列表',
+        'sql': """
+            SELECT * FROM experts WHERE status = %s
+            ORDER BY rating DESC, review_count DESC
+        """,
+        'params': ('active',),
+        'index': ('experts', 'idx_status_rating', ['status', 'rating DESC', 'review_count DESC'])
+    },
+    {
+        'name': '看板报名状态分组统计',
+        'sql': """
+            SELECT contest_id, status, COUNT(*) AS count
+            FROM contest_registrations
+            WHERE contest_id IN (%s)
+            GROUP BY contest_id, status
+        """,
+        'params': (1,),
+        'sample': 'SELECT contest_id FROM contest_registrations LIMIT 1',
+        'index': ('contest_registrations', 'idx_contest_status', ['contest_id', 'status'])
+    },
+    {
+        'name': '看板团队状态分组统计',
+        'sql': """
+            SELECT contest_id, status, COUNT(*) AS count
+            FROM contest_teams
+            WHERE contest_id IN (%s)
+            GROUP BY contest_id, status
+        """,
+        'params': (1,),
+        'sample': 'SELECT contest_id FROM contest_teams LIMIT 1',
+        'index': ('contest_teams', 'idx_contest_status', ['contest_id', 'status'])
+    },
+]
+
+
+def _column_name(column):
+    return column.split()[0]
+
+
+def existing_indexes(cursor, table):
+    """
+    表上已有索引：{索引名: [列名...]}（按索引内顺序）
+    """
+    cursor.execute(f'SHOW INDEX FROM {table}')
+    indexes = {}
+    for row in cursor.fetchall():
+        indexes.setdefault(row['Key_name'], []).append((row['Seq_in_index'], row['Column_name']))
+    return {name: [column for _, column in sorted(columns)] for name, columns in indexes.items()}
+
+
+def has_matching_index(cursor, table, columns):
+    """
+    是否已有以这些列为前缀的索引
+    """
+    wanted = [_column_name(column) for column in columns]
+    for indexed_columns in existing_indexes(cursor, table).values():
+        if indexed_columns[:len(wanted)] == wanted:
+            return True
+    return False
+
+
+def explain(cursor, template):
+    """
+    对单个模板执行 EXPLAIN，返回执行计划行和发现的问题
+    """
+    params = template['params']
+    if template.get('sample'):
+        cursor.execute(template['sample'])
+        row = cursor.fetchone()
+        if row:
+            params = tuple(row.values())
+
+    cursor.execute('EXPLAIN ' + template['sql'], params)
+    plan = cursor.fetchall()
+
+    issues = []
+    for row in plan:
+        extra = row.get('Extra') or ''
+        if row.get('type') == 'ALL':
+            issues.append(f"{row['table']}: 全表扫描（约 {row.get('rows')} 行）")
+        elif row.get('type') == 'index':
+            issues.append(f"{row['table']}: 全索引扫描（约 {row.get('rows')} 行）")
+        if 'Using filesort' in extra:
+            issues.append(f"{row['table']}: Using filesort")
+        if 'Using temporary' in extra:
+            issues.append(f"{row['table']}: Using temporary")
+    return plan, issues
+
+
+def analyze():
+    """
+    分析所有查询模板，返回报告列表
+    每项为 {'name', 'issues', 'plan', 'missing_index'}；missing_index 为需要新增的 (表, 索引名, 列)
+    """
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+
+    report = []
+    try:
+        cursor = connection.cursor()
+        for template in QUERY_TEMPLATES:
+            plan, issues = explain(cursor, template)
+            missing_index = None
+            index = template.get('index')
+            if index and not has_matching_index(cursor, index[0], index[2]):
+                missing_index = index
+            report.append({
+                'name': template['name'],
+                'issues': issues,
+                'plan': plan,
+                'missing_index': missing_index
+            })
+        cursor.close()
+    finally:
+        connection.close()
+    return report
+
+
+def migration_sql(missing_indexes):
+    """
+    生成在线加索引的迁移SQL
+    """
+    lines = ['-- 由 index_advisor.py 生成：为热点查询补充复合索引（在线DDL，不阻塞读写）', '']
+    for table, index_name, columns in missing_indexes:
+        lines.append(
+            f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)}), "
+            f"ALGORITHM=INPLACE, LOCK=NONE;"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def emit_migration(report):
+    """
+    把报告中缺失的索引写成新的迁移文件，没有缺失索引时返回 None
+    """
+    from migrate import new_migration
+
+    missing = []
+    for item in report:
+        if item['missing_index'] and item['missing_index'] not in missing:
+            missing.append(item['missing_index'])
+    if not missing:
+        return None
+
+    path = new_migration('add_query_indexes')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(migration_sql(missing))
+    return path
+
+
+def print_report(report):
+    for item in report:
+        mark = '⚠️ ' if item['issues'] or item['missing_index'] else '✅'
+        print(f"\n{mark} {item['name']}")
+        for row in item['plan']:
+            print(f"   {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                  f"rows={row.get('rows')} extra={row.get('Extra') or ''}")
+        for issue in item['issues']:
+            print(f"   - {issue}")
+        if item['missing_index']:
+            table, index_name, columns = item['missing_index']
+            print(f"   + 建议索引: {table}.{index_name} ({', '.join(columns)})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='查询索引分析')
+    parser.add_argument('--emit-migration', action='store_true', help='把缺失索引写成迁移文件')
+    args = parser.parse_args()
+
+    analysis = analyze()
+    print_report(analysis)
+
+    if args.emit_migration:
+        migration_path = emit_migration(analysis)
+        print(f"\n✅ 已生成迁移 {migration_path}" if migration_path else "\n✅ 没有需要新增的索引")
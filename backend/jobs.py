@@ -0,0 +1,418 @@
+"""
+后台任务
+冲突检测、批量审核、批量公示等耗时的管理操作可以登记为 jobs 表中的一条任务，接口立即返回任务ID，
+由独立的 worker 进程池执行，前端通过 GET /api/jobs/<id> 查询进度。不依赖额外的消息队列服务。
+
+领取任务使用 SELECT ... FOR UPDATE SKIP LOCKED，多个 worker 进程之间不会重复领取也不会互相等待；
+执行期间由心跳线程定期更新 heartbeat_at，心跳超时的任务视为执行进程已退出，重新排队。
+任务失败后按指数退避（5s、10s、20s ...，最长 5 分钟）重新排队，执行 max_attempts 次仍失败时标记为 failed。
+任务处理函数需要可以安全重复执行。
+
+用法:
+    python jobs.py worker [--processes 2] [--poll 1.0]   启动 worker 进程池
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+
+import certificates
+import conflicts
+import dashboard
+import fanout
+from database import get_connection
+from http_cache import bump_versions
+from registrations import review_registrations
+
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 30
+# running 状态超过该秒数没有心跳的任务视为执行进程已退出
+STALE_AFTER = 120
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+APPROVE_CHUNK_SIZE = 500
+PUBLISH_CHUNK_SIZE = 1000
+
+# 任务类型 -> 处理函数
+_HANDLERS = {}
+
+
+def job(job_type):
+    """
+    注册任务处理函数：handler(payload, ctx)，返回值作为任务结果保存
+    """
+    def decorator(func):
+        _HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def parse_async(value):
+    """
+    解析 async 查询参数 / 请求体字段
+    """
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+
+def enqueue(job_type, payload, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    登记一个后台任务，返回任务ID
+    """
+    if job_type not in _HANDLERS:
+        raise ValueError(f'不支持的任务类型: {job_type}')
+
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO jobs (job_type, payload, max_attempts) VALUES (%s, %s, %s)
+        """, (job_type, json.dumps(payload, ensure_ascii=False), max_attempts))
+        connection.commit()
+        job_id = cursor.lastrowid
+        cursor.close()
+        return job_id
+    finally:
+        connection.close()
+
+
+def _load_json(value):
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def get_job(job_id):
+    """
+    读取任务记录，附带完成百分比
+    """
+    connection = get_connection()
+    if not connection:
+        raise RuntimeError('数据库连接失败')
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SELECT * FROM jobs WHERE id = %s', (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        connection.close()
+
+    if row:
+        for key, value in row.items():
+            if isinstance(value, datetime):
+                row[key] = value.isoformat()
+        row['payload'] = _load_json(row['payload'])
+        row['result'] = _load_json(row['result'])
+        if row['progress_total']:
+            row['progress'] = round(row['progress_done'] * 100.0 / row['progress_total'], 2)
+        else:
+            row['progress'] = 100.0 if row['status'] == 'succeeded' else 0.0
+    return row
+
+
+class JobContext:
+    """
+    传给任务处理函数的上下文：数据库连接和进度上报
+    """
+
+    def __init__(self, job_row, connection, cursor):
+        self.job_id = job_row['id']
+        self.attempt = job_row['attempts']
+        self.connection = connection
+        self.cursor = cursor
+
+    def progress(self, done, total=None):
+        """
+        更新进度（自行提交，调用前应先提交业务事务）
+        """
+        if total is None:
+            self.cursor.execute("""
+                UPDATE jobs SET progress_done = %s, heartbeat_at = NOW() WHERE id = %s
+            """, (done, self.job_id))
+        else:
+            self.cursor.execute("""
+                UPDATE jobs SET progress_done = %s, progress_total = %s, heartbeat_at = NOW() WHERE id = %s
+            """, (done, total, self.job_id))
+        self.connection.commit()
+
+
+def _reap(connection, cursor):
+    """
+    心跳超时的任务重新排队（次数用完时标记失败）
+    """
+    cursor.execute("""
+        UPDATE jobs
+        SET finished_at = IF(attempts >= max_attempts, NOW(), NULL),
+            status = IF(attempts >= max_attempts, 'failed', 'queued'),
+            error_message = '执行进程超时未响应',
+            locked_by = NULL
+        WHERE status = 'running' AND heartbeat_at < NOW() - INTERVAL %s SECOND
+    """, (STALE_AFTER,))
+    connection.commit()
+
+
+def _claim(connection, cursor, worker_name):
+    """
+    领取一个到期的排队任务，返回任务行或 None
+    """
+    connection.begin()
+    cursor.execute("""
+        SELECT id FROM jobs
+        WHERE status = 'queued' AND run_after <= NOW()
+        ORDER BY id LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    """)
+    row = cursor.fetchone()
+    if not row:
+        connection.commit()
+        return None
+    cursor.execute("""
+        UPDATE jobs
+        SET status = 'running', attempts = attempts + 1, locked_by = %s,
+            heartbeat_at = NOW(), started_at = COALESCE(started_at, NOW())
+        WHERE id = %s
+    """, (worker_name, row['id']))
+    cursor.execute('SELECT * FROM jobs WHERE id = %s', (row['id'],))
+    claimed = cursor.fetchone()
+    connection.commit()
+    return claimed
+
+
+def _heartbeat(job_id, stop):
+    """
+    任务执行期间定期更新心跳（单独的连接，不受任务事务影响）
+    """
+    connection = get_connection()
+    if not connection:
+        return
+    try:
+        cursor = connection.cursor()
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            cursor.execute("""
+                UPDATE jobs SET heartbeat_at = NOW() WHERE id = %s AND status = 'running'
+            """, (job_id,))
+            connection.commit()
+        cursor.close()
+    except Exception as e:
+        print(f"后台任务 {job_id} 心跳错误: {e}")
+    finally:
+        connection.close()
+
+
+def _retry_delay(attempts):
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def execute(job_row, connection, cursor):
+    """
+    执行一个已领取的任务并记录结果或失败
+    """
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_row['id'], stop), daemon=True)
+    beat.start()
+    try:
+        handler = _HANDLERS.get(job_row['job_type'])
+        if handler is None:
+            raise ValueError(f"不支持的任务类型: {job_row['job_type']}")
+        result = handler(_load_json(job_row['payload']) or {}, JobContext(job_row, connection, cursor))
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'succeeded', result = %s, error_message = NULL,
+                finished_at = NOW(), locked_by = NULL
+            WHERE id = %s
+        """, (json.dumps(result, ensure_ascii=False, default=str), job_row['id']))
+        connection.commit()
+        return True
+    except Exception as e:
+        connection.rollback()
+        print(f"后台任务 {job_row['id']}（{job_row['job_type']}）第 {job_row['attempts']} 次执行错误: {e}")
+        cursor.execute("""
+            UPDATE jobs
+            SET finished_at = IF(attempts >= max_attempts, NOW(), NULL),
+                status = IF(attempts >= max_attempts, 'failed', 'queued'),
+                run_after = NOW() + INTERVAL %s SECOND,
+                error_message = %s,
+                locked_by = NULL
+            WHERE id = %s
+        """, (_retry_delay(job_row['attempts']), str(e), job_row['id']))
+        connection.commit()
+        return False
+    finally:
+        stop.set()
+
+
+def work(poll=POLL_INTERVAL, stop=None):
+    """
+    worker 主循环：反复领取并执行任务，没有任务时等待 poll 秒
+    """
+    worker_name = f'{socket.gethostname()}:{os.getpid()}'
+    stop = stop or threading.Event()
+    # 启动本进程的扇出线程，定期处理待执行的通知扇出（包括 Web 进程重启前遗留的任务）
+    fanout.wake()
+    while not stop.is_set():
+        connection = get_connection()
+        if not connection:
+            print("后台任务: 数据库连接失败")
+            stop.wait(poll)
+            continue
+        cursor = connection.cursor()
+        try:
+            _reap(connection, cursor)
+            while not stop.is_set():
+                job_row = _claim(connection, cursor, worker_name)
+                if not job_row:
+                    break
+                execute(job_row, connection, cursor)
+        except Exception as e:
+            print(f"后台任务 worker 错误: {e}")
+        finally:
+            cursor.close()
+            connection.close()
+        stop.wait(poll)
+
+
+def _worker_process(poll):
+    # 收到 SIGTERM 时执行完当前任务再退出
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    work(poll, stop)
+
+
+def run_workers(processes=2, poll=POLL_INTERVAL):
+    """
+    启动 worker 进程池，等待全部进程退出
+    """
+    children = [multiprocessing.Process(target=_worker_process, args=(poll,), name=f'job-worker-{index}')
+                for index in range(processes)]
+    for child in children:
+        child.start()
+
+    def shutdown(signum, frame):
+        for child in children:
+            if child.is_alive():
+                child.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for child in children:
+        child.join()
+
+
+# ==================== 任务处理函数 ====================
+
+@job('detect_conflicts')
+def _detect_conflicts(payload, ctx):
+    contest_id = payload['contest_id']
+    ctx.progress(0, 1)
+    detected = conflicts.detect_contest_conflicts(ctx.connection, ctx.cursor, contest_id)
+    if detected is None:
+        raise ValueError(f'赛事 {contest_id} 不存在')
+    ctx.progress(1)
+    return {'total_conflicts': len(detected), 'conflicts': detected}
+
+
+@job('sweep_conflicts')
+def _sweep_conflicts(payload, ctx):
+    summary = conflicts.sweep(ctx.connection, ctx.cursor, full=bool(payload.get('full')), progress=ctx.progress)
+    return summary or {'skipped': True}
+
+
+@job('detect_personnel_conflicts')
+def _detect_personnel_conflicts(payload, ctx):
+    return conflicts.detect_personnel_conflicts(ctx.connection, ctx.cursor, progress=ctx.progress)
+
+
+@job('detect_resource_conflicts')
+def _detect_resource_conflicts(payload, ctx):
+    return conflicts.detect_resource_conflicts(ctx.connection, ctx.cursor, progress=ctx.progress)
+
+
+@job('detect_capacity_conflicts')
+def _detect_capacity_conflicts(payload, ctx):
+    return conflicts.detect_capacity_conflicts(ctx.connection, ctx.cursor, progress=ctx.progress)
+
+
+@job('batch_approve_registrations')
+def _batch_approve_registrations(payload, ctx):
+    ids = payload['ids']
+    reviewer_name = payload.get('reviewer_name', '管理员')
+    ctx.progress(0, len(ids))
+    affected_rows = 0
+    # 分批审核，每批一个短事务，已审核的报名重复执行时不会再次变更
+    for start in range(0, len(ids), APPROVE_CHUNK_SIZE):
+        chunk = ids[start:start + APPROVE_CHUNK_SIZE]
+        changed, changed_tables = review_registrations(ctx.cursor, chunk, 'approved', reviewer_name)
+        ctx.connection.commit()
+        if changed:
+            affected_rows += changed
+            dashboard.mark_dirty_by(ctx.cursor, 'contest_registrations', chunk)
+            bump_versions(ctx.cursor, *changed_tables)
+            conflicts.check_capacity_by(ctx.connection, ctx.cursor, chunk)
+        ctx.progress(start + len(chunk))
+    return {'affected_rows': affected_rows}
+
+
+@job('batch_publish_results')
+def _batch_publish_results(payload, ctx):
+    contest_id = payload['contest_id']
+    cursor = ctx.cursor
+    cursor.execute("""
+        SELECT COUNT(*) AS total FROM contest_results WHERE contest_id = %s AND is_published = FALSE
+    """, (contest_id,))
+    total = cursor.fetchone()['total']
+    ctx.connection.commit()
+    ctx.progress(0, total)
+
+    affected_rows = 0
+    while True:
+        cursor.execute("""
+            UPDATE contest_results
+            SET is_published = TRUE,
+                published_at = CURRENT_TIMESTAMP
+            WHERE contest_id = %s AND is_published = FALSE
+            ORDER BY id
+            LIMIT %s
+        """, (contest_id, PUBLISH_CHUNK_SIZE))
+        changed = cursor.rowcount
+        ctx.connection.commit()
+        if not changed:
+            break
+        affected_rows += changed
+        # 先标记看板统计过期再递增版本号：看板不会在新的 ETag 下返回旧统计
+        dashboard.mark_dirty(cursor, [contest_id])
+        bump_versions(cursor, 'contest_results')
+        ctx.progress(min(affected_rows, total) if total else affected_rows)
+
+    # 通知所有报名学生和团队成员（后台扇出）
+    if affected_rows:
+        fanout.enqueue(cursor, contest_id, 'result_published', '赛事结果已公示',
+                       '赛事结果已公示，请登录系统查看获奖情况。')
+        ctx.connection.commit()
+        fanout.wake()
+    return {'affected_rows': affected_rows}
+
+
+@job('generate_certificates')
+def _generate_certificates(payload, ctx):
+    # 证书任务自带租约和水位：重试或被其他进程执行中时都可以安全调用
+    result = certificates.run_job(payload['certificate_job_id'], payload.get('workers'))
+    return {'certificate_job_id': result['id'], 'status': result['status'], 'processed': result['processed']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='后台任务')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker_parser = subparsers.add_parser('worker', help='启动 worker 进程池')
+    worker_parser.add_argument('--processes', type=int, default=2, help='worker 进程数')
+    worker_parser.add_argument('--poll', type=float, default=POLL_INTERVAL, help='没有任务时的轮询间隔（秒）')
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        print(f"🚀 启动 {args.processes} 个后台任务 worker 进程")
+        run_workers(args.processes, args.poll)
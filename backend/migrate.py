@@ -0,0 +1,265 @@
+"""
+数据库版本化迁移模块
+
+迁移文件位于 migrations/ 目录，命名为 NNNN_描述.sql，按版本号顺序执行，
+已执行的版本及文件校验和记录在 schema_version 表中。
+
+约定：
+- 已发布的迁移文件不可修改，结构变更一律新增迁移文件
+- 新增索引使用在线DDL，不阻塞读写：
+      ALTER TABLE t ADD INDEX idx_x (a, b), ALGORITHM=INPLACE, LOCK=NONE;
+- MySQL 的 DDL 会隐式提交，单个迁移文件中途失败时需要人工处理后重新执行
+
+用法:
+    python migrate.py upgrade [--target N]   执行待执行的迁移
+    python migrate.py status                 查看当前版本和待执行迁移
+    python migrate.py verify                 校验已执行迁移的文件是否被修改、是否有遗漏
+    python migrate.py new <描述>             新建空白迁移文件
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+
+import pymysql
+from pymysql import Error
+
+from database import DB_CONFIG, DATABASE_NAME
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_([\w\-]+)\.sql$')
+
+CREATE_SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY COMMENT '迁移版本号',
+    name VARCHAR(255) NOT NULL COMMENT '迁移名称',
+    checksum CHAR(64) NOT NULL COMMENT '迁移文件SHA-256',
+    execution_ms INT COMMENT '执行耗时（毫秒）',
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据库迁移版本表'
+"""
+
+
+def load_migrations():
+    """
+    读取迁移目录，返回按版本号排序的迁移列表
+    每项为 {'version', 'name', 'path', 'checksum'}
+    """
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        path = os.path.join(MIGRATIONS_DIR, filename)
+        with open(path, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        migrations.append({
+            'version': int(match.group(1)),
+            'name': match.group(2),
+            'path': path,
+            'checksum': checksum
+        })
+
+    versions = [m['version'] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError('迁移目录中存在重复的版本号')
+    return migrations
+
+
+def latest_version():
+    """
+    迁移文件中的最新版本号
+    """
+    migrations = load_migrations()
+    return migrations[-1]['version'] if migrations else 0
+
+
+def split_statements(sql):
+    """
+    按分号拆分SQL语句，忽略引号内的分号和 -- 注释
+    """
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            current.append(ch)
+            if ch == '\\' and i + 1 < len(sql):
+                current.append(sql[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ('"', "'", '`'):
+            quote = ch
+            current.append(ch)
+        elif ch == '-' and sql.startswith('--', i):
+            newline = sql.find('\n', i)
+            i = len(sql) if newline == -1 else newline
+            continue
+        elif ch == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _server_connection():
+    """
+    连接MySQL服务器并确保业务数据库和 schema_version 表存在
+    """
+    connection = pymysql.connect(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG['port'],
+        charset=DB_CONFIG['charset'],
+        cursorclass=DB_CONFIG['cursorclass']
+    )
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DATABASE_NAME} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cursor.execute(f"USE {DATABASE_NAME}")
+    cursor.execute(CREATE_SCHEMA_VERSION_TABLE)
+    cursor.close()
+    return connection
+
+
+def applied_migrations(cursor):
+    """
+    已执行的迁移：{version: row}
+    """
+    cursor.execute('SELECT version, name, checksum, applied_at FROM schema_version ORDER BY version')
+    return {row['version']: row for row in cursor.fetchall()}
+
+
+def apply_migrations(target=None):
+    """
+    按顺序执行所有待执行的迁移（可指定目标版本），返回本次执行的版本号列表
+    """
+    connection = _server_connection()
+    cursor = connection.cursor()
+    executed = []
+    try:
+        applied = applied_migrations(cursor)
+        for migration in load_migrations():
+            if migration['version'] in applied:
+                continue
+            if target is not None and migration['version'] > target:
+                break
+
+            with open(migration['path'], encoding='utf-8') as f:
+                statements = split_statements(f.read())
+
+            started = time.perf_counter()
+            for statement in statements:
+                cursor.execute(statement)
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+
+            cursor.execute("""
+                INSERT INTO schema_version (version, name, checksum, execution_ms)
+                VALUES (%s, %s, %s, %s)
+            """, (migration['version'], migration['name'], migration['checksum'], elapsed_ms))
+            connection.commit()
+            executed.append(migration['version'])
+            print(f"✅ 迁移 {migration['version']:04d}_{migration['name']} 已执行 ({elapsed_ms} ms)")
+    finally:
+        cursor.close()
+        connection.close()
+    return executed
+
+
+def verify():
+    """
+    校验数据库与迁移文件是否一致，返回问题列表（为空表示一致）
+    """
+    connection = _server_connection()
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+        connection.close()
+
+    problems = []
+    files = {m['version']: m for m in load_migrations()}
+    for version, row in applied.items():
+        migration = files.get(version)
+        if not migration:
+            problems.append(f"版本 {version:04d} 已执行，但迁移文件不存在")
+        elif migration['checksum'] != row['checksum']:
+            problems.append(f"版本 {version:04d}_{migration['name']} 执行后文件被修改")
+    for version, migration in files.items():
+        if version not in applied:
+            problems.append(f"版本 {version:04d}_{migration['name']} 尚未执行")
+    return problems
+
+
+def status():
+    connection = _server_connection()
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+        connection.close()
+
+    current = max(applied) if applied else 0
+    print(f"当前数据库版本: {current:04d}  最新迁移版本: {latest_version():04d}")
+    for migration in load_migrations():
+        mark = '✅' if migration['version'] in applied else '⏳'
+        print(f"   {mark} {migration['version']:04d}_{migration['name']}")
+
+
+def new_migration(description):
+    """
+    创建下一个版本号的空白迁移文件，返回文件路径
+    """
+    slug = re.sub(r'[^\w\-]+', '_', description.strip()).strip('_') or 'migration'
+    path = os.path.join(MIGRATIONS_DIR, f"{latest_version() + 1:04d}_{slug}.sql")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"-- {description}\n\n")
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    upgrade_parser = subparsers.add_parser('upgrade', help='执行待执行的迁移')
+    upgrade_parser.add_argument('--target', type=int, default=None)
+    subparsers.add_parser('status', help='查看迁移状态')
+    subparsers.add_parser('verify', help='校验迁移一致性')
+    new_parser = subparsers.add_parser('new', help='新建迁移文件')
+    new_parser.add_argument('description')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'upgrade':
+            done = apply_migrations(args.target)
+            print(f"✅ 共执行 {len(done)} 个迁移" if done else "✅ 数据库已是最新版本")
+        elif args.command == 'status':
+            status()
+        elif args.command == 'verify':
+            issues = verify()
+            for issue in issues:
+                print(f"❌ {issue}")
+            if issues:
+                raise SystemExit(1)
+            print("✅ 迁移校验通过")
+        else:
+            print(f"✅ 已创建 {new_migration(args.description)}")
+    except Error as e:
+        print(f"❌ 迁移失败: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,9 @@
+-- 由 index_advisor.py 生成：为热点查询补充复合索引（在线DDL，不阻塞读写）
+
+ALTER TABLE contest_registrations ADD INDEX idx_status_applied_at (status, applied_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE judge_assignments ADD INDEX idx_contest_status_created (contest_id, status, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE contest_results ADD INDEX idx_contest_ranking_score (contest_id, ranking, final_score DESC), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE team_members ADD INDEX idx_student_team (student_id, team_id), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE contest_teams ADD INDEX idx_contest_created (contest_id, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE contest_conflicts ADD INDEX idx_contest_severity_detected (contest_id, severity DESC, detected_time DESC), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE experts ADD INDEX idx_status_rating (status, rating DESC, review_count DESC), ALGORITHM=INPLACE, LOCK=NONE;
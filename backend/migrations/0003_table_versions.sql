@@ -0,0 +1,19 @@
+-- 数据版本计数表：写接口提交后递增对应表的版本号，读接口据此生成 ETag / Last-Modified
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY COMMENT '表名',
+    version BIGINT NOT NULL DEFAULT 0 COMMENT '版本号',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '最后修改时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据版本表';
+
+INSERT IGNORE INTO table_versions (table_name) VALUES
+    ('contests'),
+    ('contest_teams'),
+    ('contest_registrations'),
+    ('contest_results'),
+    ('contest_conflicts'),
+    ('contest_reviews'),
+    ('contest_notifications'),
+    ('experts'),
+    ('judge_assignments'),
+    ('students');
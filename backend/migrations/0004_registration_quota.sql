@@ -0,0 +1,28 @@
+-- 报名名额与去重
+-- contests.registration_count 为已接收报名数的计数器，报名接口用条件 UPDATE 原子占用名额
+-- contest_registrations 按 (contest_id, student_id) 唯一；加唯一键前先删除重复报名，只保留最早的一条。
+-- 被删除的报名原样复制到 contest_registrations_duplicates（另加 removed_at），可核对后人工恢复
+
+ALTER TABLE contests
+    ADD COLUMN registration_quota INT NULL COMMENT '报名名额上限（为空表示不限）' AFTER registration_end,
+    ADD COLUMN registration_count INT NOT NULL DEFAULT 0 COMMENT '已接收报名数' AFTER registration_quota;
+
+CREATE TABLE IF NOT EXISTS contest_registrations_duplicates LIKE contest_registrations;
+
+ALTER TABLE contest_registrations_duplicates
+    ADD COLUMN removed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '去重删除时间';
+
+INSERT IGNORE INTO contest_registrations_duplicates
+SELECT r1.*, CURRENT_TIMESTAMP FROM contest_registrations r1
+WHERE EXISTS (
+    SELECT 1 FROM contest_registrations r2
+    WHERE r2.contest_id = r1.contest_id AND r2.student_id = r1.student_id AND r2.id < r1.id
+);
+
+DELETE r1 FROM contest_registrations r1
+JOIN contest_registrations_duplicates d ON d.id = r1.id;
+
+ALTER TABLE contest_registrations ADD UNIQUE KEY uk_contest_student (contest_id, student_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+UPDATE contests c
+SET registration_count = (SELECT COUNT(*) FROM contest_registrations r WHERE r.contest_id = c.id);
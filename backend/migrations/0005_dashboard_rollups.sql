@@ -0,0 +1,15 @@
+-- 赛事看板统计缓存
+-- 写接口在业务事务提交之后递增 version 标记赛事统计已过期；看板读取时若 computed_version < version 则重新聚合该赛事
+
+CREATE TABLE IF NOT EXISTS contest_dashboard_rollups (
+    contest_id INT PRIMARY KEY COMMENT '赛事ID',
+    version BIGINT NOT NULL DEFAULT 0 COMMENT '统计相关数据的变更计数',
+    computed_version BIGINT NOT NULL DEFAULT -1 COMMENT '当前统计结果对应的变更计数',
+    stats JSON NULL COMMENT '统计结果',
+    refreshed_at TIMESTAMP NULL COMMENT '统计时间',
+    FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='赛事看板统计缓存表';
+
+-- 分组统计只需扫描索引
+ALTER TABLE contest_registrations ADD INDEX idx_contest_status (contest_id, status), ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE contest_teams ADD INDEX idx_contest_status (contest_id, status), ALGORITHM=INPLACE, LOCK=NONE;
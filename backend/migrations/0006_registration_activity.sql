@@ -0,0 +1,13 @@
+-- 报名活动按分钟分桶的计数表
+-- 报名提交、审核通过、驳回在各自的写事务中累加对应分钟桶；小时/天等粗粒度由查询时按桶聚合
+-- 历史数据用 python activity.py backfill 重建
+
+CREATE TABLE IF NOT EXISTS registration_activity (
+    contest_id INT NOT NULL COMMENT '赛事ID',
+    bucket_start DATETIME NOT NULL COMMENT '分钟桶起始时间',
+    submitted INT NOT NULL DEFAULT 0 COMMENT '提交报名数',
+    approved INT NOT NULL DEFAULT 0 COMMENT '审核通过数',
+    rejected INT NOT NULL DEFAULT 0 COMMENT '驳回数',
+    PRIMARY KEY (contest_id, bucket_start),
+    FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='报名活动分桶统计表';
@@ -0,0 +1,19 @@
+-- 冷热分离：已完成 / 已归档赛事的报名、通知、冲突、审核记录由 archive.py 分批移入 *_archive 冷表
+-- 冷表与热表结构相同（INSERT INTO x_archive SELECT * FROM x），之后修改热表结构的迁移须同步修改冷表
+
+ALTER TABLE contests ADD COLUMN archived_at TIMESTAMP NULL COMMENT '明细数据归档时间' AFTER status;
+
+CREATE TABLE IF NOT EXISTS contest_registrations_archive LIKE contest_registrations;
+CREATE TABLE IF NOT EXISTS contest_notifications_archive LIKE contest_notifications;
+CREATE TABLE IF NOT EXISTS contest_conflicts_archive LIKE contest_conflicts;
+CREATE TABLE IF NOT EXISTS contest_reviews_archive LIKE contest_reviews;
+
+-- CREATE TABLE ... LIKE 不复制外键，删除赛事时冷表数据同样级联删除
+ALTER TABLE contest_registrations_archive
+    ADD CONSTRAINT fk_registrations_archive_contest FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE;
+ALTER TABLE contest_notifications_archive
+    ADD CONSTRAINT fk_notifications_archive_contest FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE;
+ALTER TABLE contest_conflicts_archive
+    ADD CONSTRAINT fk_conflicts_archive_contest FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE;
+ALTER TABLE contest_reviews_archive
+    ADD CONSTRAINT fk_reviews_archive_contest FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE;
@@ -0,0 +1,32 @@
+-- 赛事事件通知扇出：一条事件记录由后台分批展开为每个报名学生 / 团队成员一条通知
+-- last_recipient 为已发送到的学号水位，与该批通知在同一事务中更新，中断后从水位继续
+
+CREATE TABLE IF NOT EXISTS notification_fanouts (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    contest_id INT NOT NULL COMMENT '赛事ID',
+    notification_type VARCHAR(32) NOT NULL COMMENT '通知类型',
+    title VARCHAR(255) NOT NULL COMMENT '通知标题',
+    content TEXT COMMENT '通知内容',
+    status ENUM('pending', 'running', 'completed', 'failed') DEFAULT 'pending' COMMENT '状态',
+    last_recipient VARCHAR(100) NOT NULL DEFAULT '' COMMENT '已发送到的学号（按学号升序）',
+    sent_count INT NOT NULL DEFAULT 0 COMMENT '已发送通知数',
+    attempts INT NOT NULL DEFAULT 0 COMMENT '执行次数',
+    error_message TEXT COMMENT '错误信息',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    started_at TIMESTAMP NULL COMMENT '开始时间',
+    heartbeat_at TIMESTAMP NULL COMMENT '最近一批完成时间',
+    finished_at TIMESTAMP NULL COMMENT '完成时间',
+    FOREIGN KEY (contest_id) REFERENCES contests(id) ON DELETE CASCADE,
+    INDEX idx_status_created (status, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='通知扇出任务表';
+
+-- 新增通知类型（在 ENUM 末尾追加取值为在线操作；冷表同步修改）
+ALTER TABLE contest_notifications MODIFY notification_type
+    ENUM('status_change', 'conflict_alert', 'review_result', 'system', 'schedule_change', 'result_published')
+    DEFAULT 'system' COMMENT '通知类型', ALGORITHM=INPLACE, LOCK=NONE;
+ALTER TABLE contest_notifications_archive MODIFY notification_type
+    ENUM('status_change', 'conflict_alert', 'review_result', 'system', 'schedule_change', 'result_published')
+    DEFAULT 'system' COMMENT '通知类型', ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 扇出按 (赛事, 学号) 范围扫描团队队长
+ALTER TABLE contest_teams ADD INDEX idx_contest_captain (contest_id, captain_student_id), ALGORITHM=INPLACE, LOCK=NONE;
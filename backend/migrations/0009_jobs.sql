@@ -0,0 +1,23 @@
+-- 后台任务表：耗时的管理操作（冲突检测、批量审核、批量公示等）登记为任务，由 python jobs.py worker 进程池执行
+-- 任务按 run_after 排队，失败后指数退避重试，超过 max_attempts 次标记为 failed
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    job_type VARCHAR(64) NOT NULL COMMENT '任务类型',
+    payload JSON COMMENT '任务参数',
+    status ENUM('queued', 'running', 'succeeded', 'failed') DEFAULT 'queued' COMMENT '任务状态',
+    attempts INT NOT NULL DEFAULT 0 COMMENT '已执行次数',
+    max_attempts INT NOT NULL DEFAULT 3 COMMENT '最多执行次数',
+    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '最早执行时间（重试退避）',
+    locked_by VARCHAR(100) COMMENT '执行进程',
+    heartbeat_at TIMESTAMP NULL COMMENT '执行进程最近心跳',
+    progress_done INT NOT NULL DEFAULT 0 COMMENT '已完成数',
+    progress_total INT NOT NULL DEFAULT 0 COMMENT '总数',
+    result JSON COMMENT '执行结果',
+    error_message TEXT COMMENT '最近一次失败原因',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    started_at TIMESTAMP NULL COMMENT '首次开始时间',
+    finished_at TIMESTAMP NULL COMMENT '完成时间',
+    INDEX idx_status_run_after (status, run_after),
+    INDEX idx_status_heartbeat (status, heartbeat_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='后台任务表';
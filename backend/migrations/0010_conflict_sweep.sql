@@ -0,0 +1,20 @@
+-- 增量冲突巡检：记录上次巡检的水位，只重新检测此后修改过的赛事（及其时间重叠的赛事）
+-- 场地增加 updated_at，场地修改也会触发所属赛事重新检测
+
+CREATE TABLE IF NOT EXISTS conflict_sweep_state (
+    id TINYINT PRIMARY KEY COMMENT '固定为 1',
+    last_swept_at DATETIME NOT NULL COMMENT '上次巡检开始时的数据库时间（水位）',
+    last_finished_at DATETIME COMMENT '上次巡检完成时间',
+    contests_checked INT NOT NULL DEFAULT 0 COMMENT '上次巡检检测的赛事数',
+    conflicts_added INT NOT NULL DEFAULT 0 COMMENT '上次巡检新增的冲突数',
+    conflicts_resolved INT NOT NULL DEFAULT 0 COMMENT '上次巡检自动解决的冲突数'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='冲突巡检水位表';
+
+ALTER TABLE contest_venues
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间';
+ALTER TABLE contest_venues ADD INDEX idx_updated_at (updated_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE contests ADD INDEX idx_updated_at (updated_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 赛事修改后查找把它记为冲突对象的其他赛事
+ALTER TABLE contest_conflicts ADD INDEX idx_with_resolved (conflict_with_id, is_resolved), ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,15 @@
+-- 共享设备库存：各赛事的 contest_equipment 按设备名称与库存对应，时间重叠的赛事合计需求超过库存时记为 resource 冲突
+
+CREATE TABLE IF NOT EXISTS equipment_inventory (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(255) NOT NULL COMMENT '设备名称（与 contest_equipment.name 对应）',
+    total_quantity INT NOT NULL DEFAULT 0 COMMENT '库存总数',
+    description VARCHAR(500) COMMENT '说明',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='设备库存表';
+
+ALTER TABLE contest_equipment ADD INDEX idx_name_contest (name, contest_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+INSERT IGNORE INTO table_versions (table_name) VALUES ('equipment_inventory');
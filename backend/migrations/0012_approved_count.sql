@@ -0,0 +1,8 @@
+-- 场地容量校验：contests.approved_count 为已通过报名数的计数器，由审核事务增量维护，
+-- 与赛事场地总容量比较时不需要统计报名表
+
+ALTER TABLE contests
+    ADD COLUMN approved_count INT NOT NULL DEFAULT 0 COMMENT '已通过报名数' AFTER registration_count;
+
+UPDATE contests c
+SET approved_count = (SELECT COUNT(*) FROM contest_registrations r WHERE r.contest_id = c.id AND r.status = 'approved');
@@ -0,0 +1,24 @@
+-- 场地智能分配：共享场地池 venues，赛事登记预计人数和所需设施，分配结果写回 contest_venues（venue_id 指向场地池）
+
+CREATE TABLE IF NOT EXISTS venues (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(255) NOT NULL COMMENT '场地名称',
+    capacity INT NOT NULL COMMENT '容纳人数',
+    address VARCHAR(500) COMMENT '详细地址',
+    facilities JSON COMMENT '设施标签',
+    status ENUM('active', 'inactive') DEFAULT 'active' COMMENT '状态（停用的场地不参与分配）',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_name (name),
+    INDEX idx_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='场地池表';
+
+ALTER TABLE contests
+    ADD COLUMN expected_headcount INT NULL COMMENT '预计参赛人数（为空时按报名名额 / 已通过人数）' AFTER approved_count,
+    ADD COLUMN required_facilities JSON NULL COMMENT '场地所需设施标签' AFTER expected_headcount;
+
+ALTER TABLE contest_venues
+    ADD COLUMN venue_id INT NULL COMMENT '场地池中的场地（智能分配写入）' AFTER contest_id;
+ALTER TABLE contest_venues ADD INDEX idx_venue_id (venue_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+INSERT IGNORE INTO table_versions (table_name) VALUES ('venues');
@@ -0,0 +1,6 @@
+-- 证书任务租约：执行进程领取任务时写入 locked_by 并定期更新 heartbeat_at，
+-- 同一任务只有一个执行进程；心跳超时（执行进程被 kill）的 running 任务可以被重新领取
+
+ALTER TABLE certificate_jobs
+    ADD COLUMN locked_by VARCHAR(100) NULL COMMENT '执行进程（主机名:进程号）' AFTER output_path,
+    ADD COLUMN heartbeat_at TIMESTAMP NULL COMMENT '最近一次心跳' AFTER locked_by;
@@ -0,0 +1,7 @@
+-- 冲突超出量：设备冲突为峰值需求超出库存的数量，场地容量冲突为已通过人数超出容量的人数；
+-- 冲突仍然存在时随每次检测更新。冷表同步修改（归档使用 INSERT ... SELECT *，列顺序必须一致）
+
+ALTER TABLE contest_conflicts
+    ADD COLUMN over_allocation INT NULL COMMENT '超出数量（设备 / 场地容量冲突）' AFTER severity;
+ALTER TABLE contest_conflicts_archive
+    ADD COLUMN over_allocation INT NULL COMMENT '超出数量（设备 / 场地容量冲突）' AFTER severity;
@@ -0,0 +1,76 @@
+"""
+列表接口字段投影
+通过 ?fields=a,b,c 指定返回的列，只允许白名单中的列；不传时使用列表页默认列（不含大文本字段），
+?fields=* 返回白名单中的全部列。
+"""
+
+# 每张表：all 为允许选择的列，exclude_by_default 为列表页默认不返回的列，required 为接口处理逻辑依赖、总会返回的列
+TABLE_FIELDS = {
+    'contests': {
+        'all': ['id', 'name', 'type', 'start_date', 'end_date', 'registration_start', 'registration_end',
+                'registration_quota', 'registration_count', 'expected_headcount', 'required_facilities',
+                'location', 'online_mode', 'first_prize', 'second_prize', 'third_prize', 'certificate',
+                'scholarship', 'rules', 'status', 'archived_at', 'created_at', 'updated_at'],
+        'exclude_by_default': ['rules'],
+        'required': ['id']
+    },
+    'contest_registrations': {
+        'all': ['id', 'contest_id', 'student_name', 'student_id', 'email', 'phone', 'major', 'grade',
+                'class_name', 'team_name', 'team_role', 'skills', 'experience', 'motivation', 'status',
+                'reject_reason', 'applied_at', 'reviewed_at', 'reviewer_name'],
+        'exclude_by_default': ['experience', 'motivation'],
+        'required': ['id']
+    },
+    'experts': {
+        'all': ['id', 'name', 'title', 'organization', 'field', 'email', 'phone', 'expertise', 'experience',
+                'rating', 'review_count', 'status', 'bio', 'created_at', 'updated_at'],
+        'exclude_by_default': ['bio'],
+        'required': ['id']
+    },
+    'contest_teams': {
+        'all': ['id', 'contest_id', 'name', 'captain_name', 'captain_student_id', 'captain_major',
+                'max_members', 'member_count', 'status', 'skills', 'achievements', 'created_at', 'updated_at'],
+        'exclude_by_default': [],
+        'required': ['id']
+    },
+    'contest_results': {
+        'all': ['id', 'contest_id', 'team_name', 'student_name', 'student_id', 'award_level', 'final_score',
+                'ranking', 'certificate_number', 'remarks', 'is_published', 'published_at', 'created_at'],
+        'exclude_by_default': ['remarks'],
+        'required': ['id']
+    },
+    'students': {
+        'all': ['id', 'student_id', 'name', 'email', 'phone', 'major', 'grade', 'class_name', 'gpa',
+                'skills', 'achievements', 'avatar', 'created_at', 'updated_at'],
+        'exclude_by_default': [],
+        'required': ['id', 'student_id']
+    },
+}
+
+
+def resolve_fields(table, fields=None):
+    """
+    解析 fields 参数，返回列名列表（按表定义顺序）
+    不在白名单中的字段抛出 ValueError
+    """
+    spec = TABLE_FIELDS[table]
+    if not fields:
+        wanted = [column for column in spec['all'] if column not in spec['exclude_by_default']]
+    elif fields.strip() == '*':
+        wanted = list(spec['all'])
+    else:
+        requested = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = requested - set(spec['all'])
+        if unknown:
+            raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+        wanted = [column for column in spec['all'] if column in requested or column in spec['required']]
+    return wanted
+
+
+def select_columns(table, alias=None, fields=None):
+    """
+    生成 SELECT 列清单，例如 select_columns('contest_registrations', 'r') -> 'r.id, r.contest_id, ...'
+    列名全部来自白名单，可以直接拼接进SQL
+    """
+    prefix = f'{alias}.' if alias else ''
+    return ', '.join(f'{prefix}{column}' for column in resolve_fields(table, fields))
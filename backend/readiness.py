@@ -0,0 +1,124 @@
+"""
+就绪检查
+汇总本实例能否继续接收流量：数据库往返延迟（SELECT 1，结果缓存 PROBE_CACHE_SECONDS 秒，探测请求很便宜）、
+连接池取连接耗时、准入控制的并发占用、写后队列积压、熔断器状态。任一指标超过阈值时 ready 为 False，
+GET /api/ready 返回 503，负载均衡据此摘除实例；GET /api/health?deep=1 返回同样的报告。
+"""
+import os
+import threading
+import time
+
+import admission
+from database import breaker_states, get_connection, pool_stats
+from write_behind import queue_stats
+
+PROBE_CACHE_SECONDS = float(os.environ.get('READY_CACHE_SECONDS', 2))
+
+# 阈值
+MAX_DB_LATENCY_MS = float(os.environ.get('READY_MAX_DB_LATENCY_MS', 250))
+MAX_POOL_WAIT_MS = float(os.environ.get('READY_MAX_POOL_WAIT_MS', 500))
+# 读 / 写类别的并发占用比例（heavy 并发上限很小，满载是常态，不参与判断）
+MAX_UTILIZATION = float(os.environ.get('READY_MAX_UTILIZATION', 0.9))
+# 写后队列积压占容量的比例
+MAX_QUEUE_FILL = float(os.environ.get('READY_MAX_QUEUE_FILL', 0.8))
+
+_probe = {'checked_at': None, 'result': None}
+_probe_lock = threading.Lock()
+
+
+def _measure():
+    connection = get_connection(primary=True)
+    if not connection:
+        return {'ok': False, 'error': '数据库连接失败'}
+    cursor = connection.cursor()
+    try:
+        started = time.perf_counter()
+        cursor.execute('SELECT 1')
+        cursor.fetchall()
+        latency = time.perf_counter() - started
+        # 后台任务积压（所有实例共享）
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND run_after <= NOW()) AS jobs_queued,
+                (SELECT COUNT(*) FROM notification_fanouts WHERE status IN ('pending', 'running')) AS fanouts_pending
+        """)
+        backlog = cursor.fetchone()
+        connection.commit()
+        return {'ok': True, 'latency_ms': round(latency * 1000, 2), **backlog}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def probe_database():
+    """
+    返回缓存的数据库探测结果；过期时由一个线程重新探测，其他线程继续使用旧结果
+    """
+    now = time.monotonic()
+    if _probe['result'] is not None and now - _probe['checked_at'] < PROBE_CACHE_SECONDS:
+        return _probe['result'], now - _probe['checked_at']
+    if not _probe_lock.acquire(blocking=_probe['result'] is None):
+        return _probe['result'], now - _probe['checked_at']
+    try:
+        if _probe['result'] is None or time.monotonic() - _probe['checked_at'] >= PROBE_CACHE_SECONDS:
+            _probe['result'] = _measure()
+            _probe['checked_at'] = time.monotonic()
+    finally:
+        _probe_lock.release()
+    return _probe['result'], time.monotonic() - _probe['checked_at']
+
+
+def report():
+    """
+    就绪报告：{'ready', 'reasons', 'database', 'pool', 'admission', 'queues', 'breakers'}
+    """
+    reasons = []
+
+    database, age = probe_database()
+    database = dict(database, checked_seconds_ago=round(age, 3))
+    if not database['ok']:
+        reasons.append(f"数据库不可用: {database['error']}")
+    elif database['latency_ms'] > MAX_DB_LATENCY_MS:
+        reasons.append(f"数据库延迟 {database['latency_ms']}ms 超过 {MAX_DB_LATENCY_MS:g}ms")
+
+    breakers = breaker_states()
+    if breakers['primary'] != 'closed':
+        reasons.append(f"主库熔断器 {breakers['primary']}")
+
+    pools = pool_stats()
+    pool = {snapshot['target']: {key: snapshot[key] for key in ('in_use', 'idle', 'wait_avg_ms', 'wait_max_ms')}
+            for snapshot in [pools['primary']] + pools['replicas']}
+    if pool['primary']['wait_avg_ms'] > MAX_POOL_WAIT_MS:
+        reasons.append(f"取连接平均耗时 {pool['primary']['wait_avg_ms']}ms 超过 {MAX_POOL_WAIT_MS:g}ms")
+
+    classes = admission.snapshot()['classes']
+    utilization = {}
+    for name, limiter in classes.items():
+        utilization[name] = {
+            'in_flight': limiter['in_flight'],
+            'limit': limiter['limit'],
+            'waiting': limiter['waiting'],
+            'utilization': round(limiter['in_flight'] / limiter['limit'], 3) if limiter['limit'] else 0,
+            'avg_wait_ms': limiter['avg_wait_ms']
+        }
+        if name != 'heavy' and utilization[name]['utilization'] >= MAX_UTILIZATION and limiter['waiting']:
+            reasons.append(f"{name} 并发已满（{limiter['in_flight']}/{limiter['limit']}，排队 {limiter['waiting']}）")
+
+    queues = {'write_behind': queue_stats(),
+              'jobs_queued': database.get('jobs_queued'),
+              'fanouts_pending': database.get('fanouts_pending')}
+    for write_queue in queues['write_behind']:
+        if write_queue['capacity'] and write_queue['depth'] / write_queue['capacity'] >= MAX_QUEUE_FILL:
+            reasons.append(f"写队列 {write_queue['name']} 积压 {write_queue['depth']}/{write_queue['capacity']}")
+
+    return {
+        'ready': not reasons,
+        'reasons': reasons,
+        'database': database,
+        'pool': pool,
+        'admission': utilization,
+        'queues': queues,
+        'breakers': breakers
+    }
@@ -0,0 +1,222 @@
+"""
+报名提交写入
+报名通过写后队列分组提交：一批报名在同一个事务中逐条处理（每条一个 SAVEPOINT），最后只提交一次，
+把每条报名一次事务提交的开销摊到整批上。调用方通过 PendingWrite.wait() 拿到每条报名的处理结果。
+
+单条报名的数据错误只回滚到该条的 SAVEPOINT；死锁、锁等待超时、连接断开等会回滚整个事务的错误属于整批失败：
+死锁时整批重试，其他情况整批报错，不会出现前面的报名已返回成功、实际却随事务回滚的情况。
+"""
+import json
+
+import pymysql
+
+import activity
+import dashboard
+from write_behind import WriteBehindQueue
+
+# 单条报名的处理结果
+REGISTRATION_OK = 'ok'
+REGISTRATION_DUPLICATE = 'duplicate'
+REGISTRATION_NO_CONTEST = 'no_contest'
+REGISTRATION_CLOSED = 'closed'
+REGISTRATION_FULL = 'full'
+
+# 死锁时整批重试的次数
+BATCH_RETRIES = 2
+# 1213: 死锁  1205: 锁等待超时
+_DEADLOCK_ERRORS = (1213, 1205)
+
+REGISTRATION_COLUMNS = ['contest_id', 'student_name', 'student_id', 'email', 'phone', 'major', 'grade',
+                        'class_name', 'team_name', 'team_role', 'skills', 'experience', 'motivation']
+
+
+def build_registration(contest_id, data):
+    """
+    从请求数据构造待写入的报名字典
+    """
+    return {
+        'contest_id': contest_id,
+        'student_name': data.get('student_name'),
+        'student_id': data.get('student_id'),
+        'email': data.get('email'),
+        'phone': data.get('phone'),
+        'major': data.get('major'),
+        'grade': data.get('grade'),
+        'class_name': data.get('class_name'),
+        'team_name': data.get('team_name'),
+        'team_role': data.get('team_role'),
+        'skills': json.dumps(data.get('skills', []), ensure_ascii=False),
+        'experience': data.get('experience'),
+        'motivation': data.get('motivation')
+    }
+
+
+def _insert_one(cursor, registration):
+    """
+    在当前事务中写入一条报名并占用名额，返回 (结果, 报名ID)
+    先用条件 UPDATE 原子占用名额，再插入报名（唯一键去重），失败时回滚到该条的 SAVEPOINT。
+    先插入再 UPDATE 时，外键检查对赛事行加的共享锁会在并发事务升级为排他锁时互相死锁，因此先 UPDATE。
+    计数器变化不更新 contests.updated_at，冲突巡检只关注赛事信息的修改。
+    """
+    # 重复报名直接返回，不占用赛事行锁；并发的重复提交由唯一键兜底
+    cursor.execute("""
+        SELECT id FROM contest_registrations WHERE contest_id = %s AND student_id = %s
+    """, (registration['contest_id'], registration['student_id']))
+    if cursor.fetchone():
+        return REGISTRATION_DUPLICATE, None
+
+    cursor.execute('SAVEPOINT registration')
+    cursor.execute("""
+        UPDATE contests
+        SET registration_count = registration_count + 1, updated_at = updated_at
+        WHERE id = %s
+          AND (registration_start IS NULL OR registration_start <= NOW())
+          AND (registration_end IS NULL OR registration_end >= NOW())
+          AND (registration_quota IS NULL OR registration_count < registration_quota)
+    """, (registration['contest_id'],))
+
+    if cursor.rowcount == 0:
+        cursor.execute('ROLLBACK TO SAVEPOINT registration')
+        # 只在失败路径上查询具体原因
+        cursor.execute("""
+            SELECT registration_start <= NOW() AS started,
+                   registration_end >= NOW() AS not_ended
+            FROM contests WHERE id = %s
+        """, (registration['contest_id'],))
+        contest = cursor.fetchone()
+        if not contest:
+            return REGISTRATION_NO_CONTEST, None
+        if contest['started'] == 0 or contest['not_ended'] == 0:
+            return REGISTRATION_CLOSED, None
+        return REGISTRATION_FULL, None
+
+    try:
+        cursor.execute(
+            f"INSERT INTO contest_registrations ({', '.join(REGISTRATION_COLUMNS)}) "
+            f"VALUES ({', '.join(['%s'] * len(REGISTRATION_COLUMNS))})",
+            [registration[column] for column in REGISTRATION_COLUMNS]
+        )
+    except pymysql.err.IntegrityError as e:
+        # 1062: 重复报名（占用的名额随 SAVEPOINT 一起回滚）
+        if e.args[0] != 1062:
+            raise
+        cursor.execute('ROLLBACK TO SAVEPOINT registration')
+        return REGISTRATION_DUPLICATE, None
+
+    registration_id = cursor.lastrowid
+    cursor.execute('RELEASE SAVEPOINT registration')
+    return REGISTRATION_OK, registration_id
+
+
+def _is_transaction_error(error):
+    """
+    会使整个事务失效的错误（死锁、锁等待超时、连接断开等），不能只回滚到 SAVEPOINT
+    """
+    return isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
+
+
+def _write_batch(connection, cursor, registrations):
+    connection.begin()
+    # 按赛事ID顺序一次锁定本批涉及的赛事行，并发的批次按相同顺序加锁，避免交叉死锁
+    contest_ids = sorted({registration['contest_id'] for registration in registrations})
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    cursor.execute(f'SELECT id FROM contests WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE', contest_ids)
+    cursor.fetchall()
+
+    results = []
+    for registration in registrations:
+        try:
+            results.append(_insert_one(cursor, registration))
+        except Exception as e:
+            if _is_transaction_error(e):
+                raise
+            try:
+                cursor.execute('ROLLBACK TO SAVEPOINT registration')
+            except pymysql.err.OperationalError as rollback_error:
+                # 1305: 出错时还没有建立 SAVEPOINT，本条没有写入任何数据
+                if rollback_error.args[0] != 1305:
+                    raise
+            results.append(e)
+    accepted = [registration['contest_id'] for registration, result in zip(registrations, results)
+                if not isinstance(result, Exception) and result[0] == REGISTRATION_OK]
+    activity.record(cursor, 'submitted', accepted)
+    connection.commit()
+    return results, accepted
+
+
+def write_registrations(connection, cursor, registrations):
+    """
+    写后队列的 writer：一批报名一个事务
+    事务级错误时回滚整批：死锁重试整批，其他错误抛出，由写队列把整批标记为失败
+    """
+    for attempt in range(BATCH_RETRIES + 1):
+        try:
+            results, accepted = _write_batch(connection, cursor, registrations)
+            break
+        except Exception as e:
+            connection.rollback()
+            deadlock = isinstance(e, pymysql.err.OperationalError) and e.args[0] in _DEADLOCK_ERRORS
+            if not deadlock or attempt == BATCH_RETRIES:
+                raise
+    dashboard.mark_dirty(cursor, accepted)
+    return results
+
+
+def review_registrations(cursor, ids, status, reviewer_name, reject_reason=None):
+    """
+    在当前事务中把一组报名改为 approved / rejected，返回 (实际变更的报名数, 提交后需要递增版本号的表)
+    已经是目标状态的报名不重复处理；按赛事把本次审核数累加到报名活动分钟桶，并增量维护赛事的已通过报名数
+    （已通过报名数有变化时 contests 也在需要递增版本号的表中：赛事接口返回该计数器）
+    """
+    if not ids:
+        return 0, ()
+    placeholders = ','.join(['%s'] * len(ids))
+    # 锁定将要变更的报名，统计结果与随后的 UPDATE 一致
+    cursor.execute(f"""
+        SELECT contest_id, status, COUNT(*) AS count
+        FROM contest_registrations
+        WHERE id IN ({placeholders}) AND status != %s
+        GROUP BY contest_id, status
+        FOR UPDATE
+    """, list(ids) + [status])
+    counts = {}
+    approved_delta = {}
+    for row in cursor.fetchall():
+        counts[row['contest_id']] = counts.get(row['contest_id'], 0) + row['count']
+        if status == 'approved':
+            approved_delta[row['contest_id']] = approved_delta.get(row['contest_id'], 0) + row['count']
+        elif row['status'] == 'approved':
+            approved_delta[row['contest_id']] = approved_delta.get(row['contest_id'], 0) - row['count']
+    if not counts:
+        return 0, ()
+
+    cursor.execute(f"""
+        UPDATE contest_registrations
+        SET status = %s,
+            reject_reason = %s,
+            reviewed_at = CURRENT_TIMESTAMP,
+            reviewer_name = %s
+        WHERE id IN ({placeholders}) AND status != %s
+    """, [status, reject_reason, reviewer_name] + list(ids) + [status])
+    affected_rows = cursor.rowcount
+
+    # 按赛事ID顺序更新计数器，避免并发审核交叉加锁死锁；计数器变化不更新 updated_at（不触发冲突巡检）
+    cursor.executemany("""
+        UPDATE contests SET approved_count = approved_count + %s, updated_at = updated_at WHERE id = %s
+    """, [(approved_delta[contest_id], contest_id) for contest_id in sorted(approved_delta)
+          if approved_delta[contest_id]])
+    activity.record(cursor, status, counts)
+    if any(approved_delta.values()):
+        return affected_rows, ('contest_registrations', 'contests')
+    return affected_rows, ('contest_registrations',)
+
+
+# 报名写入队列：调用方需要等待确认才能告诉学生报名结果
+# 报名同时递增 contests.registration_count，赛事接口返回该计数器，两张表的版本号都要递增
+registration_queue = WriteBehindQueue(
+    'registrations',
+    write_registrations,
+    bump_tables=('contest_registrations', 'contests'),
+    max_batch=200,
+    flush_interval=0.005
+)
@@ -0,0 +1,164 @@
+"""
+团队成员变更：加入、退出、移除、转队
+成员数通过条件 UPDATE 原子维护（加入时 member_count < max_members），不对整个团队加锁读-改-写。
+所有函数都在调用方的事务中执行，由调用方提交或回滚。
+
+加锁顺序：先对 contest_teams 行执行条件 UPDATE（行级排他锁），再写 team_members。
+若先插入成员，外键检查会对团队行加共享锁，两个并发事务随后都要升级为排他锁，会互相死锁。
+"""
+import pymysql
+
+# 处理结果
+TEAM_OK = 'ok'
+TEAM_NOT_FOUND = 'not_found'
+TEAM_DISBANDED = 'disbanded'
+TEAM_FULL = 'full'
+TEAM_DUPLICATE = 'duplicate'
+TEAM_NOT_MEMBER = 'not_member'
+TEAM_CAPTAIN = 'captain'
+TEAM_SAME_TEAM = 'same_team'
+TEAM_OTHER_CONTEST = 'other_contest'
+
+# 处理结果 -> (HTTP状态码, 提示信息)
+TEAM_ERROR_RESPONSES = {
+    TEAM_NOT_FOUND: (404, '团队不存在'),
+    TEAM_DISBANDED: (409, '团队已解散'),
+    TEAM_FULL: (409, '团队人数已满'),
+    TEAM_DUPLICATE: (409, '该学生已在团队中'),
+    TEAM_NOT_MEMBER: (404, '该学生不是团队成员'),
+    TEAM_CAPTAIN: (400, '队长不能退出团队，请先解散团队'),
+    TEAM_SAME_TEAM: (400, '目标团队与当前团队相同'),
+    TEAM_OTHER_CONTEST: (400, '只能转入同一赛事的团队'),
+}
+
+
+def _claim_slot(cursor, team_id, student_id, contest_id=None):
+    """
+    条件 UPDATE 占用一个名额，失败时返回具体原因，成功返回 TEAM_OK
+    队长本人也计入 member_count 但不在 team_members 中，因此同时排除队长学号
+    """
+    sql = """
+        UPDATE contest_teams
+        SET member_count = member_count + 1
+        WHERE id = %s
+          AND status != 'disbanded'
+          AND member_count < max_members
+          AND captain_student_id != %s
+    """
+    params = [team_id, student_id]
+    if contest_id is not None:
+        sql += ' AND contest_id = %s'
+        params.append(contest_id)
+    cursor.execute(sql, params)
+    if cursor.rowcount == 1:
+        return TEAM_OK
+
+    # 只在失败路径上查询具体原因
+    cursor.execute("""
+        SELECT contest_id, status, member_count, max_members, captain_student_id
+        FROM contest_teams WHERE id = %s
+    """, (team_id,))
+    team = cursor.fetchone()
+    if not team:
+        return TEAM_NOT_FOUND
+    if contest_id is not None and team['contest_id'] != contest_id:
+        return TEAM_OTHER_CONTEST
+    if team['status'] == 'disbanded':
+        return TEAM_DISBANDED
+    if team['captain_student_id'] == student_id:
+        return TEAM_DUPLICATE
+    return TEAM_FULL
+
+
+def _release_slot(cursor, team_id):
+    cursor.execute("""
+        UPDATE contest_teams
+        SET member_count = member_count - 1
+        WHERE id = %s AND member_count > 1
+    """, (team_id,))
+
+
+def _insert_member(cursor, team_id, member):
+    """
+    写入成员行，学生已在团队中时返回 (TEAM_DUPLICATE, None)
+    """
+    try:
+        cursor.execute("""
+            INSERT INTO team_members (team_id, student_name, student_id, major, role)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (team_id, member['student_name'], member['student_id'], member.get('major'),
+              member.get('role') or '队员'))
+    except pymysql.err.IntegrityError as e:
+        if e.args[0] == 1062:
+            return TEAM_DUPLICATE, None
+        raise
+    return TEAM_OK, cursor.lastrowid
+
+
+def join_team(cursor, team_id, member):
+    """
+    加入团队，返回 (结果, 成员ID)；结果不是 TEAM_OK 时调用方需回滚事务
+    """
+    status = _claim_slot(cursor, team_id, member['student_id'])
+    if status != TEAM_OK:
+        return status, None
+    return _insert_member(cursor, team_id, member)
+
+
+def remove_member(cursor, team_id, member_id=None, student_id=None):
+    """
+    按成员ID或学号移除成员，只有确实删除了成员行才减少成员数
+    """
+    if member_id is not None:
+        cursor.execute('DELETE FROM team_members WHERE id = %s AND team_id = %s', (member_id, team_id))
+    else:
+        cursor.execute('DELETE FROM team_members WHERE team_id = %s AND student_id = %s', (team_id, student_id))
+
+    if cursor.rowcount == 0:
+        if student_id is not None:
+            cursor.execute('SELECT captain_student_id FROM contest_teams WHERE id = %s', (team_id,))
+            team = cursor.fetchone()
+            if not team:
+                return TEAM_NOT_FOUND
+            if team['captain_student_id'] == student_id:
+                return TEAM_CAPTAIN
+        return TEAM_NOT_MEMBER
+
+    _release_slot(cursor, team_id)
+    return TEAM_OK
+
+
+def transfer_member(cursor, from_team_id, to_team_id, student_id, role=None):
+    """
+    把成员从一个团队转到同一赛事的另一个团队，返回 (结果, 新成员ID)
+    两个团队的成员数按团队ID升序更新，保证并发的相向转队加锁顺序一致、不会死锁
+    """
+    if from_team_id == to_team_id:
+        return TEAM_SAME_TEAM, None
+
+    cursor.execute("""
+        SELECT m.id, m.student_name, m.student_id, m.major, m.role, t.contest_id
+        FROM team_members m
+        JOIN contest_teams t ON m.team_id = t.id
+        WHERE m.team_id = %s AND m.student_id = %s
+    """, (from_team_id, student_id))
+    member = cursor.fetchone()
+    if not member:
+        return TEAM_NOT_MEMBER, None
+
+    cursor.execute('DELETE FROM team_members WHERE id = %s', (member['id'],))
+    if cursor.rowcount == 0:
+        # 并发退出
+        return TEAM_NOT_MEMBER, None
+
+    for team_id in sorted((from_team_id, to_team_id)):
+        if team_id == to_team_id:
+            status = _claim_slot(cursor, to_team_id, student_id, member['contest_id'])
+            if status != TEAM_OK:
+                return status, None
+        else:
+            _release_slot(cursor, from_team_id)
+
+    if role:
+        member['role'] = role
+    return _insert_member(cursor, to_team_id, member)
@@ -0,0 +1,372 @@
+"""
+场地智能分配
+从共享场地池（venues）为一组赛事分配场地：时间重叠的赛事不共用场地，场地容量不小于预计人数并具备所需设施，
+在此基础上尽量多分配赛事，并使浪费的容量（场地容量 - 预计人数）之和最小。
+
+算法：
+1. 贪心区间着色：赛事按开始时间排序，依次放入当时空闲、满足要求的容量最小的场地（best fit）
+2. 局部搜索改进，直到没有改进或超过时间上限：
+   - 插入：未分配的赛事尝试挪走占用候选场地的少量赛事（挪到其他空闲场地）后放入
+   - 迁移：已分配的赛事迁移到当时空闲、容量更小的场地
+每个场地的占用时间段按开始时间有序保存，空闲判断和查找冲突赛事都是二分查找。
+只分配部分赛事时，其他赛事已写入 contest_venues 的场地占用作为固定时间段预先放入日历，局部搜索不会挪动它们。
+
+用法:
+    python venue_allocation.py plan [--contest ID ...] [--time-limit 2] [--apply]
+"""
+import argparse
+import json
+import time
+from bisect import bisect_right, insort
+
+from database import get_connection
+from http_cache import bump_versions
+
+DEFAULT_TIME_LIMIT = 2.0
+# 插入未分配赛事时最多挪走的赛事数
+MAX_EJECT = 2
+
+# 默认参与分配的赛事：未驳回、未结束、设置了起止时间的线下赛事
+_CONTESTS = """
+    SELECT id, name, start_date, end_date,
+           COALESCE(expected_headcount, registration_quota, approved_count) AS headcount,
+           required_facilities
+    FROM contests
+    WHERE online_mode = FALSE AND start_date IS NOT NULL AND end_date IS NOT NULL {contest_filter}
+    ORDER BY start_date, id
+"""
+
+
+def _facilities(value):
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    return frozenset(str(item).strip() for item in (value or []) if str(item).strip())
+
+
+class _Calendar:
+    """
+    单个场地的占用时间段（按开始时间有序；起止时间都包含在内）
+    本次分配的时间段互不重叠，未参与分配的固定占用之间可能重叠（改期不会重新分配场地）
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.bookings = []
+        # max_ends[i]：前 i + 1 个时间段的最晚结束时间，时间段重叠时结束时间不再与开始时间同序
+        self.max_ends = []
+
+    def blockers(self, start, end, ignore=None):
+        # 从最后一个开始时间 <= end 的时间段向前找，直到之前的时间段都在 start 之前结束
+        blocking = []
+        index = bisect_right(self.starts, end) - 1
+        while index >= 0 and self.max_ends[index] >= start:
+            booking = self.bookings[index]
+            if booking[1] >= start and booking[2] != ignore:
+                blocking.append(booking[2])
+            index -= 1
+        return blocking
+
+    def is_free(self, start, end, ignore=None):
+        return not self.blockers(start, end, ignore)
+
+    def add(self, start, end, contest_id):
+        booking = (start, end, contest_id)
+        insort(self.bookings, booking)
+        index = self.bookings.index(booking)
+        self.starts.insert(index, start)
+        self.max_ends.insert(index, end)
+        self._update_max_ends(index)
+
+    def remove(self, start, end, contest_id):
+        index = self.bookings.index((start, end, contest_id))
+        del self.bookings[index]
+        del self.starts[index]
+        del self.max_ends[index]
+        self._update_max_ends(index)
+
+    def _update_max_ends(self, index):
+        latest = self.max_ends[index - 1] if index > 0 else None
+        for position in range(index, len(self.bookings)):
+            end = self.bookings[position][1]
+            latest = end if latest is None else max(latest, end)
+            self.max_ends[position] = latest
+
+
+class _Plan:
+    def __init__(self, venues, contests, fixed=()):
+        self.venues = {venue['id']: venue for venue in venues}
+        self.contests = {contest['id']: contest for contest in contests}
+        self.calendars = {venue['id']: _Calendar() for venue in venues}
+        self.assigned = {}
+        # 不参与本次分配的赛事的场地占用
+        self.fixed = set()
+        for booking in fixed:
+            if booking['venue_id'] in self.calendars and booking['contest_id'] not in self.contests:
+                self.calendars[booking['venue_id']].add(booking['start_date'], booking['end_date'],
+                                                        booking['contest_id'])
+                self.fixed.add(booking['contest_id'])
+        # 每个赛事满足容量和设施要求的场地，按浪费的容量从小到大
+        self.candidates = {}
+        for contest in contests:
+            fits = [venue for venue in venues
+                    if venue['capacity'] >= contest['headcount'] and contest['facilities'] <= venue['facilities']]
+            fits.sort(key=lambda venue: (venue['capacity'], venue['id']))
+            self.candidates[contest['id']] = [venue['id'] for venue in fits]
+
+    def waste(self, contest_id, venue_id):
+        return self.venues[venue_id]['capacity'] - self.contests[contest_id]['headcount']
+
+    def total_waste(self):
+        return sum(self.waste(contest_id, venue_id) for contest_id, venue_id in self.assigned.items())
+
+    def free(self, contest_id, venue_id):
+        contest = self.contests[contest_id]
+        return self.calendars[venue_id].is_free(contest['start_date'], contest['end_date'], ignore=contest_id)
+
+    def place(self, contest_id, venue_id):
+        contest = self.contests[contest_id]
+        self.calendars[venue_id].add(contest['start_date'], contest['end_date'], contest_id)
+        self.assigned[contest_id] = venue_id
+
+    def unplace(self, contest_id):
+        contest = self.contests[contest_id]
+        venue_id = self.assigned.pop(contest_id)
+        self.calendars[venue_id].remove(contest['start_date'], contest['end_date'], contest_id)
+        return venue_id
+
+    def greedy(self):
+        order = sorted(self.contests.values(), key=lambda contest: (contest['start_date'], -contest['headcount'],
+                                                                    contest['id']))
+        for contest in order:
+            for venue_id in self.candidates[contest['id']]:
+                if self.free(contest['id'], venue_id):
+                    self.place(contest['id'], venue_id)
+                    break
+
+    def _relocate_elsewhere(self, contest_id, exclude):
+        for venue_id in self.candidates[contest_id]:
+            if venue_id != exclude and self.free(contest_id, venue_id):
+                self.place(contest_id, venue_id)
+                return True
+        return False
+
+    def try_insert(self, contest_id):
+        """
+        把未分配的赛事放入某个候选场地，必要时把占用该场地的赛事挪到其他空闲场地
+        """
+        contest = self.contests[contest_id]
+        for venue_id in self.candidates[contest_id]:
+            blocking = self.calendars[venue_id].blockers(contest['start_date'], contest['end_date'])
+            if not blocking:
+                self.place(contest_id, venue_id)
+                return True
+            if len(blocking) > MAX_EJECT or self.fixed.intersection(blocking):
+                continue
+            for other in blocking:
+                self.unplace(other)
+            self.place(contest_id, venue_id)
+            moved = []
+            for other in blocking:
+                if not self._relocate_elsewhere(other, venue_id):
+                    break
+                moved.append(other)
+            if len(moved) == len(blocking):
+                return True
+            # 回退
+            for other in moved:
+                self.unplace(other)
+            self.unplace(contest_id)
+            for other in blocking:
+                self.place(other, venue_id)
+        return False
+
+    def try_shrink(self, contest_id):
+        """
+        把已分配的赛事迁移到当时空闲、容量更小的场地
+        """
+        current = self.assigned[contest_id]
+        for venue_id in self.candidates[contest_id]:
+            if self.venues[venue_id]['capacity'] >= self.venues[current]['capacity']:
+                return False
+            if self.free(contest_id, venue_id):
+                self.unplace(contest_id)
+                self.place(contest_id, venue_id)
+                return True
+        return False
+
+    def improve(self, deadline):
+        rounds = 0
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = False
+            rounds += 1
+            for contest_id in sorted(self.contests):
+                if time.monotonic() >= deadline:
+                    break
+                if contest_id not in self.assigned:
+                    if self.candidates[contest_id] and self.try_insert(contest_id):
+                        improved = True
+                elif self.try_shrink(contest_id):
+                    improved = True
+        return rounds
+
+
+def plan(venues, contests, time_limit=DEFAULT_TIME_LIMIT, fixed=()):
+    """
+    计算分配方案
+    venues: [{'id', 'name', 'capacity', 'facilities'}]，contests: [{'id', 'name', 'start_date', 'end_date',
+    'headcount', 'facilities'}]（facilities 为设施标签集合），
+    fixed: 其他赛事的场地占用 [{'contest_id', 'venue_id', 'start_date', 'end_date'}]
+    """
+    started = time.monotonic()
+    allocation = _Plan(venues, contests, fixed)
+    allocation.greedy()
+    greedy_assigned = len(allocation.assigned)
+    greedy_waste = allocation.total_waste()
+    rounds = allocation.improve(started + time_limit)
+
+    assignments = []
+    unassigned = []
+    for contest_id in sorted(allocation.contests):
+        contest = allocation.contests[contest_id]
+        if contest_id in allocation.assigned:
+            venue = allocation.venues[allocation.assigned[contest_id]]
+            assignments.append({
+                'contest_id': contest_id,
+                'contest_name': contest['name'],
+                'venue_id': venue['id'],
+                'venue_name': venue['name'],
+                'headcount': contest['headcount'],
+                'capacity': venue['capacity'],
+                'waste': venue['capacity'] - contest['headcount']
+            })
+        else:
+            unassigned.append({
+                'contest_id': contest_id,
+                'contest_name': contest['name'],
+                'headcount': contest['headcount'],
+                'reason': '时间重叠的赛事已占满可用场地' if allocation.candidates[contest_id]
+                          else '没有满足容量和设施要求的场地'
+            })
+
+    return {
+        'assignments': assignments,
+        'unassigned': unassigned,
+        'total_waste': allocation.total_waste(),
+        'greedy': {'assigned': greedy_assigned, 'waste': greedy_waste},
+        'rounds': rounds,
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+    }
+
+
+def load_venues(cursor):
+    """
+    读取参与分配的场地（启用状态）
+    """
+    cursor.execute("SELECT id, name, capacity, address, facilities FROM venues WHERE status = 'active'")
+    venues = cursor.fetchall()
+    for venue in venues:
+        venue['facilities'] = _facilities(venue['facilities'])
+    return venues
+
+
+def load_contests(cursor, contest_ids=None):
+    """
+    读取参与分配的赛事；contest_ids 为空时取全部未驳回、未结束的线下赛事
+    """
+    if contest_ids:
+        placeholders = ','.join(['%s'] * len(contest_ids))
+        cursor.execute(_CONTESTS.format(contest_filter=f'AND id IN ({placeholders})'), list(contest_ids))
+    else:
+        cursor.execute(_CONTESTS.format(
+            contest_filter="AND status NOT IN ('rejected', 'completed', 'archived') AND end_date >= NOW()"
+        ))
+    contests = cursor.fetchall()
+    for contest in contests:
+        contest['headcount'] = int(contest['headcount'] or 0)
+        contest['facilities'] = _facilities(contest.pop('required_facilities'))
+    return contests
+
+
+def load_fixed_bookings(cursor, contests):
+    """
+    读取与待分配赛事时间重叠、但不参与本次分配的赛事在场地池中的占用（已驳回的赛事除外）
+    """
+    if not contests:
+        return []
+    contest_ids = [contest['id'] for contest in contests]
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    cursor.execute(f"""
+        SELECT cv.contest_id, cv.venue_id, c.start_date, c.end_date
+        FROM contest_venues cv
+        JOIN contests c ON c.id = cv.contest_id
+        WHERE cv.venue_id IS NOT NULL
+          AND c.status != 'rejected' AND c.start_date IS NOT NULL AND c.end_date IS NOT NULL
+          AND c.start_date <= %s AND c.end_date >= %s
+          AND cv.contest_id NOT IN ({placeholders})
+        ORDER BY c.start_date, cv.contest_id
+    """, [max(contest['end_date'] for contest in contests), min(contest['start_date'] for contest in contests)]
+        + contest_ids)
+    return cursor.fetchall()
+
+
+def apply_plan(connection, cursor, assignments, venues):
+    """
+    把分配结果写回 contest_venues：已分配的赛事的场地替换为场地池中的场地，返回写入的赛事ID
+    """
+    by_id = {venue['id']: venue for venue in venues}
+    contest_ids = sorted(assignment['contest_id'] for assignment in assignments)
+    if not contest_ids:
+        return []
+    connection.begin()
+    placeholders = ','.join(['%s'] * len(contest_ids))
+    cursor.execute(f'DELETE FROM contest_venues WHERE contest_id IN ({placeholders})', contest_ids)
+    rows = []
+    for assignment in sorted(assignments, key=lambda item: item['contest_id']):
+        venue = by_id[assignment['venue_id']]
+        rows.append((assignment['contest_id'], venue['id'], venue['name'], venue['capacity'], venue['address'],
+                     json.dumps(sorted(venue['facilities']), ensure_ascii=False)))
+    cursor.executemany("""
+        INSERT INTO contest_venues (contest_id, venue_id, name, capacity, address, facilities)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, rows)
+    connection.commit()
+    bump_versions(cursor, 'contests', 'contest_venues')
+    return contest_ids
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='场地智能分配')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    plan_parser = subparsers.add_parser('plan', help='计算分配方案')
+    plan_parser.add_argument('--contest', type=int, action='append', help='只分配指定赛事，可重复')
+    plan_parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT, help='局部搜索时间上限（秒）')
+    plan_parser.add_argument('--apply', action='store_true', help='把方案写回赛事场地')
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        connection = get_connection()
+        if not connection:
+            print("❌ 数据库连接失败")
+        else:
+            cursor = connection.cursor()
+            try:
+                venues = load_venues(cursor)
+                contests = load_contests(cursor, args.contest)
+                fixed = load_fixed_bookings(cursor, contests)
+                result = plan(venues, contests, args.time_limit, fixed)
+                connection.commit()
+                for assignment in result['assignments']:
+                    print(f"   赛事 {assignment['contest_id']} {assignment['contest_name']} -> "
+                          f"{assignment['venue_name']}（{assignment['headcount']}/{assignment['capacity']}）")
+                for item in result['unassigned']:
+                    print(f"   ⚠️  赛事 {item['contest_id']} {item['contest_name']} 未分配：{item['reason']}")
+                print(f"✅ 分配 {len(result['assignments'])} 个赛事，未分配 {len(result['unassigned'])} 个，"
+                      f"浪费容量 {result['total_waste']}（贪心 {result['greedy']['waste']}），"
+                      f"耗时 {result['elapsed_ms']}ms")
+                if args.apply:
+                    applied = apply_plan(connection, cursor, result['assignments'], venues)
+                    print(f"✅ 已写回 {len(applied)} 个赛事的场地")
+            finally:
+                cursor.close()
+                connection.close()
@@ -0,0 +1,248 @@
+"""
+写后批量提交队列（write-behind）
+
+高频的单行 INSERT 先进入进程内有界队列，由后台线程按"攒够一批或等待超时"合并成一次批量写入并只提交一次。
+- 有界缓冲：队列满时 submit() 最多阻塞 put_timeout 秒，仍然放不进去则抛出 QueueFullError（背压）
+- 触发条件：缓冲达到 max_batch 条，或第一条进入后经过 flush_interval 秒
+- 持久化确认：submit() 返回 PendingWrite，需要确认已落库的调用方调用 wait()
+- 退出时：通过 atexit 把所有队列中剩余的数据写完
+
+默认写入方式为多行 INSERT（PyMySQL 的 executemany 会改写为一条 INSERT ... VALUES (...), (...)）；
+需要逐条校验的场景（如报名名额）可以传入自定义 writer，在一个事务中用 SAVEPOINT 逐条处理后统一提交。
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+from database import get_connection
+from http_cache import bump_versions
+
+
+class QueueFullError(Exception):
+    """写队列已满"""
+
+
+class PendingWrite:
+    """
+    单条写入的确认句柄
+    """
+    __slots__ = ('item', 'result', 'error', '_event')
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self._event = threading.Event()
+
+    def _resolve(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """
+        等待本条写入提交，返回 writer 给出的结果；写入失败时抛出对应异常，超时抛出 TimeoutError
+        """
+        if not self._event.wait(timeout):
+            raise TimeoutError('等待写入确认超时')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def insert_writer(table, columns):
+    """
+    默认 writer：多行 INSERT，一批只提交一次；整批失败时退化为逐行写入，避免一条坏数据拖累整批
+    """
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def write(connection, cursor, items):
+        try:
+            cursor.executemany(sql, items)
+            connection.commit()
+            return [None] * len(items)
+        except Exception:
+            connection.rollback()
+
+        results = []
+        for item in items:
+            try:
+                cursor.execute(sql, item)
+                connection.commit()
+                results.append(None)
+            except Exception as e:
+                connection.rollback()
+                results.append(e)
+        return results
+
+    return write
+
+
+class WriteBehindQueue:
+    """
+    写后批量提交队列
+    writer(connection, cursor, items) 负责写入并提交一批数据，返回与 items 等长的结果列表，
+    其中 Exception 实例表示该条失败（会在 PendingWrite.wait() 中抛出）
+    """
+
+    def __init__(self, name, writer, bump_tables=(), max_batch=500, flush_interval=0.02,
+                 max_buffer=20000, put_timeout=1.0):
+        self.name = name
+        self.writer = writer
+        self.bump_tables = tuple(bump_tables)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.stats = {'submitted': 0, 'written': 0, 'failed': 0, 'batches': 0}
+        _QUEUES.append(self)
+
+    def _ensure_thread(self):
+        # 后台线程按需启动；gunicorn 预加载后 fork 出的 worker 中需要重新启动
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.name}', daemon=True)
+                self._thread.start()
+
+    def submit(self, item, wait=False, timeout=None):
+        """
+        提交一条待写入数据；wait=True 时阻塞到数据提交后返回结果
+        """
+        if self._closed:
+            raise RuntimeError(f'写队列 {self.name} 已关闭')
+        self._ensure_thread()
+        pending = PendingWrite(item)
+        try:
+            self._queue.put(pending, timeout=self.put_timeout)
+        except queue.Full:
+            raise QueueFullError(f'写队列 {self.name} 已满')
+        self.stats['submitted'] += 1
+        if wait:
+            return pending.wait(timeout)
+        return pending
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                # 关闭信号：写完当前批次后退出
+                self._queue.put(None)
+                break
+            batch.append(pending)
+        return batch
+
+    def _write_batch(self, batch):
+        connection = get_connection()
+        if not connection:
+            error = RuntimeError('数据库连接失败')
+            for pending in batch:
+                pending._resolve(error=error)
+            self.stats['failed'] += len(batch)
+            return
+
+        cursor = connection.cursor()
+        try:
+            results = self.writer(connection, cursor, [pending.item for pending in batch])
+            written = 0
+            for pending, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    pending._resolve(error=result)
+                else:
+                    written += 1
+                    pending._resolve(result=result)
+            self.stats['written'] += written
+            self.stats['failed'] += len(batch) - written
+            self.stats['batches'] += 1
+            if written and self.bump_tables:
+                # 一批只递增一次数据版本号
+                bump_versions(cursor, *self.bump_tables)
+        except Exception as e:
+            # writer 抛出异常表示整批没有提交：所有等待方都收到错误
+            print(f"写队列 {self.name} 批量写入错误: {e}")
+            try:
+                connection.rollback()
+            except Exception:
+                connection.discard()
+            for pending in batch:
+                if not pending._event.is_set():
+                    pending._resolve(error=e)
+            self.stats['failed'] += len(batch)
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._write_batch(batch)
+            if self._closed and self._queue.empty():
+                return
+
+    def close(self, timeout=10.0):
+        """
+        停止接收新数据，等待队列中剩余数据写完
+        """
+        self._closed = True
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            # 队列已满放不进关闭信号：后台线程在写完一批且队列为空时也会退出
+            pass
+        self._thread.join(max(deadline - time.monotonic(), 0))
+
+
+_QUEUES = []
+
+
+def queue_stats():
+    """
+    各写队列当前积压、容量和累计写入统计
+    """
+    return [dict(write_queue.stats, name=write_queue.name, depth=write_queue.depth(),
+                 capacity=write_queue._queue.maxsize) for write_queue in _QUEUES]
+
+
+def flush_all(timeout=10.0):
+    """
+    进程退出前写完所有队列中的数据
+    """
+    for write_queue in _QUEUES:
+        write_queue.close(timeout)
+
+
+atexit.register(flush_all)
+
+
+# 通知写入队列：通知允许异步落库，调用方一般不需要等待确认
+notification_queue = WriteBehindQueue(
+    'notifications',
+    insert_writer('contest_notifications', ['contest_id', 'notification_type', 'title', 'content', 'recipient']),
+    bump_tables=('contest_notifications',)
+)
@@ -0,0 +1,7 @@
+"""
+WSGI入口 - 供生产服务器加载
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+from app import get_application
+
+application = get_application()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -24,7 +24,7 @@ const ContestArchive = () => {
   // 获取已归档赛事
   const fetchArchivedContests = async () => {
     try {
-      const response = await fetch(`${API_ENDPOINTS.CONTESTS.LIST}?status=archived`);
+      const response = await apiFetch(`${API_ENDPOINTS.CONTESTS.LIST}?status=archived`);
       const result = await response.json();
       if (result.success) {
         setArchivedContests(result.data || []);
@@ -38,7 +38,7 @@ const ContestArchive = () => {
   const fetchCompletedContests = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${API_ENDPOINTS.CONTESTS.LIST}?status=completed`);
+      const response = await apiFetch(`${API_ENDPOINTS.CONTESTS.LIST}?status=completed`);
       const result = await response.json();
       if (result.success) {
         setContests(result.data || []);
@@ -53,7 +53,7 @@ const ContestArchive = () => {
   // 归档赛事
   const handleArchiveContest = async (contestId) => {
     try {
-      const response = await fetch(`${API_ENDPOINTS.CONTESTS.DETAIL(contestId)}`, {
+      const response = await apiFetch(`${API_ENDPOINTS.CONTESTS.DETAIL(contestId)}`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ status: 'archived' })
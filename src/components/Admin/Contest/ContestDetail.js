@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { useParams, useNavigate } from 'react-router-dom';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -23,7 +23,7 @@ const ContestDetail = () => {
   const fetchContestDetail = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_ENDPOINTS.CONTESTS.DETAIL(id));
+      const response = await apiFetch(API_ENDPOINTS.CONTESTS.DETAIL(id));
       const result = await response.json();
       
       if (result.success) {
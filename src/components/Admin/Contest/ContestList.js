@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -24,7 +24,7 @@ const ContestList = () => {
   const fetchContests = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_ENDPOINTS.CONTESTS.LIST);
+      const response = await apiFetch(API_ENDPOINTS.CONTESTS.LIST);
       const result = await response.json();
       
       if (result.success) {
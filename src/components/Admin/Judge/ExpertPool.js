@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -25,7 +25,8 @@ const ExpertPool = () => {
   const fetchExperts = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_ENDPOINTS.EXPERTS.LIST);
+      // 专家详情需要展示个人简介，显式请求全部字段
+      const response = await apiFetch(`${API_ENDPOINTS.EXPERTS.LIST}?fields=*`);
       const result = await response.json();
       
       if (result.success) {
@@ -412,7 +413,7 @@ const AddExpertModal = ({ onClose, onSuccess }) => {
     try {
       setSubmitting(true);
       
-      const response = await fetch(API_ENDPOINTS.EXPERTS.ADD, {
+      const response = await apiFetch(API_ENDPOINTS.EXPERTS.ADD, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
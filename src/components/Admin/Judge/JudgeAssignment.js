@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -28,9 +28,9 @@ const JudgeAssignment = () => {
       
       // 并行获取数据
       const [assignmentsRes, expertsRes, contestsRes] = await Promise.all([
-        fetch(API_ENDPOINTS.JUDGE_ASSIGNMENTS.LIST),
-        fetch(API_ENDPOINTS.EXPERTS.LIST),
-        fetch(API_ENDPOINTS.CONTESTS.LIST)
+        apiFetch(API_ENDPOINTS.JUDGE_ASSIGNMENTS.LIST),
+        apiFetch(API_ENDPOINTS.EXPERTS.LIST),
+        apiFetch(API_ENDPOINTS.CONTESTS.LIST)
       ]);
 
       const [assignmentsData, expertsData, contestsData] = await Promise.all([
@@ -303,7 +303,7 @@ const AssignModal = ({ experts, contests, onClose, onSuccess }) => {
     try {
       setSubmitting(true);
       
-      const response = await fetch(API_ENDPOINTS.JUDGE_ASSIGNMENTS.ASSIGN, {
+      const response = await apiFetch(API_ENDPOINTS.JUDGE_ASSIGNMENTS.ASSIGN, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(formData)
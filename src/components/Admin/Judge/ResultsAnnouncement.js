@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -28,8 +28,8 @@ const ResultsAnnouncement = () => {
       setLoading(true);
       
       const [resultsRes, contestsRes] = await Promise.all([
-        fetch(API_ENDPOINTS.CONTEST_RESULTS.LIST),
-        fetch(API_ENDPOINTS.CONTESTS.LIST)
+        apiFetch(API_ENDPOINTS.CONTEST_RESULTS.LIST),
+        apiFetch(API_ENDPOINTS.CONTESTS.LIST)
       ]);
 
       const [resultsData, contestsData] = await Promise.all([
@@ -51,7 +51,7 @@ const ResultsAnnouncement = () => {
     if (!confirm('确定要发布这个结果吗？')) return;
 
     try {
-      const response = await fetch(API_ENDPOINTS.CONTEST_RESULTS.PUBLISH(id), {
+      const response = await apiFetch(API_ENDPOINTS.CONTEST_RESULTS.PUBLISH(id), {
         method: 'POST'
       });
       
@@ -79,7 +79,7 @@ const ResultsAnnouncement = () => {
     if (!confirm('确定要批量发布该赛事的所有未发布结果吗？')) return;
 
     try {
-      const response = await fetch(API_ENDPOINTS.CONTEST_RESULTS.BATCH_PUBLISH, {
+      const response = await apiFetch(API_ENDPOINTS.CONTEST_RESULTS.BATCH_PUBLISH, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ contest_id: filterContest })
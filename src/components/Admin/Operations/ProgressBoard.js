@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 
 /**
  * 运营管理 - 进度看板
@@ -10,8 +10,6 @@ const ProgressBoard = () => {
   const [loading, setLoading] = useState(true);
   const [dashboardData, setDashboardData] = useState({
     contests: [],
-    registrations: [],
-    teams: [],
     stats: {
       totalContests: 0,
       activeContests: 0,
@@ -30,34 +28,26 @@ const ProgressBoard = () => {
     try {
       setLoading(true);
       
-      // 并行获取所有数据
-      const [contestsRes, registrationsRes, teamsRes] = await Promise.all([
-        fetch(API_ENDPOINTS.CONTESTS.LIST),
-        fetch(API_ENDPOINTS.REGISTRATIONS.LIST),
-        fetch(API_ENDPOINTS.TEAMS.LIST)
-      ]);
-
-      const contestsData = await contestsRes.json();
-      const registrationsData = await registrationsRes.json();
-      const teamsData = await teamsRes.json();
-
-      const contests = contestsData.success ? contestsData.data : [];
-      const registrations = registrationsData.success ? registrationsData.data : [];
-      const teams = teamsData.success ? teamsData.data : [];
+      // 服务端按赛事分组聚合后的看板汇总
+      const response = await apiFetch(API_ENDPOINTS.DASHBOARD.SUMMARY);
+      const result = await response.json();
+      const summary = result.success ? result.data : { totals: null, contests: [] };
+      const contests = summary.contests;
+      const totals = summary.totals;
 
       // 计算统计数据
       const stats = {
         totalContests: contests.length,
-        activeContests: contests.filter(c => c.status === 'published' || c.status === 'ongoing').length,
-        totalRegistrations: registrations.length,
-        pendingReviews: registrations.filter(r => r.status === 'pending').length,
-        totalTeams: teams.length,
+        activeContests: contests.filter(c => c.contest_status === 'published' || c.contest_status === 'ongoing').length,
+        totalRegistrations: totals ? totals.registrations.total : 0,
+        pendingReviews: totals ? totals.registrations.pending : 0,
+        totalTeams: totals ? totals.teams.total - totals.teams.disbanded : 0,
         completionRate: contests.length > 0 
-          ? Math.round((contests.filter(c => c.status === 'completed').length / contests.length) * 100)
+          ? Math.round((contests.filter(c => c.contest_status === 'completed').length / contests.length) * 100)
           : 0
       };
 
-      setDashboardData({ contests, registrations, teams, stats });
+      setDashboardData({ contests, stats });
     } catch (error) {
       console.error('获取数据失败:', error);
     } finally {
@@ -68,15 +58,14 @@ const ProgressBoard = () => {
   // 获取赛事进度数据
   const getContestProgress = () => {
     return dashboardData.contests.map(contest => {
-      const contestRegs = dashboardData.registrations.filter(r => r.contest_id === contest.id);
-      const approvedRegs = contestRegs.filter(r => r.status === 'approved').length;
-      const totalRegs = contestRegs.length;
+      const approvedRegs = contest.registrations.approved;
+      const totalRegs = contest.registrations.total;
       const progress = totalRegs > 0 ? Math.round((approvedRegs / totalRegs) * 100) : 0;
 
       return {
-        id: contest.id,
-        name: contest.name,
-        status: contest.status,
+        id: contest.contest_id,
+        name: contest.contest_name,
+        status: contest.contest_status,
         totalRegistrations: totalRegs,
         approvedRegistrations: approvedRegs,
         progress,
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 
 /**
  * 运营管理 - 资源调配
@@ -30,7 +30,7 @@ const ResourceAllocation = () => {
   const fetchContests = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_ENDPOINTS.CONTESTS.LIST);
+      const response = await apiFetch(API_ENDPOINTS.CONTESTS.LIST);
       const result = await response.json();
       
       if (result.success && result.data.length > 0) {
@@ -46,7 +46,7 @@ const ResourceAllocation = () => {
 
   const fetchResourceData = async (contestId) => {
     try {
-      const response = await fetch(API_ENDPOINTS.CONTESTS.DETAIL(contestId));
+      const response = await apiFetch(API_ENDPOINTS.CONTESTS.DETAIL(contestId));
       const result = await response.json();
       
       if (result.success) {
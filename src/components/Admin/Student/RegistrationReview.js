@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -25,7 +25,8 @@ const RegistrationReview = () => {
   const fetchRegistrations = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_ENDPOINTS.REGISTRATIONS.LIST);
+      // 详情抽屉需要展示竞赛经验、参赛动机，显式请求全部字段
+      const response = await apiFetch(`${API_ENDPOINTS.REGISTRATIONS.LIST}?fields=*`);
       const result = await response.json();
       
       if (result.success) {
@@ -59,7 +60,7 @@ const RegistrationReview = () => {
   // 审核通过
   const handleApprove = async (id) => {
     try {
-      const response = await fetch(API_ENDPOINTS.REGISTRATIONS.APPROVE(id), {
+      const response = await apiFetch(API_ENDPOINTS.REGISTRATIONS.APPROVE(id), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ reviewer_name: '管理员' })
@@ -82,7 +83,7 @@ const RegistrationReview = () => {
   // 审核驳回
   const handleReject = async (id, reason) => {
     try {
-      const response = await fetch(API_ENDPOINTS.REGISTRATIONS.REJECT(id), {
+      const response = await apiFetch(API_ENDPOINTS.REGISTRATIONS.REJECT(id), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ 
@@ -117,7 +118,7 @@ const RegistrationReview = () => {
     }
 
     try {
-      const response = await fetch(API_ENDPOINTS.REGISTRATIONS.BATCH_APPROVE, {
+      const response = await apiFetch(API_ENDPOINTS.REGISTRATIONS.BATCH_APPROVE, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ 
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -34,7 +34,7 @@ const StudentList = () => {
       if (filterMajor !== 'all') params.append('major', filterMajor);
       if (params.toString()) url += '?' + params.toString();
       
-      const response = await fetch(url);
+      const response = await apiFetch(url);
       const result = await response.json();
       
       if (result.success) {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { API_ENDPOINTS } from '../../../config/api';
+import { API_ENDPOINTS, apiFetch } from '../../../config/api';
 import Button from '../../UI/Button';
 import Badge from '../../UI/Badge';
 
@@ -28,7 +28,7 @@ const TeamManagement = () => {
   // 获取赛事列表
   const fetchContests = async () => {
     try {
-      const response = await fetch(API_ENDPOINTS.CONTESTS.LIST);
+      const response = await apiFetch(API_ENDPOINTS.CONTESTS.LIST);
       const result = await response.json();
       if (result.success) {
         setContests(result.data || []);
@@ -43,7 +43,7 @@ const TeamManagement = () => {
     try {
       setLoading(true);
       const startTime = performance.now(); // 性能监控
-      const response = await fetch(API_ENDPOINTS.TEAMS.LIST);
+      const response = await apiFetch(API_ENDPOINTS.TEAMS.LIST);
       const result = await response.json();
       
       if (result.success) {
@@ -108,7 +108,7 @@ const TeamManagement = () => {
       danger: true,
       onConfirm: async () => {
         try {
-          const response = await fetch(API_ENDPOINTS.TEAMS.DELETE(teamId), {
+          const response = await apiFetch(API_ENDPOINTS.TEAMS.DELETE(teamId), {
             method: 'DELETE'
           });
           
@@ -142,7 +142,7 @@ const TeamManagement = () => {
       danger: true,
       onConfirm: async () => {
         try {
-          const response = await fetch(API_ENDPOINTS.TEAMS.REMOVE_MEMBER(teamId, memberId), {
+          const response = await apiFetch(API_ENDPOINTS.TEAMS.REMOVE_MEMBER(teamId, memberId), {
             method: 'DELETE'
           });
           
@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import { API_ENDPOINTS } from '../config/api';
+import { API_ENDPOINTS, apiFetch } from '../config/api';
 
 const Login = () => {
   const navigate = useNavigate();
@@ -56,7 +56,7 @@ const Login = () => {
       
       try {
         // 调用后端登录API
-        const response = await fetch(API_ENDPOINTS.AUTH.LOGIN, {
+        const response = await apiFetch(API_ENDPOINTS.AUTH.LOGIN, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
@@ -33,6 +33,15 @@ export const API_ENDPOINTS = {
   // 冲突相关
   CONFLICTS: {
     RESOLVE: (id) => `${API_BASE_URL}/api/conflicts/${id}/resolve`,
+    DETECT_PERSONNEL: `${API_BASE_URL}/api/conflicts/detect-personnel`,
+    DETECT_RESOURCES: `${API_BASE_URL}/api/conflicts/detect-resources`,
+    CHECK_CAPACITY: `${API_BASE_URL}/api/conflicts/check-capacity`,
+  },
+  
+  // 设备库存相关
+  EQUIPMENT_INVENTORY: {
+    LIST: `${API_BASE_URL}/api/equipment-inventory`,
+    SAVE: `${API_BASE_URL}/api/equipment-inventory`,
   },
   
   // 通知相关
@@ -54,6 +63,32 @@ export const API_ENDPOINTS = {
     DETAIL: (id) => `${API_BASE_URL}/api/teams/${id}`,
     DELETE: (id) => `${API_BASE_URL}/api/teams/${id}`,
     REMOVE_MEMBER: (teamId, memberId) => `${API_BASE_URL}/api/teams/${teamId}/members/${memberId}`,
+    JOIN: (id) => `${API_BASE_URL}/api/teams/${id}/members`,
+    LEAVE: (id) => `${API_BASE_URL}/api/teams/${id}/leave`,
+    TRANSFER: (id) => `${API_BASE_URL}/api/teams/${id}/transfer`,
+  },
+  
+  // 赛事看板相关
+  DASHBOARD: {
+    SUMMARY: `${API_BASE_URL}/api/dashboard/summary`,
+    CONTEST: (id) => `${API_BASE_URL}/api/contests/${id}/dashboard`,
+  },
+  
+  // 场地分配相关
+  VENUES: {
+    LIST: `${API_BASE_URL}/api/venues`,
+    SAVE: `${API_BASE_URL}/api/venues`,
+    ALLOCATE: `${API_BASE_URL}/api/venue-allocation/plan`,
+  },
+  
+  // 后台任务相关
+  JOBS: {
+    DETAIL: (id) => `${API_BASE_URL}/api/jobs/${id}`,
+  },
+  
+  // 数据库状态相关
+  DB: {
+    STATS: `${API_BASE_URL}/api/db/stats`,
   },
   
   // 学生列表相关
@@ -82,6 +117,8 @@ export const API_ENDPOINTS = {
   // 系统相关
   SYSTEM: {
     HEALTH: `${API_BASE_URL}/api/health`,
+    HEALTH_DEEP: `${API_BASE_URL}/api/health?deep=1`,
+    READY: `${API_BASE_URL}/api/ready`,
     TEST: `${API_BASE_URL}/api/test`,
   },
 };
@@ -89,15 +126,36 @@ export const API_ENDPOINTS = {
 // 导出基础 URL（如果需要）
 export const BASE_URL = API_BASE_URL;
 
+// 写请求之后服务端返回的 X-Primary-Until，在此之前的读请求带回该值以读取主库（读己之写）
+let primaryUntil = null;
+
+// 替代 fetch：带上 db_primary_until Cookie 和 X-Primary-Until，并记录写请求返回的 X-Primary-Until，返回原始 Response
+export const apiFetch = async (url, options = {}) => {
+  const response = await fetch(url, {
+    credentials: 'include',
+    ...options,
+    headers: {
+      ...(primaryUntil && Number(primaryUntil) * 1000 > Date.now() ? { 'X-Primary-Until': primaryUntil } : {}),
+      ...options.headers,
+    },
+  });
+  
+  if (response.headers.get('X-Primary-Until')) {
+    primaryUntil = response.headers.get('X-Primary-Until');
+  }
+  
+  return response;
+};
+
 // API 请求工具函数
 export const apiRequest = async (url, options = {}) => {
   try {
-    const response = await fetch(url, {
+    const response = await apiFetch(url, {
+      ...options,
       headers: {
         'Content-Type': 'application/json',
         ...options.headers,
       },
-      ...options,
     });
     
     const data = await response.json();